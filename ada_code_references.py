@@ -8,7 +8,26 @@ URL: https://www.ada.gov/law-and-regs/design-standards/2010-stds/
 All codes are from the official federal regulations.
 """
 
-ADA_CODES = {
+import re
+from dataclasses import dataclass, asdict
+from types import MappingProxyType
+
+
+@dataclass(frozen=True, slots=True)
+class AdaCode:
+    """One entry of the ADA Standards reference table."""
+    title: str
+    requirement: str
+    measurement: str
+    section: str
+    source: str
+    url: str
+    
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+_ADA_CODE_DATA = {
     # DOORS & ENTRANCES (Section 404)
     "404.2.3": {
         "title": "Clear Width",
@@ -189,8 +208,44 @@ ADA_CODES = {
     }
 }
 
+# Read-only table of AdaCode entries, built once at import
+ADA_CODES = MappingProxyType({
+    code: AdaCode(**info) for code, info in _ADA_CODE_DATA.items()
+})
+del _ADA_CODE_DATA
+
+# Search index built once at import: one lowercased blob per code holding
+# title, requirement and section, so search_codes() does a single substring
+# check per code instead of re-lowercasing every field on every query.
+_SEARCH_INDEX = [
+    (code, (info.title + '\n' + info.requirement + '\n' + info.section).lower())
+    for code, info in ADA_CODES.items()
+]
+
+# Inverted index for single-word searches. Every substring of every
+# alphanumeric token maps to the codes containing it, so a lookup like
+# "park" or "door" is one dict hit and still returns exactly what the
+# substring scan would. Codes are kept in ADA_CODES order.
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def _build_token_index() -> dict:
+    """Map every substring of every token to the codes that contain it."""
+    index = {}
+    for code, blob in _SEARCH_INDEX:
+        for token in set(_TOKEN_RE.findall(blob)):
+            for start in range(len(token)):
+                for end in range(start + 1, len(token) + 1):
+                    codes = index.setdefault(token[start:end], [])
+                    if not codes or codes[-1] != code:
+                        codes.append(code)
+    return index
+
+
+_TOKEN_INDEX = _build_token_index()
+
 
-def get_ada_code(code: str) -> dict:
+def get_ada_code(code: str) -> AdaCode:
     """
     Get ADA code information.
     
@@ -198,7 +253,7 @@ def get_ada_code(code: str) -> dict:
         code: ADA code number (e.g., "404.2.3")
         
     Returns:
-        Dictionary with code information, or None if not found
+        AdaCode with the code information, or None if not found
     """
     return ADA_CODES.get(code)
 
@@ -219,15 +274,13 @@ def search_codes(keyword: str) -> list:
         List of matching ADA codes
     """
     keyword_lower = keyword.lower()
-    matches = []
     
-    for code, info in ADA_CODES.items():
-        if (keyword_lower in info['title'].lower() or 
-            keyword_lower in info['requirement'].lower() or
-            keyword_lower in info['section'].lower()):
-            matches.append(code)
+    # Single-word keywords are answered straight from the token index
+    if _TOKEN_RE.fullmatch(keyword_lower):
+        return list(_TOKEN_INDEX.get(keyword_lower, ()))
     
-    return matches
+    # Multi-word phrases and codes like "404.2" fall back to substring scan
+    return [code for code, blob in _SEARCH_INDEX if keyword_lower in blob]
 
 
 # Test function
@@ -240,9 +293,9 @@ if __name__ == "__main__":
     print("\nTest 1: Get door width code")
     door_code = get_ada_code("404.2.3")
     print(f"Code: 404.2.3")
-    print(f"Title: {door_code['title']}")
-    print(f"Requirement: {door_code['requirement']}")
-    print(f"Measurement: {door_code['measurement']}")
+    print(f"Title: {door_code.title}")
+    print(f"Requirement: {door_code.requirement}")
+    print(f"Measurement: {door_code.measurement}")
     
     # Test search
     print("\n\nTest 2: Search for 'parking' codes")
@@ -250,7 +303,7 @@ if __name__ == "__main__":
     print(f"Found {len(parking_codes)} parking-related codes:")
     for code in parking_codes:
         info = get_ada_code(code)
-        print(f"  - {code}: {info['title']}")
+        print(f"  - {code}: {info.title}")
     
     # Show all codes
     print(f"\n\nTotal ADA codes in database: {len(get_all_codes())}")
@@ -4,21 +4,39 @@ Base Analyzer Interface
 This defines the standard interface that all compliance analyzers must implement.
 """
 
+import asyncio
+import copy
+import hashlib
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from enum import IntEnum
 from typing import List, Dict
 import numpy as np
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 
+from bbox_utils import duplicate_representatives
 
-@dataclass
+
+class Severity(IntEnum):
+    """Violation severities, ordered so the most severe compares highest."""
+    MINOR = 1
+    MODERATE = 2
+    CRITICAL = 3
+
+
+# Severity strings as stored in ViolationResult.severity ("Critical", ...)
+_SEVERITY_BY_NAME = {severity.name.capitalize(): severity for severity in Severity}
+
+
+@dataclass(slots=True)
 class ViolationResult:
     """Standard format for a detected ADA violation."""
-    type: str
-    severity: str
-    ada_code: str
-    description: str
-    recommendation: str
-    confidence: float
+    type: str = "Unknown"
+    severity: str = "Minor"
+    ada_code: str = "N/A"
+    description: str = ""
+    recommendation: str = ""
+    confidence: float = 0.5
     detection_method: str = "unknown"
     measurements: Dict = None
     
@@ -26,6 +44,23 @@ class ViolationResult:
         if self.measurements is None:
             self.measurements = {}
     
+    @classmethod
+    def from_dict(cls, data: Dict, **overrides) -> "ViolationResult":
+        """
+        Build a ViolationResult from a violation dict (e.g. from to_dict).
+        
+        Missing keys take the field defaults and unknown keys are ignored.
+        Keyword overrides replace the matching values from data.
+        """
+        values = {name: data[name] for name in _VIOLATION_FIELDS if name in data}
+        values.update(overrides)
+        return cls(**values)
+    
+    @property
+    def severity_rank(self) -> int:
+        """Severity as a Severity value for integer comparison (0 if unknown)."""
+        return _SEVERITY_BY_NAME.get(self.severity, 0)
+    
     def to_dict(self) -> Dict:
         return {
             "type": self.type,
@@ -39,48 +74,271 @@ class ViolationResult:
         }
 
 
+_VIOLATION_FIELDS = tuple(f.name for f in fields(ViolationResult))
+
+
+class FailedAnalysis(list):
+    """
+    Violations list for an analysis that could not be completed (API
+    error, unparseable reply). Empty like a clean result, so callers treat
+    it the same, but it is never stored in the result cache.
+    """
+
+
 class BaseAnalyzer(ABC):
     """Abstract base class for all compliance analyzers."""
     
+    # Upper bound on results kept in each analyzer's result cache
+    result_cache_size = 512
+    
     def __init__(self, name: str = "BaseAnalyzer"):
         self.name = name
         self.analysis_count = 0
+        
+        # Analysis results memoized per (crop hash, class name), so
+        # analyzing the same image again in one session (e.g. simple_demo's
+        # interactive loop) skips the work. Kept per instance: analyzers
+        # with other settings (mock vs. real API, another model) must not
+        # answer from each other's results
+        self._result_cache = OrderedDict()
+        
+        # Same-class detections overlapping more than this IoU are treated
+        # as one object and analyzed once (None disables the filter)
+        self.duplicate_iou_threshold = 0.5
+        
+        # Reuse results for identical crops; turn off for analyzers whose
+        # output varies between calls (e.g. sampling at temperature > 0)
+        self.cache_results = True
+        
+        # Upper bound on analyze_detection_async calls in flight at once
+        self.max_concurrency = 8
+        
+        # Per-detection progress output; turn off for batch/video processing
+        self.verbose = True
     
     @abstractmethod
     def analyze_detection(self, image: np.ndarray, detection) -> List[ViolationResult]:
         """Analyze a single detected object for ADA violations."""
         pass
     
+    # Optional: network-bound analyzers define
+    #     async def analyze_detection_async(self, image, detection) -> List[ViolationResult]
+    # and analyze_batch then runs the detections concurrently
+    analyze_detection_async = None
+    
+    def analyze_batch(self, image: np.ndarray, detections: List) -> Dict[int, List[ViolationResult]]:
+        """
+        Analyze several detections from one image together.
+        
+        The default analyzes them one at a time, or concurrently when the
+        analyzer defines analyze_detection_async. Analyzers whose per-call
+        overhead is high (e.g. one API request each) override this to
+        handle all of them in fewer calls.
+        
+        Returns:
+            Violations for each detection, keyed by its position in detections
+        """
+        if len(detections) > 1 and asyncio.iscoroutinefunction(self.analyze_detection_async):
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                return asyncio.run(self.analyze_batch_async(image, detections))
+        
+        return self._analyze_each(image, detections)
+    
+    async def analyze_batch_async(self, image: np.ndarray, detections: List) -> Dict[int, List[ViolationResult]]:
+        """
+        analyze_batch with analyze_detection_async fanned out via asyncio.
+        
+        At most max_concurrency calls run at once. Cached results are
+        returned without starting a call.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def analyze(detection):
+            key = self._result_key(image, detection) if self.cache_results else None
+            cached = self._cache_lookup(key)
+            if cached is not None:
+                return cached
+            
+            async with semaphore:
+                violations = await self.analyze_detection_async(image, detection)
+            self._cache_store(key, violations)
+            return violations
+        
+        all_violations = await asyncio.gather(*(analyze(d) for d in detections))
+        return dict(enumerate(all_violations))
+    
+    def _analyze_each(self, image: np.ndarray, detections: List) -> Dict[int, List[ViolationResult]]:
+        """analyze_batch done sequentially, one analyze_detection call each."""
+        analyze = self._analyze_cached  # bound once, not per detection
+        return {position: analyze(image, detection)
+                for position, detection in enumerate(detections)}
+    
     def analyze_all_detections(self, image: np.ndarray, detections: List) -> Dict:
-        """Analyze all detected objects in an image."""
+        """
+        Analyze all detected objects in an image.
+        
+        Near-duplicate boxes are analyzed once; the skipped ones still get
+        an entry, with no violations and a "duplicate_of" key naming the
+        detection whose result covers them.
+        """
         results = {}
         
+        self._print_banner(len(detections))
+        
+        unique, duplicates = self._unique_detections(detections)
+        all_violations = self.analyze_batch(image, [detection for _, detection in unique])
+        
+        # Progress lines collected and written once instead of printed
+        # one by one per detection
+        log = []
+        for position, (i, detection) in enumerate(unique):
+            log.append(f"\nAnalyzing {detection.class_name}...")
+            results[i] = self._record_result(i, detection, all_violations[position], log)
+        
+        if self.verbose and log:
+            print("\n".join(log))
+        
+        for i, j in duplicates.items():
+            results[i] = self._duplicate_result(i, detections[i], j)
+        
+        return {f"detection_{i}": results[i] for i in sorted(results)}
+    
+    def _result_key(self, image: np.ndarray, detection) -> tuple:
+        """Cache key for one detection: analyzer, crop pixels and class."""
+        crop = np.ascontiguousarray(detection.get_crop(image))
+        digest = hashlib.sha256(crop).hexdigest()[:16]
+        return (self.name, crop.shape, digest, detection.class_name)
+    
+    def _analyze_cached(self, image: np.ndarray, detection) -> List[ViolationResult]:
+        """analyze_detection, answered from the result cache when possible."""
+        key = self._result_key(image, detection) if self.cache_results else None
+        cached = self._cache_lookup(key)
+        if cached is not None:
+            return cached
+        
+        violations = self.analyze_detection(image, detection)
+        self._cache_store(key, violations)
+        return violations
+    
+    def _cache_lookup(self, key):
+        """Copy of the cached violations for key, or None (also if key is None)."""
+        if key is None:
+            return None
+        
+        cache = self._result_cache
+        cached = cache.get(key)
+        if cached is None:
+            return None
+        
+        cache.move_to_end(key)
+        # Fresh objects each time, so a caller editing a violation (or its
+        # measurements) doesn't change what later lookups return
+        return copy.deepcopy(list(cached))
+    
+    def _cache_store(self, key, violations: List[ViolationResult]):
+        """
+        Remember violations under key, evicting the oldest entry if full.
+        
+        FailedAnalysis results are not stored, so a crop whose analysis
+        failed is analyzed again next time instead of reporting no
+        violations for the rest of the session.
+        """
+        if key is None or isinstance(violations, FailedAnalysis):
+            return
+        
+        cache = self._result_cache
+        cache[key] = copy.deepcopy(tuple(violations))
+        if len(cache) > self.result_cache_size:
+            cache.popitem(last=False)
+    
+    def invalidate(self, image: np.ndarray = None, detections: List = None):
+        """
+        Forget cached results so the next analysis runs again.
+        
+        With an image and its detections only those crops are dropped;
+        otherwise every cached result of this analyzer is.
+        """
+        cache = self._result_cache
+        if image is not None and detections is not None:
+            for detection in detections:
+                cache.pop(self._result_key(image, detection), None)
+            return
+        
+        cache.clear()
+    
+    def _print_banner(self, num_detections: int):
+        """Print the header shown before a batch of detections is analyzed."""
         print(f"\n{'='*60}")
-        print(f"Analyzing {len(detections)} objects using {self.name}")
+        print(f"Analyzing {num_detections} objects using {self.name}")
         print('='*60)
+    
+    def _unique_detections(self, detections: List):
+        """
+        Split detections into the ones to analyze and near-duplicate boxes.
         
-        for i, detection in enumerate(detections):
-            print(f"\nAnalyzing {detection.class_name}...")
-            violations = self.analyze_detection(image, detection)
-            violations_dict = [v.to_dict() for v in violations]
-            
-            results[f"detection_{i}"] = {
-                "object": detection.class_name,
-                "bbox": list(detection.bbox),
-                "violations": violations_dict,
-                "analysis_metadata": {
-                    "analyzer_type": self.name,
-                    "detection_index": i
-                }
+        Returns:
+            (unique, duplicates): (index, detection) pairs to analyze, and
+            a dict mapping each skipped index to the index it duplicates.
+            Indices refer to the original detections list, so result keys
+            stay "detection_<i>".
+        """
+        if self.duplicate_iou_threshold is None or len(detections) < 2:
+            return list(enumerate(detections)), {}
+        
+        representatives = duplicate_representatives(detections, self.duplicate_iou_threshold)
+        
+        unique = [(i, detections[i]) for i, j in enumerate(representatives) if i == j]
+        duplicates = {i: j for i, j in enumerate(representatives) if i != j}
+        if duplicates and self.verbose:
+            print(f"  Skipping {len(duplicates)} near-duplicate detection(s)")
+        
+        return unique, duplicates
+    
+    def _duplicate_result(self, index: int, detection, duplicate_of: int) -> Dict:
+        """
+        Result entry for a detection skipped as a duplicate of another.
+        
+        Its violations are reported once, on the detection it duplicates,
+        so totals aren't counted twice.
+        """
+        return {
+            "object": detection.class_name,
+            "bbox": list(detection.bbox),
+            "violations": [],
+            "duplicate_of": f"detection_{duplicate_of}",
+            "analysis_metadata": {
+                "analyzer_type": self.name,
+                "detection_index": index
             }
-            
-            if violations:
-                print(f"  Found {len(violations)} violation(s)")
-                for v in violations:
-                    print(f"    - {v.type} ({v.severity})")
-            else:
-                print(f"  No violations detected")
-            
-            self.analysis_count += 1
+        }
+    
+    def _record_result(self, index: int, detection, violations: List[ViolationResult],
+                       log: List[str]) -> Dict:
+        """
+        Build the result entry for one analyzed detection.
+        
+        Shared by every analyze_all_detections implementation so sync and
+        concurrent analyzers report results in exactly the same format.
+        Progress lines for the detection are appended to log.
+        """
+        violations_dict = [v.to_dict() for v in violations]
+        
+        if violations:
+            log.append(f"  Found {len(violations)} violation(s)")
+            log.extend(f"    - {v.type} ({v.severity})" for v in violations)
+        else:
+            log.append(f"  No violations detected")
         
-        return results
+        self.analysis_count += 1
+        
+        return {
+            "object": detection.class_name,
+            "bbox": list(detection.bbox),
+            "violations": violations_dict,
+            "analysis_metadata": {
+                "analyzer_type": self.name,
+                "detection_index": index
+            }
+        }
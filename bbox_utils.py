@@ -0,0 +1,312 @@
+"""
+Bounding Box Utilities
+
+Small numeric helpers for working with detection bounding boxes.
+
+Boxes are [x, y, width, height] in pixels, the same format as
+DetectionResult.bbox. Numba is used to compile the inner loops when it
+is installed (compiled at import, for the argument types used here);
+otherwise the same code runs as plain Python/NumPy.
+"""
+
+from typing import List
+import numpy as np
+
+# Try to import numba for JIT-compiled loops
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+def _iou_filter_loop(bboxes: np.ndarray, thr: float) -> np.ndarray:
+    """Greedy suppression loop behind iou_filter (compiled by numba)."""
+    n = bboxes.shape[0]
+    keep = np.empty(n, dtype=np.int64)
+    num_kept = 0
+
+    for i in range(n):
+        x1 = bboxes[i, 0]
+        y1 = bboxes[i, 1]
+        w1 = bboxes[i, 2]
+        h1 = bboxes[i, 3]
+
+        duplicate = False
+        for k in range(num_kept):
+            j = keep[k]
+            x2 = bboxes[j, 0]
+            y2 = bboxes[j, 1]
+            w2 = bboxes[j, 2]
+            h2 = bboxes[j, 3]
+
+            inter_w = min(x1 + w1, x2 + w2) - max(x1, x2)
+            inter_h = min(y1 + h1, y2 + h2) - max(y1, y2)
+            if inter_w <= 0 or inter_h <= 0:
+                continue
+
+            inter = inter_w * inter_h
+            union = w1 * h1 + w2 * h2 - inter
+            if union > 0 and inter / union > thr:
+                duplicate = True
+                break
+
+        if not duplicate:
+            keep[num_kept] = i
+            num_kept += 1
+
+    return keep[:num_kept]
+
+
+if NUMBA_AVAILABLE:
+    # Compiled for the one signature iou_filter calls it with, at import
+    # rather than on the first detection. numba's on-disk cache records
+    # the importing module's name, so only use it when imported, not
+    # when this file is run as a script
+    _iou_filter_loop = numba.njit("(float32[:, :], float64)",
+                                  cache=__name__ != "__main__",
+                                  nogil=True)(_iou_filter_loop)
+
+
+def iou_filter(bboxes: np.ndarray, thr: float = 0.7) -> np.ndarray:
+    """
+    Greedy duplicate suppression over a set of boxes.
+
+    Boxes are visited in the order given (callers sort by confidence
+    first); a box is dropped if its IoU with an already kept box is
+    above thr.
+
+    Args:
+        bboxes: (N, 4) float32 array of [x, y, width, height]
+        thr: IoU above which two boxes count as the same object
+
+    Returns:
+        Indices (into bboxes) of the boxes that were kept
+    """
+    return _iou_filter_loop(np.asarray(bboxes, dtype=np.float32), float(thr))
+
+
+def contour_bounding_rects(contours) -> np.ndarray:
+    """
+    Bounding rects of all contours as one (N, 4) int32 [x, y, w, h] array.
+
+    Same values as cv2.boundingRect per contour, computed with one
+    min/max reduction over all contour points instead of N calls.
+    """
+    if len(contours) == 0:
+        return np.zeros((0, 4), dtype=np.int32)
+
+    points = np.concatenate(contours).reshape(-1, 2)
+    lengths = np.fromiter((len(c) for c in contours), dtype=np.int64, count=len(contours))
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+
+    low = np.minimum.reduceat(points, starts)
+    high = np.maximum.reduceat(points, starts)
+    return np.hstack([low, high - low + 1]).astype(np.int32)
+
+
+def _classify_rects_loop(rects: np.ndarray, width: int, height: int,
+                         conf_thresh: float):
+    """Per-rect if/elif ladder behind classify_rects (compiled by numba)."""
+    n = rects.shape[0]
+    class_ids = np.empty(n, dtype=np.int64)
+    confidences = np.empty(n, dtype=np.float64)
+    keep = np.zeros(n, dtype=np.bool_)
+    max_area = width * height * 0.5
+
+    for i in range(n):
+        y = rects[i, 1]
+        w = rects[i, 2]
+        h = rects[i, 3]
+        aspect_ratio = w / h if h > 0 else 0.0
+
+        if 0.3 < aspect_ratio < 0.7 and y > height * 0.3:
+            class_ids[i] = 0
+            confidences[i] = 0.75
+        elif aspect_ratio > 1.5 and w > width * 0.2:
+            class_ids[i] = 2
+            confidences[i] = 0.65
+        elif w < width * 0.3 and h < height * 0.3:
+            class_ids[i] = 14
+            confidences[i] = 0.60
+        else:
+            class_ids[i] = 99
+            confidences[i] = 0.50
+
+        area = w * h
+        keep[i] = 1000 <= area <= max_area and confidences[i] >= conf_thresh
+
+    return class_ids, confidences, keep
+
+
+if NUMBA_AVAILABLE:
+    # Compiled eagerly, like _iou_filter_loop, for the arguments
+    # classify_rects passes
+    _classify_rects_loop = numba.njit("(int32[:, ::1], int64, int64, float64)",
+                                      cache=__name__ != "__main__",
+                                      nogil=True)(_classify_rects_loop)
+
+
+def _classify_rects_numpy(rects: np.ndarray, width: int, height: int,
+                          conf_thresh: float):
+    """Same rules as _classify_rects_loop, as whole-array NumPy operations."""
+    x, y, w, h = rects.T
+
+    # Filter by size - ignore tiny or huge detections
+    area = w * h
+    size_ok = (area >= 1000) & (area <= width * height * 0.5)
+
+    aspect_ratio = np.divide(w, h, out=np.zeros(len(rects)), where=h > 0)
+    conditions = [
+        (0.3 < aspect_ratio) & (aspect_ratio < 0.7) & (y > height * 0.3),
+        (aspect_ratio > 1.5) & (w > width * 0.2),
+        (w < width * 0.3) & (h < height * 0.3),
+    ]
+    class_ids = np.select(conditions, [0, 2, 14], default=99)
+    confidences = np.select(conditions, [0.75, 0.65, 0.60], default=0.50)
+
+    return class_ids, confidences, size_ok & (confidences >= conf_thresh)
+
+
+def classify_rects(rects: np.ndarray, width: int, height: int,
+                   conf_thresh: float):
+    """
+    Mock-detector classification of contour bounding rects.
+
+    Rules of thumb to guess the object type, checked in order:
+    - Tall and thin, lower in image = likely a door (class 0)
+    - Wide rectangle = possibly a vehicle (class 2)
+    - Small rectangle = possibly signage or obstacle (class 14)
+    - Anything else = unknown object (class 99)
+
+    Rects outside the size limits or below conf_thresh are not kept.
+    Runs as one numba-compiled loop when numba is installed, otherwise as
+    NumPy array operations; both give the same result.
+
+    Args:
+        rects: (N, 4) int32 array of [x, y, width, height]
+        width, height: Image size
+        conf_thresh: Minimum confidence to keep a rect
+
+    Returns:
+        (class_ids, confidences, keep) arrays of length N
+    """
+    if NUMBA_AVAILABLE:
+        return _classify_rects_loop(np.ascontiguousarray(rects, dtype=np.int32),
+                                    int(width), int(height), float(conf_thresh))
+    return _classify_rects_numpy(rects, width, height, conf_thresh)
+
+
+def bbox_corners(detections: List, image_shape) -> np.ndarray:
+    """
+    Corner boxes for all detections, clipped to the image, in one array.
+
+    Args:
+        detections: List of DetectionResult objects
+        image_shape: Shape of the image the detections belong to
+
+    Returns:
+        (N, 4) int32 array of [x0, y0, x1, y1]
+    """
+    height, width = image_shape[:2]
+    if not detections:
+        return np.zeros((0, 4), dtype=np.int32)
+
+    boxes = np.asarray([d.bbox for d in detections], dtype=np.int32)
+    boxes[:, 2:] += boxes[:, :2]
+    return np.clip(boxes, 0, [width, height, width, height]).astype(np.int32)
+
+
+def crop_from_bbox(image: np.ndarray, corners) -> np.ndarray:
+    """Crop one [x0, y0, x1, y1] row from bbox_corners out of image."""
+    x0, y0, x1, y1 = corners
+    return image[y0:y1, x0:x1]
+
+
+def pairwise_iou(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    IoU of every box in a with every box in b.
+
+    Args:
+        a: (N, 4) array of [x, y, width, height]
+        b: (M, 4) array of [x, y, width, height]
+
+    Returns:
+        (N, M) float array of IoU values
+    """
+    a = np.asarray(a, dtype=np.float64)[:, None, :]
+    b = np.asarray(b, dtype=np.float64)[None, :, :]
+
+    inter_w = np.minimum(a[..., 0] + a[..., 2], b[..., 0] + b[..., 2]) - np.maximum(a[..., 0], b[..., 0])
+    inter_h = np.minimum(a[..., 1] + a[..., 3], b[..., 1] + b[..., 3]) - np.maximum(a[..., 1], b[..., 1])
+    inter = np.clip(inter_w, 0, None) * np.clip(inter_h, 0, None)
+    union = a[..., 2] * a[..., 3] + b[..., 2] * b[..., 3] - inter
+
+    return np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+
+
+def unique_detection_indices(detections: List, thr: float = 0.5) -> List[int]:
+    """
+    Indices of detections left after removing near-duplicates.
+
+    Only detections of the same class are compared, and the most
+    confident of each duplicate group is kept. Original order is kept.
+
+    Args:
+        detections: List of DetectionResult objects
+        thr: IoU above which two same-class detections are duplicates
+
+    Returns:
+        Sorted list of indices into detections
+    """
+    by_class = {}
+    for i, detection in enumerate(detections):
+        by_class.setdefault(detection.class_name, []).append(i)
+
+    kept = []
+    for indices in by_class.values():
+        if len(indices) == 1:
+            kept.extend(indices)
+            continue
+
+        # Most confident first, so it survives its duplicates
+        indices = sorted(indices, key=lambda i: -detections[i].confidence)
+        bboxes = np.array([detections[i].bbox for i in indices], dtype=np.float32)
+        kept.extend(indices[k] for k in iou_filter(bboxes, thr))
+
+    return sorted(kept)
+
+
+def duplicate_representatives(detections: List, thr: float = 0.5) -> List[int]:
+    """
+    For every detection, the index of the detection that stands in for it.
+
+    Kept detections (see unique_detection_indices) map to themselves;
+    each dropped duplicate maps to the kept same-class detection it
+    overlaps most.
+
+    Args:
+        detections: List of DetectionResult objects
+        thr: IoU above which two same-class detections are duplicates
+
+    Returns:
+        List of indices into detections, one per detection
+    """
+    kept = unique_detection_indices(detections, thr)
+    representatives = list(range(len(detections)))
+    if len(kept) == len(detections):
+        return representatives
+
+    kept_set = set(kept)
+    kept_by_class = {}
+    for i in kept:
+        kept_by_class.setdefault(detections[i].class_name, []).append(i)
+
+    for i, detection in enumerate(detections):
+        if i in kept_set:
+            continue
+        candidates = kept_by_class[detection.class_name]
+        ious = pairwise_iou([detection.bbox], [detections[j].bbox for j in candidates])[0]
+        representatives[i] = candidates[int(np.argmax(ious))]
+
+    return representatives
@@ -5,22 +5,188 @@ Uses Claude API for ADA compliance analysis.
 This is the existing logic extracted into the new modular structure.
 """
 
+import asyncio
 import base64
+import hashlib
+import importlib.util
 import json
+import logging
 import os
-from typing import List
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Dict, List
 import numpy as np
-import cv2
 
-from base_analyzer import BaseAnalyzer, ViolationResult
+from base_analyzer import BaseAnalyzer, FailedAnalysis, ViolationResult
+from bbox_utils import bbox_corners, crop_from_bbox
+import config
 import prompts
 
-# Try to import anthropic SDK
+logger = logging.getLogger(__name__)
+
+# The anthropic SDK, OpenCV and libjpeg-turbo are slow to import, so only
+# check that the SDK is installed here; each is imported on first real use
+# (mock mode never imports the SDK at all)
+ANTHROPIC_AVAILABLE = importlib.util.find_spec("anthropic") is not None
+# h2 lets the SDK's httpx pool speak HTTP/2 (optional)
+H2_AVAILABLE = importlib.util.find_spec("h2") is not None
+anthropic = None
+cv2 = None
+
+# Try to import orjson for faster JSON parsing (falls back to json)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Try to import pybase64 for SIMD base64 encoding (falls back to base64)
 try:
-    import anthropic
-    ANTHROPIC_AVAILABLE = True
+    import pybase64
+    PYBASE64_AVAILABLE = True
 except ImportError:
-    ANTHROPIC_AVAILABLE = False
+    PYBASE64_AVAILABLE = False
+
+# libjpeg-turbo encoder, loaded on first encode (False if unavailable)
+_TURBO_JPEG = None
+
+
+def _import_anthropic():
+    """Import the anthropic SDK on first use."""
+    global anthropic
+    if anthropic is None:
+        import anthropic as module
+        anthropic = module
+    return anthropic
+
+
+def _import_cv2():
+    """Import OpenCV on first use."""
+    global cv2
+    if cv2 is None:
+        import cv2 as module
+        cv2 = module
+    return cv2
+
+
+def _get_turbo_jpeg():
+    """
+    TurboJPEG encoder, or None if PyTurboJPEG / libturbojpeg is missing.
+    
+    Faster than OpenCV's bundled libjpeg; tried once, on first encode.
+    """
+    global _TURBO_JPEG
+    if _TURBO_JPEG is None:
+        try:
+            from turbojpeg import TurboJPEG
+            _TURBO_JPEG = TurboJPEG()
+        except (ImportError, OSError, RuntimeError):
+            _TURBO_JPEG = False
+    return _TURBO_JPEG or None
+
+
+def _perceptual_hash(image: np.ndarray) -> int:
+    """
+    64-bit perceptual hash (pHash) of an image, as a signed integer.
+    
+    The image is shrunk to 32x32 grayscale and each of the 8x8 lowest DCT
+    frequencies becomes one bit (above/below their median). Re-encoded,
+    rescaled or slightly shifted copies of a crop hash to the same or a
+    nearby value.
+    """
+    cv2 = _import_cv2()
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    small = cv2.resize(gray, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+    low = cv2.dct(small)[:8, :8]
+    bits = (low > np.median(low)).ravel()
+    return int(np.packbits(bits).view('>i8')[0])
+
+
+def _hamming_distances(value: int, hashes: np.ndarray) -> np.ndarray:
+    """Number of differing bits between value and each of hashes (int64)."""
+    diff = np.bitwise_xor(hashes, np.int64(value))
+    return np.unpackbits(diff.view(np.uint8)).reshape(-1, 64).sum(axis=1)
+
+# Shared decoder for pulling the JSON object out of Claude's replies
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _b64encode(data) -> str:
+    """Base64 text of a bytes-like object (pybase64 when installed)."""
+    if PYBASE64_AVAILABLE:
+        return pybase64.b64encode(data).decode('ascii')
+    return base64.b64encode(data).decode('ascii')
+
+
+def _dumps(obj) -> bytes:
+    """Serialize a response for the cache (orjson when installed)."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode('utf-8')
+
+
+def _loads(data: bytes):
+    """Inverse of _dumps."""
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
+# overall_assessment of the placeholder returned for unparseable replies
+_PARSE_ERROR = "Parse error"
+
+# overall_assessment of the placeholder returned when an API call fails
+_API_ERROR = "Error during analysis"
+
+
+def _mock_response(violation: dict, assessment: str, notes: str = "Mock analysis") -> dict:
+    """One canned mock-mode response with a single violation."""
+    return {"violations": [violation], "overall_assessment": assessment, "notes": notes}
+
+
+_MOCK_DOOR = _mock_response({
+    "type": "Door Width",
+    "severity": "Critical",
+    "ada_code": "404.2.3",
+    "description": "Door opening appears narrower than required 32-inch clear width",
+    "recommendation": "Widen door opening or replace with wider door unit",
+    "confidence": 0.7
+}, "Potential door width violation", "Mock analysis - requires verification")
+
+_MOCK_PARKING = _mock_response({
+    "type": "Signage",
+    "severity": "Critical",
+    "ada_code": "502.6",
+    "description": "Missing or inadequate accessible parking signage",
+    "recommendation": "Install International Symbol of Accessibility sign at 60 inches minimum height",
+    "confidence": 0.8
+}, "Missing parking signage")
+
+_MOCK_OBSTRUCTION = _mock_response({
+    "type": "Obstruction",
+    "severity": "Moderate",
+    "ada_code": "403.5.1",
+    "description": "Object may obstruct required 36-inch clear pathway width",
+    "recommendation": "Relocate object to maintain minimum clear pathway",
+    "confidence": 0.6
+}, "Potential pathway obstruction")
+
+_MOCK_NO_VIOLATIONS = {
+    "violations": [],
+    "overall_assessment": "No obvious violations in this view",
+    "notes": "Mock analysis"
+}
+
+# Mock-mode responses by object type, built once at import
+_MOCK_RESPONSES = {
+    "door": _MOCK_DOOR,
+    "entrance": _MOCK_DOOR,
+    "car": _MOCK_PARKING,
+    "truck": _MOCK_PARKING,
+    "parking": _MOCK_PARKING,
+    "chair": _MOCK_OBSTRUCTION,
+    "couch": _MOCK_OBSTRUCTION,
+    "bench": _MOCK_OBSTRUCTION,
+    "potted_plant": _MOCK_OBSTRUCTION,
+}
 
 
 class ClaudeAPIAnalyzer(BaseAnalyzer):
@@ -42,6 +208,30 @@ class ClaudeAPIAnalyzer(BaseAnalyzer):
         
         self.use_mock = use_mock or not ANTHROPIC_AVAILABLE
         
+        # Small LRU of encoded crops so re-analyzing an identical crop
+        # (retries, repeated runs on the same image) skips JPEG + base64
+        self.encode_cache_size = 32
+        self._encode_cache = OrderedDict()
+        
+        # Upload settings: crops are shrunk to this long edge and sent at
+        # this JPEG quality - plenty for visual ADA checks, far fewer bytes
+        self.max_image_dim = 1024
+        self.jpeg_quality = 80
+        
+        self.model = "claude-sonnet-4-20250514"
+        
+        # On-disk cache of Claude responses (real API mode only)
+        self.cache_path = config.CACHE_DIR / "claude_cache.db"
+        self._cache_db = None
+        
+        # Crops whose perceptual hashes differ in at most this many bits
+        # (of 64) reuse each other's cached analysis for the same prompt
+        self.phash_max_distance = 4
+        
+        # Only responses whose every violation is at least this confident
+        # are shared with similar crops; unsure answers stay exact-match only
+        self.phash_min_confidence = 0.6
+        
         if not self.use_mock:
             # Get API key from environment
             api_key = os.getenv("ANTHROPIC_API_KEY")
@@ -50,12 +240,189 @@ class ClaudeAPIAnalyzer(BaseAnalyzer):
                 print("⚠ ANTHROPIC_API_KEY not set, using mock mode")
                 self.use_mock = True
             else:
-                self.client = anthropic.Anthropic(api_key=api_key)
+                self.api_key = api_key
+                _import_anthropic()
+                # One keep-alive HTTP pool for the analyzer's lifetime, so
+                # consecutive requests reuse the open TLS connection
+                self._http_client = anthropic.DefaultHttpxClient(**self._http_pool_options())
+                self.client = anthropic.Anthropic(api_key=api_key,
+                                                  http_client=self._http_client)
+                self._open_cache()
                 print("✓ Claude API client initialized")
         
+        # Crops packed into one API request when analyzing many detections
+        self.batch_size = 4
+        
+        # Send analyze_batch's requests through the Message Batches API
+        # instead (half price, but blocks until the batch has ended; for
+        # offline runs only, see analyze_all_detections_batched)
+        self.use_batch_api = False
+        
         if self.use_mock:
             print("ℹ Using mock Claude responses")
     
+    def _http_pool_options(self) -> dict:
+        """
+        httpx settings for the SDK's connection pool.
+        
+        Enough idle keep-alive connections for max_concurrency requests,
+        so a concurrent batch never has to open fresh TLS connections;
+        HTTP/2 multiplexing when the h2 package is installed.
+        """
+        import httpx  # installed with the anthropic SDK
+        return {
+            "limits": httpx.Limits(max_connections=2 * self.max_concurrency,
+                                   max_keepalive_connections=self.max_concurrency),
+            "http2": H2_AVAILABLE,
+        }
+    
+    def close(self):
+        """Close the pooled HTTP connections and the response cache."""
+        client = getattr(self, "client", None)
+        if client is not None:
+            client.close()
+            self.client = None
+        
+        if self._cache_db is not None:
+            self._cache_db.close()
+            self._cache_db = None
+    
+    def _open_cache(self):
+        """Open (creating if needed) the SQLite response cache."""
+        try:
+            self._cache_db = sqlite3.connect(self.cache_path)
+            self._cache_db.execute(
+                "CREATE TABLE IF NOT EXISTS cache (k BLOB PRIMARY KEY, v BLOB)"
+            )
+            self._cache_db.execute(
+                "CREATE TABLE IF NOT EXISTS similar "
+                "(p BLOB, h INTEGER, v BLOB, PRIMARY KEY (p, h))"
+            )
+            self._cache_db.commit()
+        except sqlite3.Error as e:
+            logger.warning("⚠ Response cache unavailable: %s", e)
+            self._cache_db = None
+    
+    def _cache_key(self, img_base64: str, prompt: str) -> bytes:
+        """Cache key for one image + prompt sent to self.model."""
+        digest = hashlib.sha256()
+        system_text = prompts.SYSTEM_BLOCKS[0]["text"]
+        for part in (system_text, img_base64, prompt, self.model):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.digest()
+    
+    def _cache_get(self, key: bytes):
+        """Cached response for key, or None on a miss."""
+        if self._cache_db is None:
+            return None
+        
+        try:
+            row = self._cache_db.execute("SELECT v FROM cache WHERE k = ?", (key,)).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("⚠ Response cache read failed: %s", e)
+            return None
+        if row is None:
+            return None
+        return _loads(row[0])
+    
+    def _cache_put(self, key: bytes, response: dict):
+        """Store a successfully parsed response."""
+        if self._cache_db is None or response.get("overall_assessment") == _PARSE_ERROR:
+            return
+        
+        # A locked or read-only database (e.g. several demo workers sharing
+        # it) only costs the cache entry, never the response itself
+        try:
+            self._cache_db.execute(
+                "INSERT OR REPLACE INTO cache (k, v) VALUES (?, ?)",
+                (key, _dumps(response))
+            )
+            self._cache_db.commit()
+        except sqlite3.Error as e:
+            logger.warning("⚠ Response cache write failed: %s", e)
+    
+    def _similar_get(self, image: np.ndarray, prompt: str):
+        """
+        Cached response for a visually similar crop, or None on a miss.
+        
+        Catches what the exact cache can't: the same door photographed
+        twice, or a crop that shifted by a few pixels between runs.
+        """
+        if self._cache_db is None or self.phash_max_distance < 0:
+            return None
+        
+        # Same key function without an image: one bucket per prompt + model.
+        # Only the hashes are scanned; just the closest match's response
+        # is loaded
+        bucket = self._cache_key("", prompt)
+        try:
+            rows = self._cache_db.execute(
+                "SELECT h FROM similar WHERE p = ?", (bucket,)
+            ).fetchall()
+            if not rows:
+                return None
+            
+            hashes = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+            distances = _hamming_distances(_perceptual_hash(image), hashes)
+            best = int(np.argmin(distances))
+            if distances[best] > self.phash_max_distance:
+                return None
+            
+            row = self._cache_db.execute(
+                "SELECT v FROM similar WHERE p = ? AND h = ?", (bucket, int(hashes[best]))
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("⚠ Response cache read failed: %s", e)
+            return None
+        
+        return None if row is None else _loads(row[0])
+    
+    def _similar_put(self, image: np.ndarray, prompt: str, response: dict):
+        """
+        Store a confident, successfully parsed response under the crop's
+        perceptual hash.
+        
+        A low-confidence answer would otherwise be handed to every similar
+        crop from then on, so those are left to the exact cache.
+        """
+        if (self._cache_db is None or self.phash_max_distance < 0
+                or response.get("overall_assessment") == _PARSE_ERROR):
+            return
+        
+        violations = response.get("violations") or []
+        if any(v.get("confidence", 0.0) < self.phash_min_confidence for v in violations):
+            return
+        
+        try:
+            self._cache_db.execute(
+                "INSERT OR REPLACE INTO similar (p, h, v) VALUES (?, ?, ?)",
+                (self._cache_key("", prompt), _perceptual_hash(image), _dumps(response))
+            )
+            self._cache_db.commit()
+        except sqlite3.Error as e:
+            logger.warning("⚠ Response cache write failed: %s", e)
+    
+    def _lookup_response(self, image: np.ndarray, prompt: str, key: bytes):
+        """Exact cache hit for key, else a similar crop's response, else None."""
+        cached = self._cache_get(key)
+        if cached is None:
+            cached = self._similar_get(image, prompt)
+        if cached is not None:
+            logger.debug("Response cache hit for %s", key.hex()[:12])
+        return cached
+    
+    def _store_response(self, image: np.ndarray, prompt: str, key: bytes, response: dict):
+        """Store response in both the exact and the perceptual-hash cache."""
+        self._cache_put(key, response)
+        self._similar_put(image, prompt, response)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
     def analyze_detection(self, image: np.ndarray, detection) -> List[ViolationResult]:
         """
         Analyze a detected object using Claude API.
@@ -67,14 +434,10 @@ class ClaudeAPIAnalyzer(BaseAnalyzer):
         Returns:
             List of ViolationResult objects
         """
-        # Get cropped region
-        cropped = detection.get_crop(image)
-        
-        if cropped.size == 0:
+        job = self._prepare_detection(image, detection)
+        if job is None:
             return []
-        
-        # Get appropriate prompt
-        prompt_text = prompts.get_prompt_for_object(detection.class_name)
+        cropped, prompt_text = job
         
         # Get response (mock or real)
         if self.use_mock:
@@ -87,163 +450,617 @@ class ClaudeAPIAnalyzer(BaseAnalyzer):
         
         return violations
     
+    async def analyze_detection_async(self, image: np.ndarray, detection,
+                                      client=None) -> List[ViolationResult]:
+        """
+        Async counterpart of analyze_detection.
+        
+        Args:
+            image: Full image
+            detection: DetectionResult object
+            client: anthropic.AsyncAnthropic client to send the request with;
+                a short-lived one is opened if not given
+            
+        Returns:
+            List of ViolationResult objects
+        """
+        if self.use_mock:
+            return self.analyze_detection(image, detection)
+        
+        job = self._prepare_detection(image, detection)
+        if job is None:
+            return []
+        cropped, prompt_text = job
+        
+        if client is None:
+            async with anthropic.AsyncAnthropic(api_key=self.api_key) as client:
+                response = await self._claude_analyze_async(client, cropped, prompt_text)
+        else:
+            response = await self._claude_analyze_async(client, cropped, prompt_text)
+        
+        return self._parse_response(response, detection.class_name)
+    
+    def _prepare_detection(self, image: np.ndarray, detection, corners=None):
+        """
+        Crop and prompt for one detection, or None if it needs no analysis.
+        
+        Classes without ADA relevance and empty crops are skipped before
+        any encoding or API call. corners is the detection's row from
+        bbox_corners, when the caller has already computed it.
+        """
+        # Nothing to check for classes without ADA relevance. Names from
+        # ObjectDetector are already normalized; others are normalized here
+        prompt_text = prompts.ANALYSIS_PROMPTS.get(detection.class_name)
+        if prompt_text is None:
+            name = prompts.normalize_object_name(detection.class_name)
+            prompt_text = prompts.ANALYSIS_PROMPTS.get(name)
+            if prompt_text is None:
+                return None
+        
+        # Get cropped region
+        if corners is None:
+            cropped = detection.get_crop(image)
+        else:
+            cropped = crop_from_bbox(image, corners)
+        
+        if cropped.size == 0:
+            return None
+        
+        return cropped, prompt_text
+    
+    def analyze_batch(self, image: np.ndarray, detections: List) -> Dict[int, List[ViolationResult]]:
+        """
+        Analyze detections from one image in as few API requests as possible.
+        
+        In real API mode crops are packed batch_size to a request, so the
+        system prompt and request overhead are paid once per batch, and
+        the requests are fanned out with asyncio instead of being sent one
+        after another. Mock mode keeps the one-at-a-time default.
+        """
+        if self.use_mock or len(detections) < 2:
+            return self._analyze_each(image, detections)
+        
+        if self.use_batch_api:
+            results = self._analyze_message_batch(image, detections)
+            if results is not None:
+                return results
+        
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.analyze_batch_async(image, detections))
+        
+        # Already inside an event loop (e.g. a notebook) - can't nest
+        # asyncio.run, so send the batches one after another instead
+        all_violations, batches = self._plan_batches(image, detections)
+        
+        for batch in batches:
+            responses = self._claude_analyze_batch([job[1] for job in batch],
+                                                   [job[2] for job in batch])
+            self._store_batch_responses(detections, batch, responses, all_violations)
+        
+        return dict(enumerate(all_violations))
+    
+    async def analyze_batch_async(self, image: np.ndarray, detections: List) -> Dict[int, List[ViolationResult]]:
+        """
+        Analyze detections concurrently with the async Claude client.
+        
+        At most max_concurrency requests are in flight at once to stay
+        within API rate limits. Returns the same mapping as analyze_batch.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        # The async pool is bound to this event loop, so it lives for one
+        # batch; all requests in the batch share its keep-alive connections
+        http_client = anthropic.DefaultAsyncHttpxClient(**self._http_pool_options())
+        async with anthropic.AsyncAnthropic(api_key=self.api_key,
+                                            http_client=http_client) as client:
+            all_violations, batches = self._plan_batches(image, detections)
+            
+            async def analyze_batch(batch):
+                async with semaphore:
+                    responses = await self._claude_analyze_batch_async(
+                        client, [job[1] for job in batch], [job[2] for job in batch]
+                    )
+                self._store_batch_responses(detections, batch, responses, all_violations)
+            
+            await asyncio.gather(*(analyze_batch(batch) for batch in batches))
+        
+        return dict(enumerate(all_violations))
+    
+    def analyze_all_detections_batched(self, image: np.ndarray, detections: List) -> Dict:
+        """
+        analyze_all_detections, sending the requests as one Message Batch.
+        
+        Batched requests cost half as much but are processed
+        asynchronously by the API, so this blocks until the whole batch
+        has ended (usually minutes, at most 24 hours). Meant for offline
+        runs over saved images, not interactive use.
+        """
+        previous, self.use_batch_api = self.use_batch_api, True
+        try:
+            return self.analyze_all_detections(image, detections)
+        finally:
+            self.use_batch_api = previous
+    
+    def _analyze_message_batch(self, image: np.ndarray, detections: List):
+        """
+        Analyze detections through the Message Batches API.
+        
+        Each crop that isn't in the response cache becomes one request of
+        the batch, keyed by its position in detections. Returns the same
+        mapping as analyze_batch, or None if the batch could not be
+        submitted, did not end within config.MESSAGE_BATCH_MAX_WAIT_SECONDS
+        or its results could not be fetched (the caller then uses the
+        regular requests).
+        """
+        all_violations = [[] for _ in detections]
+        corners = bbox_corners(detections, image.shape)
+        pending = {}
+        requests = []
+        
+        for position, detection in enumerate(detections):
+            job = self._prepare_detection(image, detection, corners[position])
+            if job is None:
+                continue
+            cropped, prompt_text = job
+            
+            img_base64 = self._encode_image(cropped)
+            key = self._cache_key(img_base64, prompt_text)
+            response = self._lookup_response(cropped, prompt_text, key)
+            if response is not None:
+                all_violations[position] = self._parse_response(response, detection.class_name)
+                continue
+            
+            custom_id = f"detection-{position}"
+            pending[custom_id] = (position, cropped, prompt_text, key)
+            requests.append({"custom_id": custom_id,
+                             "params": self._build_request(img_base64, prompt_text)})
+        
+        if not requests:
+            return dict(enumerate(all_violations))
+        
+        try:
+            batch = self.client.messages.batches.create(requests=requests)
+        except Exception as e:
+            logger.warning("⚠ Message batch not submitted, sending requests directly: %s", e)
+            return None
+        
+        logger.info("Submitted message batch %s (%d requests)", batch.id, len(requests))
+        deadline = time.monotonic() + config.MESSAGE_BATCH_MAX_WAIT_SECONDS
+        
+        try:
+            while batch.processing_status != "ended":
+                if time.monotonic() >= deadline:
+                    logger.warning("⚠ Message batch %s still running after %ds, canceling "
+                                   "and sending requests directly",
+                                   batch.id, config.MESSAGE_BATCH_MAX_WAIT_SECONDS)
+                    self._cancel_message_batch(batch.id)
+                    return None
+                time.sleep(config.MESSAGE_BATCH_POLL_SECONDS)
+                batch = self.client.messages.batches.retrieve(batch.id)
+            
+            for entry in self.client.messages.batches.results(batch.id):
+                position, cropped, prompt_text, key = pending[entry.custom_id]
+                if entry.result.type == "succeeded":
+                    response = self._extract_json(entry.result.message.content[0].text)
+                    self._store_response(cropped, prompt_text, key, response)
+                else:
+                    # errored, canceled or expired
+                    response = self._api_error_response(
+                        RuntimeError(f"batch request {entry.result.type}"))
+                all_violations[position] = self._parse_response(response,
+                                                                detections[position].class_name)
+        except Exception as e:
+            logger.warning("⚠ Message batch %s failed, sending requests directly: %s",
+                           batch.id, e)
+            self._cancel_message_batch(batch.id)
+            return None
+        
+        return dict(enumerate(all_violations))
+    
+    def _cancel_message_batch(self, batch_id: str):
+        """Ask the API to cancel a message batch; failures are only logged."""
+        try:
+            self.client.messages.batches.cancel(batch_id)
+        except Exception as e:
+            logger.warning("⚠ Could not cancel message batch %s: %s", batch_id, e)
+    
+    def _plan_batches(self, image: np.ndarray, detections: List):
+        """
+        Group the detections that need an API call into request batches.
+        
+        Returns:
+            (all_violations, batches): a violations list per detection
+            (empty until filled in), and batches of at most batch_size
+            (position, crop, prompt) jobs
+        """
+        all_violations = [[] for _ in detections]
+        jobs = []
+        
+        # All boxes converted and clipped to the image in one go
+        corners = bbox_corners(detections, image.shape)
+        
+        for position, detection in enumerate(detections):
+            job = self._prepare_detection(image, detection, corners[position])
+            if job is not None:
+                jobs.append((position, *job))
+        
+        size = max(1, self.batch_size)
+        batches = [jobs[k:k + size] for k in range(0, len(jobs), size)]
+        
+        return all_violations, batches
+    
+    def _store_batch_responses(self, detections: List, batch: List, responses: List[dict],
+                               all_violations: List):
+        """Parse one batch's responses into all_violations."""
+        for (position, _, _), response in zip(batch, responses):
+            all_violations[position] = self._parse_response(response, detections[position].class_name)
+    
     def _encode_image(self, image: np.ndarray) -> str:
-        """Convert image to base64 for API transmission."""
-        success, buffer = cv2.imencode('.jpg', image)
-        if not success:
-            raise ValueError("Failed to encode image")
-        return base64.b64encode(buffer).decode('utf-8')
+        """
+        Convert image to base64 for API transmission.
+        
+        Images larger than max_image_dim on their long edge are downscaled
+        first, and JPEG quality is set to jpeg_quality. libjpeg-turbo is
+        used for the encode when PyTurboJPEG is installed, and pybase64
+        for the base64 step when that is. Results are cached by a hash of
+        the pixel data, so encoding the same crop twice only pays for the
+        hash.
+        """
+        # Crops are strided views into the full frame. Make the one
+        # contiguous copy here and use it for both the hash and the encoder
+        # (a no-op for arrays that are already contiguous)
+        image = np.ascontiguousarray(image)
+        key = (image.shape, image.dtype.str,
+               hashlib.blake2b(image, digest_size=16).digest())
+        
+        cached = self._encode_cache.get(key)
+        if cached is not None:
+            self._encode_cache.move_to_end(key)
+            return cached
+        
+        _import_cv2()
+        height, width = image.shape[:2]
+        long_edge = max(height, width)
+        if long_edge > self.max_image_dim:
+            scale = self.max_image_dim / long_edge
+            image = cv2.resize(image, None, fx=scale, fy=scale,
+                               interpolation=cv2.INTER_AREA)
+        
+        turbo_jpeg = _get_turbo_jpeg()
+        if turbo_jpeg is not None and image.ndim == 3 and image.shape[2] == 3:
+            from turbojpeg import TJSAMP_420, TJPF_BGR
+            buffer = turbo_jpeg.encode(image,
+                                       quality=self.jpeg_quality,
+                                       jpeg_subsample=TJSAMP_420,
+                                       pixel_format=TJPF_BGR)
+        else:
+            success, buffer = cv2.imencode('.jpg', image,
+                                           [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+            if not success:
+                raise ValueError("Failed to encode image")
+        img_base64 = _b64encode(memoryview(buffer))
+        
+        self._encode_cache[key] = img_base64
+        if len(self._encode_cache) > self.encode_cache_size:
+            self._encode_cache.popitem(last=False)
+        
+        return img_base64
+    
+    def _build_request(self, img_base64: str, prompt: str) -> dict:
+        """
+        Build the messages.create arguments for one image + prompt.
+        
+        The prompt goes into the cached system blocks, so the user turn
+        is just the image and a one-line instruction.
+        """
+        return {
+            "model": self.model,
+            "max_tokens": 1000,
+            "system": prompts.get_prompt_blocks(prompt),
+            "messages": [
+                {
+                    "role": "user",
+                    "content": [
+                        {
+                            "type": "image",
+                            "source": {
+                                "type": "base64",
+                                "media_type": "image/jpeg",
+                                "data": img_base64
+                            }
+                        },
+                        {
+                            "type": "text",
+                            "text": prompts.IMAGE_INSTRUCTION
+                        }
+                    ]
+                }
+            ]
+        }
+    
+    def _build_batch_request(self, images_base64: List[str], prompt_texts: List[str]) -> dict:
+        """
+        Build the messages.create arguments for several images in one request.
+        
+        Each image is followed by its own prompt, and Claude is asked for a
+        JSON array holding one response object per image, in order.
+        """
+        count = len(images_base64)
+        content = [
+            {
+                "type": "text",
+                "text": prompts.get_batch_instruction(count)
+            }
+        ]
+        
+        for number, (img_base64, prompt) in enumerate(zip(images_base64, prompt_texts), 1):
+            content.append({
+                "type": "image",
+                "source": {
+                    "type": "base64",
+                    "media_type": "image/jpeg",
+                    "data": img_base64
+                }
+            })
+            content.append({
+                "type": "text",
+                "text": f"Image {number} of {count}:\n\n{prompt}"
+            })
+        
+        return {
+            "model": self.model,
+            "max_tokens": 1000 * count,
+            "system": prompts.SYSTEM_BLOCKS,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": content
+                }
+            ]
+        }
+    
+    def _api_error_response(self, error: Exception) -> dict:
+        """Response used in place of Claude's when the API call fails."""
+        logger.warning("⚠ API error: %s", error)
+        return {
+            "violations": [],
+            "overall_assessment": _API_ERROR,
+            "notes": str(error)
+        }
     
     def _claude_analyze(self, image: np.ndarray, prompt: str) -> dict:
-        """Send request to Claude API."""
+        """Send request to Claude API, answering from the cache when possible."""
         img_base64 = self._encode_image(image)
+        key = self._cache_key(img_base64, prompt)
+        
+        cached = self._lookup_response(image, prompt, key)
+        if cached is not None:
+            return cached
         
         try:
-            message = self.client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=1000,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "image",
-                                "source": {
-                                    "type": "base64",
-                                    "media_type": "image/jpeg",
-                                    "data": img_base64
-                                }
-                            },
-                            {
-                                "type": "text",
-                                "text": prompts.SYSTEM_PROMPT + "\n\n" + prompt
-                            }
-                        ]
-                    }
-                ]
-            )
+            message = self.client.messages.create(**self._build_request(img_base64, prompt))
             
             response_text = message.content[0].text
-            return self._extract_json(response_text)
+            response = self._extract_json(response_text)
             
         except Exception as e:
-            print(f"  ⚠ API error: {e}")
-            return {
-                "violations": [],
-                "overall_assessment": "Error during analysis",
-                "notes": str(e)
-            }
+            return self._api_error_response(e)
+        
+        self._store_response(image, prompt, key, response)
+        return response
     
-    def _extract_json(self, text: str) -> dict:
-        """Extract JSON from Claude's response."""
-        # Try parsing as-is
+    async def _claude_analyze_async(self, client, image: np.ndarray, prompt: str) -> dict:
+        """Send request to Claude API without blocking the event loop."""
+        img_base64 = self._encode_image(image)
+        key = self._cache_key(img_base64, prompt)
+        
+        cached = self._lookup_response(image, prompt, key)
+        if cached is not None:
+            return cached
+        
         try:
-            return json.loads(text)
-        except json.JSONDecodeError:
-            pass
-        
-        # Look for JSON in code blocks
-        if "```json" in text:
-            start = text.find("```json") + 7
-            end = text.find("```", start)
-            json_text = text[start:end].strip()
-        elif "```" in text:
-            start = text.find("```") + 3
-            end = text.find("```", start)
-            json_text = text[start:end].strip()
-        else:
-            start = text.find("{")
-            end = text.rfind("}") + 1
-            if start != -1 and end != 0:
-                json_text = text[start:end]
-            else:
-                json_text = text
+            message = await client.messages.create(**self._build_request(img_base64, prompt))
+            
+            response_text = message.content[0].text
+            response = self._extract_json(response_text)
+            
+        except Exception as e:
+            return self._api_error_response(e)
+        
+        self._store_response(image, prompt, key, response)
+        return response
+    
+    def _split_cached(self, crops: List[np.ndarray], prompt_texts: List[str]):
+        """
+        Look up each crop in the response cache.
+        
+        Returns:
+            (responses, misses): cached response or None per crop, and the
+            indices of the crops that still need an API call
+        """
+        responses = [
+            self._lookup_response(crop, prompt,
+                                  self._cache_key(self._encode_image(crop), prompt))
+            for crop, prompt in zip(crops, prompt_texts)
+        ]
+        misses = [k for k, response in enumerate(responses) if response is None]
+        return responses, misses
+    
+    def _cache_batch(self, crops: List[np.ndarray], images_base64: List[str],
+                     prompt_texts: List[str], responses: List[dict]):
+        """Store each response of a batched reply under its own crop's key."""
+        for crop, img_base64, prompt, response in zip(crops, images_base64,
+                                                      prompt_texts, responses):
+            self._store_response(crop, prompt, self._cache_key(img_base64, prompt), response)
+    
+    def _claude_analyze_batch(self, crops: List[np.ndarray], prompt_texts: List[str]) -> List[dict]:
+        """
+        Send several crops to Claude API in a single request.
+        
+        Crops already in the response cache are not sent. A single crop
+        uses the normal one-image request. If the reply does not contain
+        one response per image, each crop is re-sent on its own.
+        """
+        responses, misses = self._split_cached(crops, prompt_texts)
+        if len(misses) < len(crops):
+            if misses:
+                fresh = self._claude_analyze_batch([crops[k] for k in misses],
+                                                   [prompt_texts[k] for k in misses])
+                for k, response in zip(misses, fresh):
+                    responses[k] = response
+            return responses
+        
+        if len(crops) == 1:
+            return [self._claude_analyze(crops[0], prompt_texts[0])]
+        
+        images_base64 = [self._encode_image(crop) for crop in crops]
         
         try:
-            return json.loads(json_text)
-        except json.JSONDecodeError:
-            return {
-                "violations": [],
-                "overall_assessment": "Parse error",
-                "notes": text[:200]
-            }
+            message = self.client.messages.create(
+                **self._build_batch_request(images_base64, prompt_texts)
+            )
+            responses = self._extract_json_array(message.content[0].text, len(crops))
+        except Exception as e:
+            return [self._api_error_response(e)] * len(crops)
+        
+        if responses is None:
+            return [self._claude_analyze(crop, prompt)
+                    for crop, prompt in zip(crops, prompt_texts)]
+        
+        self._cache_batch(crops, images_base64, prompt_texts, responses)
+        return responses
     
-    def _mock_analyze(self, object_name: str) -> dict:
-        """Return mock responses for testing."""
-        if object_name in ["door", "entrance"]:
-            return {
-                "violations": [
-                    {
-                        "type": "Door Width",
-                        "severity": "Critical",
-                        "ada_code": "404.2.3",
-                        "description": "Door opening appears narrower than required 32-inch clear width",
-                        "recommendation": "Widen door opening or replace with wider door unit",
-                        "confidence": 0.7
-                    }
-                ],
-                "overall_assessment": "Potential door width violation",
-                "notes": "Mock analysis - requires verification"
-            }
+    async def _claude_analyze_batch_async(self, client, crops: List[np.ndarray],
+                                          prompt_texts: List[str]) -> List[dict]:
+        """Async counterpart of _claude_analyze_batch."""
+        responses, misses = self._split_cached(crops, prompt_texts)
+        if len(misses) < len(crops):
+            if misses:
+                fresh = await self._claude_analyze_batch_async(
+                    client, [crops[k] for k in misses], [prompt_texts[k] for k in misses]
+                )
+                for k, response in zip(misses, fresh):
+                    responses[k] = response
+            return responses
         
-        elif object_name in ["car", "truck", "parking"]:
-            return {
-                "violations": [
-                    {
-                        "type": "Signage",
-                        "severity": "Critical",
-                        "ada_code": "502.6",
-                        "description": "Missing or inadequate accessible parking signage",
-                        "recommendation": "Install International Symbol of Accessibility sign at 60 inches minimum height",
-                        "confidence": 0.8
-                    }
-                ],
-                "overall_assessment": "Missing parking signage",
-                "notes": "Mock analysis"
-            }
+        if len(crops) == 1:
+            return [await self._claude_analyze_async(client, crops[0], prompt_texts[0])]
         
-        elif object_name in ["chair", "couch", "bench", "potted_plant"]:
-            return {
-                "violations": [
-                    {
-                        "type": "Obstruction",
-                        "severity": "Moderate",
-                        "ada_code": "403.5.1",
-                        "description": "Object may obstruct required 36-inch clear pathway width",
-                        "recommendation": "Relocate object to maintain minimum clear pathway",
-                        "confidence": 0.6
-                    }
-                ],
-                "overall_assessment": "Potential pathway obstruction",
-                "notes": "Mock analysis"
-            }
+        images_base64 = [self._encode_image(crop) for crop in crops]
         
-        else:
-            return {
-                "violations": [],
-                "overall_assessment": "No obvious violations in this view",
-                "notes": "Mock analysis"
-            }
+        try:
+            message = await client.messages.create(
+                **self._build_batch_request(images_base64, prompt_texts)
+            )
+            responses = self._extract_json_array(message.content[0].text, len(crops))
+        except Exception as e:
+            return [self._api_error_response(e)] * len(crops)
+        
+        if responses is None:
+            return list(await asyncio.gather(
+                *(self._claude_analyze_async(client, crop, prompt)
+                  for crop, prompt in zip(crops, prompt_texts))
+            ))
+        
+        self._cache_batch(crops, images_base64, prompt_texts, responses)
+        return responses
+    
+    def _extract_json(self, text: str) -> dict:
+        """
+        Extract JSON from Claude's response.
+        
+        Parses the first JSON object in the text with raw_decode, so code
+        fences and any prose before or after the object are ignored.
+        With orjson available, the text from the first "{" to the last "}"
+        is tried with orjson first, which covers bare and fenced replies.
+        """
+        start = text.find("{")
+        if ORJSON_AVAILABLE and start != -1:
+            try:
+                obj = orjson.loads(text[start:text.rfind("}") + 1])
+                if isinstance(obj, dict):
+                    return obj
+            except orjson.JSONDecodeError:
+                pass
+        
+        while start != -1:
+            try:
+                obj, _ = _JSON_DECODER.raw_decode(text, start)
+                return obj
+            except json.JSONDecodeError:
+                # Stray brace in leading prose - try the next one
+                start = text.find("{", start + 1)
+        
+        return {
+            "violations": [],
+            "overall_assessment": _PARSE_ERROR,
+            "notes": text[:200]
+        }
+    
+    def _extract_json_array(self, text: str, count: int):
+        """
+        Extract the per-image response array from a batched reply.
+        
+        Returns:
+            List of count response dicts, or None if the reply has no
+            array of exactly that many objects
+        """
+        def is_response_array(obj):
+            return (isinstance(obj, list) and len(obj) == count
+                    and all(isinstance(item, dict) for item in obj))
+        
+        # A reply that is only the array is parsed in one go
+        if ORJSON_AVAILABLE and text.lstrip().startswith("["):
+            try:
+                obj = orjson.loads(text)
+                if is_response_array(obj):
+                    return obj
+            except orjson.JSONDecodeError:
+                pass
+        
+        start = text.find("[")
+        while start != -1:
+            try:
+                obj, end = _JSON_DECODER.raw_decode(text, start)
+            except json.JSONDecodeError:
+                start = text.find("[", start + 1)
+                continue
+            
+            if is_response_array(obj):
+                return obj
+            # Skip the whole value so nested arrays aren't mistaken for it
+            start = text.find("[", end)
+        
+        return None
+    
+    def _mock_analyze(self, object_name: str) -> dict:
+        """Return mock responses for testing."""
+        template = _MOCK_RESPONSES.get(object_name, _MOCK_NO_VIOLATIONS)
+        # Fresh dicts each call so callers may modify the response
+        return {**template, "violations": [dict(v) for v in template["violations"]]}
     
     def _parse_response(self, response: dict, object_name: str) -> List[ViolationResult]:
-        """Convert Claude response to ViolationResult objects."""
+        """
+        Convert Claude response to ViolationResult objects.
+        
+        API errors and unparseable replies give an empty FailedAnalysis,
+        which the result cache does not keep.
+        """
+        if response.get("overall_assessment") in (_API_ERROR, _PARSE_ERROR):
+            return FailedAnalysis()
+        
         violations = []
         violations_data = response.get("violations", [])
         
         for v_dict in violations_data:
             try:
-                violation = ViolationResult(
-                    type=v_dict.get("type", "Unknown"),
-                    severity=v_dict.get("severity", "Minor"),
-                    ada_code=v_dict.get("ada_code", "N/A"),
-                    description=v_dict.get("description", ""),
-                    recommendation=v_dict.get("recommendation", ""),
-                    confidence=v_dict.get("confidence", 0.5),
-                    detection_method="claude_api"
-                )
+                violation = ViolationResult.from_dict(v_dict, detection_method="claude_api",
+                                                      measurements={})
                 violations.append(violation)
             except Exception as e:
-                print(f"  ⚠ Error parsing violation: {e}")
+                logger.warning("⚠ Error parsing violation: %s", e)
         
         return violations
 
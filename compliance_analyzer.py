@@ -13,7 +13,7 @@ analyzers without changing other code.
 from typing import List, Dict
 import numpy as np
 
-from base_analyzer import BaseAnalyzer
+from base_analyzer import BaseAnalyzer, ViolationResult
 
 
 class ComplianceAnalyzer:
@@ -36,7 +36,8 @@ class ComplianceAnalyzer:
     
     def __init__(self, 
                  use_mock: bool = False,
-                 analyzer_type: str = 'rule_based'):
+                 analyzer_type: str = 'rule_based',
+                 return_dicts: bool = True):
         """
         Initialize the compliance analyzer.
         
@@ -44,11 +45,15 @@ class ComplianceAnalyzer:
             use_mock: For backward compatibility (used by claude analyzer)
             analyzer_type: Type of analyzer to use
                           Options: 'rule_based', 'claude', 'hybrid'
+            return_dicts: analyze_detection returns violations as dicts
+                          (backward compatible); False returns the
+                          ViolationResult objects without converting them
         
         The factory creates the appropriate analyzer instance.
         """
         self.analyzer_type = analyzer_type
         self.use_mock = use_mock
+        self.return_dicts = return_dicts
         
         # Create the appropriate analyzer
         self.analyzer = self._create_analyzer(analyzer_type, use_mock)
@@ -99,13 +104,17 @@ class ComplianceAnalyzer:
             detection: DetectionResult object
             
         Returns:
-            List of violations (as dicts for backward compatibility)
+            List of violations (as dicts for backward compatibility,
+            or ViolationResult objects if return_dicts is False)
         
         This delegates to the underlying analyzer.
         """
         violations = self.analyzer.analyze_detection(image, detection)
+        if not self.return_dicts:
+            return violations
+        
         # Convert ViolationResult objects to dicts for backward compatibility
-        return [v.to_dict() if hasattr(v, 'to_dict') else v for v in violations]
+        return [v.to_dict() if isinstance(v, ViolationResult) else v for v in violations]
     
     def analyze_all_detections(self,
                                image: np.ndarray,
@@ -124,6 +133,16 @@ class ComplianceAnalyzer:
         """
         return self.analyzer.analyze_all_detections(image, detections)
     
+    def invalidate(self, image: np.ndarray = None, detections: List = None):
+        """
+        Forget cached analysis results (e.g. to analyze an image again).
+        
+        Args:
+            image: Image whose detections should be re-analyzed, or None
+            detections: Detections in that image, or None to clear all
+        """
+        self.analyzer.invalidate(image, detections)
+    
     def get_analyzer_info(self) -> Dict:
         """
         Get information about the current analyzer.
@@ -141,18 +160,21 @@ class ComplianceAnalyzer:
 
 # Convenience function for creating analyzers
 def create_analyzer(analyzer_type: str = 'rule_based', 
-                   use_mock: bool = False) -> ComplianceAnalyzer:
+                   use_mock: bool = False,
+                   return_dicts: bool = True) -> ComplianceAnalyzer:
     """
     Convenience function to create a compliance analyzer.
     
     Args:
         analyzer_type: Type of analyzer ('rule_based', 'claude', 'hybrid')
         use_mock: Whether to use mock mode
+        return_dicts: Whether analyze_detection converts violations to dicts
         
     Returns:
         ComplianceAnalyzer instance
     """
-    return ComplianceAnalyzer(use_mock=use_mock, analyzer_type=analyzer_type)
+    return ComplianceAnalyzer(use_mock=use_mock, analyzer_type=analyzer_type,
+                              return_dicts=return_dicts)
 
 
 # Test
@@ -8,26 +8,81 @@ file paths, and detection parameters.
 import os
 from pathlib import Path
 
+import numpy as np
+
 # Project paths
 PROJECT_ROOT = Path(__file__).parent
 TEST_IMAGES_DIR = PROJECT_ROOT / "test_images"
 OUTPUTS_DIR = PROJECT_ROOT / "outputs"
+CACHE_DIR = PROJECT_ROOT / ".cache"  # Cached Claude API responses
 
 # Create directories if they don't exist
 TEST_IMAGES_DIR.mkdir(exist_ok=True)
 OUTPUTS_DIR.mkdir(exist_ok=True)
+CACHE_DIR.mkdir(exist_ok=True)
 
 # API Configuration
 # NOTE: In production, use environment variables or .env file for security
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY", "")
 
+# Lifetime of Claude's prompt cache for the static system prompt + ADA
+# reference. "1h" keeps it warm between images picked by hand (e.g. in
+# simple_demo's interactive mode); writing a 1-hour entry costs 2x the
+# base input price instead of 1.25x, so use "5m" for one-off runs or when
+# requests always arrive within minutes of each other
+PROMPT_CACHE_TTL = "1h"
+
+# Prompts shorter than this many tokens are never cached by the API (the
+# minimum for Sonnet models); prompts.py pads the system block up to it
+PROMPT_CACHE_MIN_TOKENS = 1024
+
+# Message Batches API for offline runs (ClaudeAPIAnalyzer.use_batch_api):
+# requests are billed at half price but results can take minutes to hours,
+# so the analyzer checks for them this often
+MESSAGE_BATCH_POLL_SECONDS = 10
+
+# Longest the analyzer waits for a message batch to end. After that the
+# batch is canceled and its detections are sent as regular requests
+MESSAGE_BATCH_MAX_WAIT_SECONDS = 60 * 60
+
 # YOLOv8 Configuration
 YOLO_MODEL = "yolov8n.pt"  # 'n' = nano (fastest, smallest)
 YOLO_CONFIDENCE_THRESHOLD = 0.5  # Only keep detections with >50% confidence
 
+# TensorRT acceleration (NVIDIA GPUs only, needs the tensorrt package)
+# When enabled, YOLO_MODEL is exported once to an FP16 .engine next to the
+# .pt file and that engine is loaded instead; falls back to the .pt on failure
+USE_TRT = False
+TRT_MAX_BATCH = 8  # Engines are exported with a fixed max batch size
+
+# INT8 ONNX Runtime acceleration (CPU-only machines, needs onnxruntime)
+# When enabled, YOLO_MODEL is exported to ONNX and statically quantized to
+# INT8 once, calibrated on the images in TEST_IMAGES_DIR, then run with
+# onnxruntime's CPU provider instead of PyTorch
+USE_ONNX_INT8 = False
+ONNX_INT8_MODEL = "yolov8n_int8.onnx"
+ONNX_INPUT_SIZE = 640
+# Overlap above which same-class boxes are merged by NMS, for both the
+# PyTorch and the ONNX model (0.7 is ultralytics' own default)
+YOLO_NMS_IOU_THRESHOLD = 0.7
+
+# torch.compile for the PyTorch YOLO model (CUDA GPUs only)
+# The network is compiled with mode="reduce-overhead", which records CUDA
+# graphs and replays them on later calls; pays off when every input has
+# the same shape (e.g. 640x640 demo frames). Other shapes trigger a recompile
+USE_TORCH_COMPILE = False
+
 # Video Processing Configuration
 FRAMES_TO_EXTRACT = 5  # Number of frames to extract from videos
 VIDEO_SKIP_SECONDS = 2  # Extract one frame every N seconds
+# Frames video_demo.py decodes, detects and annotates together. Only this
+# many decoded frames are held in memory at a time
+VIDEO_FRAME_BATCH = 8
+# Frames closer together than this are reached by decoding forward from
+# the previous one; further apart, extract_frames seeks instead. A seek
+# restarts decoding at the previous keyframe, which phone and camera
+# videos typically place every 1-2 seconds
+VIDEO_SEEK_MIN_GAP_SECONDS = 1
 
 # Object Detection - Classes we care about for ADA compliance
 # These are COCO dataset class IDs that YOLOv8 is trained on
@@ -47,6 +102,12 @@ RELEVANT_CLASSES = {
     73: "book",            # Potential obstruction
 }
 
+# Fast membership checks for RELEVANT_CLASSES: a frozenset for single IDs
+# and a boolean lookup table indexed by class ID for whole arrays of IDs
+RELEVANT_CLASSES_SET = frozenset(RELEVANT_CLASSES)
+RELEVANT_CLASS_MASK = np.zeros(256, dtype=bool)
+RELEVANT_CLASS_MASK[list(RELEVANT_CLASSES)] = True
+
 # Violation severity levels
 SEVERITY_CRITICAL = "Critical"
 SEVERITY_MODERATE = "Moderate"
@@ -62,5 +123,29 @@ COLOR_COMPLIANT = (0, 255, 0)     # Green
 BBOX_THICKNESS = 2
 FONT_SCALE = 0.6
 FONT_THICKNESS = 2
+# Longest side, in pixels, annotated images are drawn at. Larger frames
+# (e.g. 4K video) are downscaled first: same look at typical viewing
+# size, a fraction of the drawing and JPEG encoding work
+MAX_ANNOTATION_DIM = 1920
+
+# JPEG quality for saved annotated images and reports. 85 is visually
+# indistinguishable from OpenCV's default of 95 and noticeably faster to
+# encode. The official opencv-python wheels bundle libjpeg-turbo, which
+# does the encode with SIMD
+OUTPUT_JPEG_QUALITY = 85
+
+# Threads OpenCV's own parallel loops (cvtColor, resize, Canny, ...) may
+# use; one core is left for the Python side of the pipeline
+OPENCV_THREADS = max(1, (os.cpu_count() or 1) - 1)
+
+# Threads RuleBasedAnalyzer spreads one image's detections over. Kept
+# small because every one of them runs OpenCV calls that already use up
+# to OPENCV_THREADS threads; 1 keeps everything on the calling thread
+RULE_BASED_WORKERS = min(2, os.cpu_count() or 1)
+
+# Worker processes `simple_demo.py --all` analyzes images with. Half the
+# cores, since OpenCV and the numba kernels already use threads within
+# each image; 1 runs everything in the main process
+DEMO_PROCESSES = max(1, (os.cpu_count() or 1) // 2)
 
 print("✓ Configuration loaded successfully")
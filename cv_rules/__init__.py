@@ -3,13 +3,12 @@ CV Rules Package
 
 Individual computer vision analyzers for different ADA violation types.
 Each analyzer uses traditional CV techniques (no neural networks).
+
+Analyzers are imported on first access (e.g. ``cv_rules.DoorAnalyzer``),
+so importing one submodule doesn't load all the others.
 """
 
-from .door_analyzer import DoorAnalyzer
-from .parking_analyzer import ParkingAnalyzer
-from .pathway_analyzer import PathwayAnalyzer
-from .ramp_analyzer import RampAnalyzer
-from .signage_analyzer import SignageAnalyzer
+import importlib
 
 __all__ = [
     'DoorAnalyzer',
@@ -18,3 +17,16 @@ __all__ = [
     'RampAnalyzer',
     'SignageAnalyzer'
 ]
+
+
+def __getattr__(name):
+    """Import an analyzer class from its submodule on first access."""
+    if name in __all__:
+        # "DoorAnalyzer" lives in cv_rules.door_analyzer
+        module = importlib.import_module(f".{name[:-len('Analyzer')].lower()}_analyzer", __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
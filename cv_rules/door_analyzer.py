@@ -9,10 +9,113 @@ Techniques used:
 - Contour analysis for hardware detection
 """
 
+import threading
 import cv2
 import numpy as np
 from typing import List, Dict, Tuple
 
+# Try to import numba for the JIT-compiled hardware filter
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+def _contour_areas_and_sizes(contours) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Areas and bounding-rect sizes of all contours, without a Python loop.
+    
+    Same values as cv2.contourArea and the (w, h) of cv2.boundingRect per
+    contour: the shoelace formula and a min/max reduction over all contour
+    points at once.
+    
+    Returns:
+        (areas, sizes): (N,) float64 areas and (N, 2) int [w, h] sizes
+    """
+    if len(contours) == 0:
+        return np.zeros(0), np.ones((0, 2), dtype=np.int64)
+    
+    points = np.concatenate(contours).reshape(-1, 2).astype(np.int64)
+    lengths = np.fromiter((len(c) for c in contours), dtype=np.int64, count=len(contours))
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    
+    # Next point along each contour, wrapping back to the contour's first
+    following = np.arange(1, len(points) + 1)
+    following[starts + lengths - 1] = starts
+    x, y = points[:, 0], points[:, 1]
+    cross = x * y[following] - x[following] * y
+    areas = np.abs(np.add.reduceat(cross, starts)) / 2.0
+    
+    sizes = np.maximum.reduceat(points, starts) - np.minimum.reduceat(points, starts) + 1
+    return areas, sizes
+
+
+def _count_hardware_loop(points: np.ndarray, lengths: np.ndarray,
+                         min_area: float, max_area: float) -> int:
+    """
+    Per-contour area and aspect-ratio test behind _count_hardware.
+    
+    One pass over the concatenated contour points; compiled by numba
+    when it is installed.
+    """
+    count = 0
+    start = 0
+    for length in lengths:
+        end = start + length
+        doubled_area = 0
+        x_min = x_max = points[start, 0]
+        y_min = y_max = points[start, 1]
+        for i in range(start, end):
+            j = i + 1 if i + 1 < end else start
+            x, y = points[i, 0], points[i, 1]
+            doubled_area += x * points[j, 1] - points[j, 0] * y
+            x_min, x_max = min(x_min, x), max(x_max, x)
+            y_min, y_max = min(y_min, y), max(y_max, y)
+        start = end
+        
+        area = abs(doubled_area) / 2.0
+        w = x_max - x_min + 1
+        h = y_max - y_min + 1
+        if min_area < area < max_area and max(w, h) / min(w, h) < 3:
+            count += 1
+    
+    return count
+
+
+if NUMBA_AVAILABLE:
+    # Compiled for the one signature _count_hardware calls it with, at
+    # import rather than on the first door. numba's on-disk cache records
+    # the importing module's name, so only use it when imported from the
+    # package, not when run as a script
+    _count_hardware_loop = numba.njit("(int64[:, ::1], int64[::1], float64, float64)",
+                                      cache=__name__ != "__main__",
+                                      nogil=True)(_count_hardware_loop)
+
+
+def _count_hardware(contours, min_area: float, max_area: float) -> int:
+    """
+    Number of contours that look like door hardware: area strictly
+    between min_area and max_area and a relatively square/compact
+    bounding rect (aspect ratio below 3, not a long line).
+    
+    Crops usually have only a few contours, so the fixed cost per call
+    matters more than throughput. With numba this is one compiled loop,
+    otherwise the same test as NumPy array operations.
+    """
+    if len(contours) == 0:
+        return 0
+    
+    if NUMBA_AVAILABLE:
+        points = np.concatenate(contours).reshape(-1, 2).astype(np.int64)
+        lengths = np.array([len(c) for c in contours], dtype=np.int64)
+        return _count_hardware_loop(points, lengths, float(min_area), float(max_area))
+    
+    areas, rect_sizes = _contour_areas_and_sizes(contours)
+    aspect_ratios = rect_sizes.max(axis=1) / rect_sizes.min(axis=1)
+    is_hardware = (min_area < areas) & (areas < max_area) & (aspect_ratios < 3)
+    return int(np.count_nonzero(is_hardware))
+
 
 class DoorAnalyzer:
     """
@@ -38,6 +141,11 @@ class DoorAnalyzer:
         
         # Confidence adjustments
         self.base_confidence = 0.65
+        
+        # Grayscale and edge buffers reused while consecutive crops have
+        # the same size (e.g. the same door tracked across video frames);
+        # one pair per thread, so analyze() can run on several at once
+        self._buffers = threading.local()
     
     def analyze(self, image: np.ndarray, detection) -> List:
         """
@@ -62,13 +170,21 @@ class DoorAnalyzer:
         if width_violation:
             violations.append(width_violation)
         
+        # One grayscale conversion and edge map shared by both edge checks
+        buffers = self._buffers
+        if getattr(buffers, 'gray', None) is None or buffers.gray.shape != (height, width):
+            buffers.gray = np.empty((height, width), dtype=np.uint8)
+            buffers.edges = np.empty((height, width), dtype=np.uint8)
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY, dst=buffers.gray)
+        edges = cv2.Canny(gray, self.canny_low, self.canny_high, edges=buffers.edges)
+        
         # Analysis 2: Threshold detection via edge detection
-        threshold_violation = self._check_threshold(image, height, width)
+        threshold_violation = self._check_threshold(edges, height, width)
         if threshold_violation:
             violations.append(threshold_violation)
         
         # Analysis 3: Hardware detection
-        hardware_violation = self._check_hardware(image, height, width)
+        hardware_violation = self._check_hardware(edges, height, width)
         if hardware_violation:
             violations.append(hardware_violation)
         
@@ -117,29 +233,21 @@ class DoorAnalyzer:
             }
         }
     
-    def _check_threshold(self, image: np.ndarray, height: int, width: int) -> Dict:
+    def _check_threshold(self, edges: np.ndarray, height: int, width: int) -> Dict:
         """
         Detect raised thresholds using edge detection.
         
         Concept: Thresholds appear as horizontal edges at the bottom
-        of the door frame. We use Canny edge detection to find them.
+        of the door frame, so we look for them in the Canny edge map
+        of the door image.
         """
-        # Convert to grayscale
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        
-        # Apply Canny edge detection
-        edges = cv2.Canny(gray, self.canny_low, self.canny_high)
-        
         # Focus on bottom 15% of image (where threshold would be)
         bottom_section = edges[int(height * 0.85):, :]
         
-        # Count strong horizontal edges
-        horizontal_edges = 0
-        for row in bottom_section:
-            # Count continuous horizontal edges
-            edge_pixels = np.sum(row > 0)
-            if edge_pixels > width * 0.3:  # At least 30% of width
-                horizontal_edges += 1
+        # Count strong horizontal edges: rows with edge pixels across
+        # at least 30% of the width
+        row_counts = np.count_nonzero(bottom_section, axis=1)
+        horizontal_edges = int(np.count_nonzero(row_counts > width * 0.3))
         
         # If we detect strong horizontal edges at the bottom
         edge_density = horizontal_edges / bottom_section.shape[0] if bottom_section.shape[0] > 0 else 0
@@ -163,55 +271,41 @@ class DoorAnalyzer:
         
         return None
     
-    def _check_hardware(self, image: np.ndarray, height: int, width: int) -> Dict:
+    def _check_hardware(self, edges: np.ndarray, height: int, width: int) -> Dict:
         """
         Detect door hardware using contour analysis.
         
         Concept: Door handles, knobs, and levers create distinct
-        contours in the middle section of the door.
+        contours in the middle section of the door's edge map.
         """
-        # Convert to grayscale
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        
         # Focus on middle section (40-60% of height - typical handle location)
         middle_start = int(height * 0.4)
         middle_end = int(height * 0.6)
-        middle_section = gray[middle_start:middle_end, :]
-        
-        # Apply edge detection
-        edges = cv2.Canny(middle_section, self.canny_low, self.canny_high)
+        middle_edges = edges[middle_start:middle_end, :]
         
         # Find contours
-        contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        contours, _ = cv2.findContours(middle_edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
         
         # Look for hardware-like shapes (compact, not too small, not too large)
-        hardware_contours = []
         min_area = (width * height) * 0.002  # At least 0.2% of image
         max_area = (width * height) * 0.05   # At most 5% of image
         
-        for contour in contours:
-            area = cv2.contourArea(contour)
-            if min_area < area < max_area:
-                # Check if relatively compact (not a long line)
-                x, y, w, h = cv2.boundingRect(contour)
-                aspect_ratio = max(w, h) / min(w, h) if min(w, h) > 0 else 0
-                if aspect_ratio < 3:  # Relatively square/compact
-                    hardware_contours.append(contour)
+        hardware_count = _count_hardware(contours, min_area, max_area)
         
         # If very few hardware-like features detected
-        if len(hardware_contours) < 2:
+        if hardware_count < 2:
             confidence = 0.50  # Lower confidence - hard to detect from image
             
             return {
                 "type": "Door Hardware",
                 "severity": "Minor",
                 "ada_code": "404.2.7",
-                "description": f"Limited hardware features detected ({len(hardware_contours)} features found). Door hardware should be operable with one hand without tight grasping.",
+                "description": f"Limited hardware features detected ({hardware_count} features found). Door hardware should be operable with one hand without tight grasping.",
                 "recommendation": "Verify door hardware is lever-style or push-type, operable with closed fist. Replace round knobs or twist-style hardware.",
                 "confidence": confidence,
                 "detection_method": "rule_based_cv",
                 "measurements": {
-                    "hardware_features_detected": len(hardware_contours)
+                    "hardware_features_detected": hardware_count
                 }
             }
         
@@ -231,7 +325,7 @@ if __name__ == "__main__":
     
     # Create a test image (narrow door simulation)
     # Tall and narrow = high aspect ratio
-    test_image = np.ones((800, 250, 3), dtype=np.uint8) * 128
+    test_image = np.full((800, 250, 3), 128, dtype=np.uint8)
     
     class MockDetection:
         bbox = [0, 0, 250, 800]
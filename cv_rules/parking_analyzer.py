@@ -9,9 +9,142 @@ Techniques used:
 - Position analysis for sign height
 """
 
+import functools
 import cv2
 import numpy as np
-from typing import List, Dict
+from typing import List, Dict, Tuple
+
+# Try to import numba for the JIT-compiled color counting pass
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+@functools.lru_cache(maxsize=None)
+def _color_stats_kernels(blue_lower: Tuple[int, int, int], blue_upper: Tuple[int, int, int],
+                         white_lower: Tuple[int, int, int], white_upper: Tuple[int, int, int]):
+    """
+    Compile the color counting loops with one set of HSV bounds baked in.
+    
+    numba treats the closure's bound values as compile-time constants, so
+    the six range tests compare against immediates instead of loading
+    from bound arrays. Each set of bounds is compiled once per process
+    (and cached on disk like the other kernels); analyzers with the
+    default bounds share the same kernels.
+    
+    Returns:
+        (color_stats, color_stats_batch) compiled functions
+    """
+    (blue_h0, blue_s0, blue_v0), (blue_h1, blue_s1, blue_v1) = blue_lower, blue_upper
+    (white_h0, white_s0, white_v0), (white_h1, white_s1, white_v1) = white_lower, white_upper
+    
+    def color_stats(pixels, width):
+        """
+        Blue count, white count and sum of blue row indices in one pass.
+        
+        pixels is an HSV image flattened to (height * width, 3). Each
+        pixel is read once and tested against both ranges (bounds
+        inclusive, like cv2.inRange).
+        """
+        blue_pixels = 0
+        white_pixels = 0
+        blue_y_sum = 0
+        for y in range(pixels.shape[0] // width):
+            for i in range(y * width, (y + 1) * width):
+                h = pixels[i, 0]
+                s = pixels[i, 1]
+                v = pixels[i, 2]
+                if blue_h0 <= h <= blue_h1 and blue_s0 <= s <= blue_s1 and blue_v0 <= v <= blue_v1:
+                    blue_pixels += 1
+                    blue_y_sum += y
+                if white_h0 <= h <= white_h1 and white_s0 <= s <= white_s1 and white_v0 <= v <= white_v1:
+                    white_pixels += 1
+        return blue_pixels, white_pixels, blue_y_sum
+    
+    # numba's on-disk cache records the importing module's name, so only
+    # use it when imported from the package, not when run as a script
+    cache = __name__ != "__main__"
+    color_stats = numba.njit("(uint8[:, :], int64)", cache=cache, nogil=True)(color_stats)
+    
+    def color_stats_batch(pixels, offsets, widths):
+        """
+        color_stats for many crops packed into one pixel buffer.
+        
+        Crop k is pixels[offsets[k]:offsets[k + 1]] with widths[k]
+        columns. Crops are counted in parallel across threads.
+        
+        Returns:
+            (N, 3) int64 array of (blue_pixels, white_pixels, blue_y_sum)
+        """
+        stats = np.zeros((len(widths), 3), dtype=np.int64)
+        for k in numba.prange(len(widths)):
+            # Same loop as color_stats, written out here: calling the
+            # compiled color_stats from this closure would keep numba's
+            # disk cache from ever matching
+            width = widths[k]
+            blue_pixels = 0
+            white_pixels = 0
+            blue_y_sum = 0
+            for y in range((offsets[k + 1] - offsets[k]) // width):
+                for i in range(offsets[k] + y * width, offsets[k] + (y + 1) * width):
+                    h = pixels[i, 0]
+                    s = pixels[i, 1]
+                    v = pixels[i, 2]
+                    if blue_h0 <= h <= blue_h1 and blue_s0 <= s <= blue_s1 and blue_v0 <= v <= blue_v1:
+                        blue_pixels += 1
+                        blue_y_sum += y
+                    if white_h0 <= h <= white_h1 and white_s0 <= s <= white_s1 and white_v0 <= v <= white_v1:
+                        white_pixels += 1
+            stats[k, 0] = blue_pixels
+            stats[k, 1] = white_pixels
+            stats[k, 2] = blue_y_sum
+        return stats
+    
+    color_stats_batch = numba.njit("(uint8[:, ::1], int64[::1], int64[::1])", cache=cache,
+                                   nogil=True, parallel=True)(color_stats_batch)
+    return color_stats, color_stats_batch
+
+
+def _color_stats_numpy(hsv: np.ndarray, blue_lower: np.ndarray, blue_upper: np.ndarray,
+                       white_lower: np.ndarray, white_upper: np.ndarray):
+    """
+    Same counts as the numba color_stats kernel, from two cv2.inRange masks.
+    
+    The blue mask's binary moments give both its pixel count (m00) and
+    the sum of its row indices (m01) without listing pixel coordinates.
+    """
+    blue_mask = cv2.inRange(hsv, blue_lower, blue_upper)
+    white_mask = cv2.inRange(hsv, white_lower, white_upper)
+    moments = cv2.moments(blue_mask, binaryImage=True)
+    return int(moments['m00']), cv2.countNonZero(white_mask), int(moments['m01'])
+
+
+def _hsv_bound_array(value) -> np.ndarray:
+    """Read-only uint8 copy of an HSV bound."""
+    bound = np.array(value, dtype=np.uint8)
+    bound.flags.writeable = False
+    return bound
+
+
+def _hsv_bound(name: str) -> property:
+    """
+    ParkingAnalyzer property for one HSV bound.
+    
+    The bounds are compiled into the numba kernels, so they are stored
+    read-only and assigning a new bound rebuilds the kernels.
+    """
+    attr = '_' + name
+    
+    def get_bound(self) -> np.ndarray:
+        return getattr(self, attr)
+    
+    def set_bound(self, value) -> None:
+        setattr(self, attr, _hsv_bound_array(value))
+        self._build_color_kernels()
+    
+    return property(get_bound, set_bound, doc=f"HSV {name.replace('_', ' ')} bound (uint8, read-only)")
 
 
 class ParkingAnalyzer:
@@ -28,18 +161,61 @@ class ParkingAnalyzer:
         """Initialize parking analyzer with color thresholds."""
         # HSV ranges for blue (handicap sign background)
         # Blue in HSV: Hue ~100-130, Saturation >100, Value >50
-        self.blue_lower = np.array([90, 80, 50])
-        self.blue_upper = np.array([135, 255, 255])
+        # Bounds are uint8 like the HSV pixels, so neither cv2.inRange nor
+        # the numba kernels have to convert them on every call
+        self._blue_lower = _hsv_bound_array([90, 80, 50])
+        self._blue_upper = _hsv_bound_array([135, 255, 255])
         
         # HSV ranges for white (wheelchair symbol)
-        self.white_lower = np.array([0, 0, 180])
-        self.white_upper = np.array([180, 50, 255])
+        self._white_lower = _hsv_bound_array([0, 0, 180])
+        self._white_upper = _hsv_bound_array([180, 50, 255])
+        
+        # numba counting kernels with these bounds compiled in
+        self._build_color_kernels()
         
         # Detection thresholds
         self.min_blue_percentage = 0.05  # At least 5% blue
         self.min_white_percentage = 0.02  # At least 2% white
         
         self.base_confidence = 0.75
+        
+        # Fixed fields of each violation, built once; checks copy one and
+        # fill in description, confidence and measurements
+        self._no_blue_template = self._violation_template(
+            "Parking Signage", "Critical",
+            "Install accessible parking sign with International Symbol of Accessibility (blue background, white wheelchair symbol) at 60 inches minimum height above ground.")
+        self._no_white_template = self._violation_template(
+            "Wheelchair Symbol", "Critical",
+            "Verify sign includes white wheelchair symbol. Replace if symbol is missing or obscured.")
+        self._sign_height_template = self._violation_template(
+            "Sign Height", "Moderate",
+            "Verify sign mounting height with physical measurement. If below 60 inches, raise sign to compliant height.")
+    
+    blue_lower = _hsv_bound('blue_lower')
+    blue_upper = _hsv_bound('blue_upper')
+    white_lower = _hsv_bound('white_lower')
+    white_upper = _hsv_bound('white_upper')
+    
+    def _build_color_kernels(self) -> None:
+        """Get the numba counting kernels for the current HSV bounds."""
+        if NUMBA_AVAILABLE:
+            self._color_stats_loop, self._color_stats_batch_loop = _color_stats_kernels(
+                *(tuple(int(v) for v in bound) for bound in
+                  (self._blue_lower, self._blue_upper, self._white_lower, self._white_upper)))
+    
+    @staticmethod
+    def _violation_template(violation_type: str, severity: str, recommendation: str) -> Dict:
+        """Violation dict with the per-crop fields left as None, in report key order."""
+        return {
+            "type": violation_type,
+            "severity": severity,
+            "ada_code": "502.6",
+            "description": None,
+            "recommendation": recommendation,
+            "confidence": None,
+            "detection_method": "rule_based_cv",
+            "measurements": None
+        }
     
     def analyze(self, image: np.ndarray, detection) -> List:
         """
@@ -52,44 +228,98 @@ class ParkingAnalyzer:
         Returns:
             List of violation dictionaries
         """
-        violations = []
-        
         if image.size == 0:
-            return violations
+            return []
         
         height, width = image.shape[:2]
         
+        # One HSV conversion and color count shared by both checks
+        hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
+        return self._violations_from_stats(self._color_stats(hsv), height, width)
+    
+    def analyze_batch(self, images: List[np.ndarray], detections: List) -> List[List]:
+        """
+        Analyze several parking crops in one pass.
+        
+        All crops are converted to HSV into one shared buffer and counted
+        by a single call (in parallel across crops with numba) instead
+        of one analyze() call each. Results are the same as from analyze.
+        
+        Args:
+            images: Cropped parking images
+            detections: The matching detection objects
+            
+        Returns:
+            List of violation dictionaries for each image, in order
+        """
+        results = [[] for _ in images]
+        live = [k for k, image in enumerate(images) if image.size > 0]
+        if not live:
+            return results
+        
+        shapes = [images[k].shape[:2] for k in live]
+        offsets = np.zeros(len(live) + 1, dtype=np.int64)
+        np.cumsum([height * width for height, width in shapes], out=offsets[1:])
+        
+        # Each crop's HSV pixels written straight into its slice of the buffer
+        pixels = np.empty((offsets[-1], 3), dtype=np.uint8)
+        for k, (height, width), start, end in zip(live, shapes, offsets[:-1], offsets[1:]):
+            cv2.cvtColor(images[k], cv2.COLOR_BGR2HSV,
+                         dst=pixels[start:end].reshape(height, width, 3))
+        
+        if NUMBA_AVAILABLE:
+            widths = np.array([width for _, width in shapes], dtype=np.int64)
+            stats = self._color_stats_batch_loop(pixels, offsets, widths)
+        else:
+            stats = [self._color_stats(pixels[start:end].reshape(height, width, 3))
+                     for (height, width), start, end in zip(shapes, offsets[:-1], offsets[1:])]
+        
+        for k, (height, width), color_stats in zip(live, shapes, stats):
+            results[k] = self._violations_from_stats(tuple(int(n) for n in color_stats),
+                                                     height, width)
+        
+        return results
+    
+    def _violations_from_stats(self, color_stats: Tuple[int, int, int],
+                               height: int, width: int) -> List:
+        """Run both checks on one crop's color counts."""
+        violations = []
+        
         # Analysis 1: Check for blue handicap sign
-        sign_violation = self._check_signage(image, height, width)
+        sign_violation = self._check_signage(color_stats, height, width)
         if sign_violation:
             violations.append(sign_violation)
         
         # Analysis 2: Check sign position (if blue detected)
-        position_violation = self._check_sign_position(image, height, width)
+        position_violation = self._check_sign_position(color_stats, height, width)
         if position_violation:
             violations.append(position_violation)
         
         return violations
     
-    def _check_signage(self, image: np.ndarray, height: int, width: int) -> Dict:
+    def _color_stats(self, hsv: np.ndarray) -> Tuple[int, int, int]:
+        """
+        Count blue and white pixels of an HSV image.
+        
+        Returns:
+            (blue_pixels, white_pixels, blue_y_sum): pixels in the blue
+            and white ranges, and the sum of the blue pixels' row indices
+        """
+        if NUMBA_AVAILABLE:
+            return self._color_stats_loop(hsv.reshape(-1, 3), hsv.shape[1])
+        return _color_stats_numpy(hsv, self.blue_lower, self.blue_upper,
+                                  self.white_lower, self.white_upper)
+    
+    def _check_signage(self, color_stats: Tuple[int, int, int], height: int, width: int) -> Dict:
         """
         Detect handicap signage using color analysis.
         
         Concept: Handicap signs have distinctive blue background with
         white wheelchair symbol. We detect these colors in HSV space.
         """
-        # Convert to HSV color space
-        hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
-        
-        # Create mask for blue pixels
-        blue_mask = cv2.inRange(hsv, self.blue_lower, self.blue_upper)
-        blue_pixels = np.sum(blue_mask > 0)
-        blue_percentage = blue_pixels / blue_mask.size
-        
-        # Create mask for white pixels
-        white_mask = cv2.inRange(hsv, self.white_lower, self.white_upper)
-        white_pixels = np.sum(white_mask > 0)
-        white_percentage = white_pixels / white_mask.size
+        blue_pixels, white_pixels, _ = color_stats
+        blue_percentage = blue_pixels / (height * width)
+        white_percentage = white_pixels / (height * width)
         
         # Determine if signage is present
         has_blue = blue_percentage >= self.min_blue_percentage
@@ -97,83 +327,55 @@ class ParkingAnalyzer:
         
         if not has_blue:
             # No blue detected - likely missing sign
-            confidence = 0.80
-            
-            return {
-                "type": "Parking Signage",
-                "severity": "Critical",
-                "ada_code": "502.6",
-                "description": f"No blue signage detected (found {blue_percentage:.1%} blue pixels). Accessible parking spaces must display the International Symbol of Accessibility on a sign.",
-                "recommendation": "Install accessible parking sign with International Symbol of Accessibility (blue background, white wheelchair symbol) at 60 inches minimum height above ground.",
-                "confidence": confidence,
-                "detection_method": "rule_based_cv",
-                "measurements": {
-                    "blue_percentage": round(blue_percentage * 100, 1),
-                    "white_percentage": round(white_percentage * 100, 1),
-                    "required_blue_percentage": self.min_blue_percentage * 100
-                }
+            violation = self._no_blue_template.copy()
+            violation["description"] = f"No blue signage detected (found {blue_percentage:.1%} blue pixels). Accessible parking spaces must display the International Symbol of Accessibility on a sign."
+            violation["confidence"] = 0.80
+            violation["measurements"] = {
+                "blue_percentage": round(blue_percentage * 100, 1),
+                "white_percentage": round(white_percentage * 100, 1),
+                "required_blue_percentage": self.min_blue_percentage * 100
             }
+            return violation
         
         elif has_blue and not has_white:
             # Has blue but no white symbol
-            confidence = 0.70
-            
-            return {
-                "type": "Wheelchair Symbol",
-                "severity": "Critical",
-                "ada_code": "502.6",
-                "description": f"Blue sign detected but missing white wheelchair symbol (found {white_percentage:.1%} white). Sign must include International Symbol of Accessibility.",
-                "recommendation": "Verify sign includes white wheelchair symbol. Replace if symbol is missing or obscured.",
-                "confidence": confidence,
-                "detection_method": "rule_based_cv",
-                "measurements": {
-                    "blue_percentage": round(blue_percentage * 100, 1),
-                    "white_percentage": round(white_percentage * 100, 1)
-                }
+            violation = self._no_white_template.copy()
+            violation["description"] = f"Blue sign detected but missing white wheelchair symbol (found {white_percentage:.1%} white). Sign must include International Symbol of Accessibility."
+            violation["confidence"] = 0.70
+            violation["measurements"] = {
+                "blue_percentage": round(blue_percentage * 100, 1),
+                "white_percentage": round(white_percentage * 100, 1)
             }
+            return violation
         
         # If has both blue and white, signage appears present
         return None
     
-    def _check_sign_position(self, image: np.ndarray, height: int, width: int) -> Dict:
+    def _check_sign_position(self, color_stats: Tuple[int, int, int], height: int, width: int) -> Dict:
         """
         Check if sign is mounted at proper height.
         
         Concept: Signs should be in upper portion of image (mounted high).
         If blue is detected in lower portion, sign may be too low.
         """
-        # Convert to HSV
-        hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
-        
-        # Create blue mask
-        blue_mask = cv2.inRange(hsv, self.blue_lower, self.blue_upper)
-        
-        # Find where blue pixels are located
-        blue_positions = np.where(blue_mask > 0)
+        blue_pixels, _, blue_y_sum = color_stats
         
-        if len(blue_positions[0]) > 0:
+        if blue_pixels > 0:
             # Calculate average vertical position (0 = top, height = bottom)
-            avg_y_position = np.mean(blue_positions[0])
+            avg_y_position = blue_y_sum / blue_pixels
             relative_position = avg_y_position / height
             
             # Sign should be in upper 50% of image (mounted high)
             # If it's in the lower 40%, it might be too low
             if relative_position > 0.6:
-                confidence = 0.60  # Lower confidence - height hard to judge from single image
-                
-                return {
-                    "type": "Sign Height",
-                    "severity": "Moderate",
-                    "ada_code": "502.6",
-                    "description": f"Sign appears in lower portion of image (position: {relative_position:.0%} from top). ADA requires signs at 60 inches minimum above ground.",
-                    "recommendation": "Verify sign mounting height with physical measurement. If below 60 inches, raise sign to compliant height.",
-                    "confidence": confidence,
-                    "detection_method": "rule_based_cv",
-                    "measurements": {
-                        "vertical_position_percentage": round(relative_position * 100, 0),
-                        "required_height_inches": 60
-                    }
+                violation = self._sign_height_template.copy()
+                violation["description"] = f"Sign appears in lower portion of image (position: {relative_position:.0%} from top). ADA requires signs at 60 inches minimum above ground."
+                violation["confidence"] = 0.60  # Lower confidence - height hard to judge from single image
+                violation["measurements"] = {
+                    "vertical_position_percentage": round(relative_position * 100, 0),
+                    "required_height_inches": 60
                 }
+                return violation
         
         return None
 
@@ -190,7 +392,7 @@ if __name__ == "__main__":
     print(f"  White detection threshold: {analyzer.min_white_percentage:.1%}")
     
     # Test 1: Image with no blue (missing sign)
-    test_image_no_sign = np.ones((480, 640, 3), dtype=np.uint8) * 128
+    test_image_no_sign = np.full((480, 640, 3), 128, dtype=np.uint8)
     
     class MockDetection:
         bbox = [0, 0, 640, 480]
@@ -207,7 +409,7 @@ if __name__ == "__main__":
     # Test 2: Image with blue (has sign)
     test_image_with_sign = np.ones((480, 640, 3), dtype=np.uint8)
     test_image_with_sign[:,:,0] = 255  # Blue channel
-    test_image_with_sign[100:200, 250:350, :] = [255, 255, 255]  # White square (symbol)
+    test_image_with_sign[100:200, 250:350, :] = 255  # White square (symbol)
     
     violations2 = analyzer.analyze(test_image_with_sign, MockDetection())
     
@@ -9,9 +9,10 @@ Techniques used:
 - Spatial analysis for clearance
 """
 
+from bisect import bisect_left
 import cv2
 import numpy as np
-from typing import List, Dict
+from typing import List, Dict, Tuple
 
 
 class PathwayAnalyzer:
@@ -24,23 +25,38 @@ class PathwayAnalyzer:
     - Objects reducing clearance
     """
     
+    # Obstructions that are more likely to be problematic
+    high_risk_objects = frozenset({'chair', 'couch', 'bench', 'bicycle'})
+    high_risk_bonus = (0.0, 0.05)  # indexed by "is high risk"
+    
+    # Only the bounding box is analyzed, so callers pass the full frame
+    # instead of cropping it first
+    needs_crop = False
+    
+    # Severity and confidence by relative size: up to 30%, over 30%,
+    # over 50% of the frame (larger objects obstruct more)
+    size_thresholds = (0.3, 0.5)
+    size_severities = ("Moderate", "Moderate", "Critical")
+    size_confidences = (0.60, 0.65, 0.70)
+    
     def __init__(self):
         """Initialize pathway analyzer."""
         self.base_confidence = 0.60
         
-        # Objects that commonly obstruct pathways
-        self.obstruction_objects = [
+        # Objects that commonly obstruct pathways (a set, since every
+        # detection routed here is checked against it)
+        self.obstruction_objects = frozenset({
             'chair', 'couch', 'bench', 'potted_plant', 'vase',
             'suitcase', 'backpack', 'handbag', 'umbrella',
             'bicycle', 'motorcycle', 'fire_hydrant'
-        ]
+        })
     
     def analyze(self, image: np.ndarray, detection) -> List:
         """
         Analyze pathway area for ADA violations.
         
         Args:
-            image: Cropped image of detected object
+            image: Full frame the detection came from (only its size is used)
             detection: Detection object with bbox and class info
             
         Returns:
@@ -48,9 +64,6 @@ class PathwayAnalyzer:
         """
         violations = []
         
-        if image.size == 0:
-            return violations
-        
         # Check if this object type commonly obstructs pathways
         object_type = detection.class_name.lower()
         
@@ -58,62 +71,45 @@ class PathwayAnalyzer:
             return violations  # Not a typical obstruction
         
         # Analysis: Check if object is in potential pathway area
-        obstruction_violation = self._check_obstruction(image, detection)
+        obstruction_violation = self._check_obstruction(detection, image.shape[:2])
         if obstruction_violation:
             violations.append(obstruction_violation)
         
         return violations
     
-    def _check_obstruction(self, image: np.ndarray, detection) -> Dict:
+    def _check_obstruction(self, detection, frame_shape: Tuple[int, int]) -> Dict:
         """
         Determine if object obstructs accessible pathway.
         
         Concept: Objects in lower/center portions of image are more
         likely to be in walkways. Objects on edges/periphery less likely.
+        
+        Args:
+            detection: Detection object with bbox and class info
+            frame_shape: (height, width) of the full frame
         """
-        # Get object information
-        x, y, w, h = detection.bbox
+        # Get object information (detection.bbox is in full-frame pixels)
+        _, _, w, h = detection.bbox
         object_name = detection.class_name
+        height, width = frame_shape
         
-        # Calculate object center and relative position
-        # Note: detection.bbox is from the FULL image, not the crop
-        # So we need to work with the original bbox coordinates
-        
-        # For now, analyze based on the cropped image
-        height, width = image.shape[:2]
-        
-        # Estimate object position (center of bbox)
-        center_x = x + w / 2
-        center_y = y + h / 2
-        
-        # Calculate relative position in original frame
-        # (this is approximate - we're working with cropped region)
-        
-        # Object size relative to image
+        # Object size relative to the frame
         relative_size = (w * h) / (width * height) if (width * height) > 0 else 0
         
-        # Determine severity based on object type and size
-        severity = "Moderate"
-        confidence = 0.60
-        
-        # Larger objects are more likely to obstruct
-        if relative_size > 0.3:  # Takes up >30% of detected area
-            severity = "Moderate"
-            confidence = 0.65
-        elif relative_size > 0.5:  # Takes up >50% of detected area
-            severity = "Critical"
-            confidence = 0.70
+        # Determine severity based on object type and size: one table
+        # lookup instead of an if/elif ladder (bisect_left counts the
+        # thresholds strictly below relative_size)
+        size_class = bisect_left(self.size_thresholds, relative_size)
+        severity = self.size_severities[size_class]
+        confidence = self.size_confidences[size_class]
         
         # Specific object assessments
-        high_risk_objects = ['chair', 'couch', 'bench', 'bicycle']
-        if object_name.lower() in high_risk_objects:
-            # These are more likely to be problematic
-            confidence += 0.05
+        confidence += self.high_risk_bonus[object_name.lower() in self.high_risk_objects]
         
         description = f"{object_name.title()} detected in potential pathway area"
         
         if relative_size > 0.4:
-            description += f" (occupies {relative_size:.0%} of detected area)"
+            description += f" (occupies {relative_size:.0%} of the frame)"
         
         description += ". Objects may not protrude into accessible routes or reduce required 36-inch clear width."
         
@@ -143,7 +139,7 @@ if __name__ == "__main__":
     analyzer = PathwayAnalyzer()
     print(f"✓ Pathway analyzer initialized")
     print(f"  Obstruction object types: {len(analyzer.obstruction_objects)}")
-    print(f"  Examples: {', '.join(analyzer.obstruction_objects[:5])}")
+    print(f"  Examples: {', '.join(sorted(analyzer.obstruction_objects)[:5])}")
     
     # Mock detection object
     class MockDetection:
@@ -152,7 +148,7 @@ if __name__ == "__main__":
             self.bbox = bbox
     
     # Test 1: Chair in pathway
-    test_image = np.ones((480, 640, 3), dtype=np.uint8) * 128
+    test_image = np.full((480, 640, 3), 128, dtype=np.uint8)
     detection = MockDetection('chair', [100, 200, 150, 200])
     
     violations = analyzer.analyze(test_image, detection)
@@ -14,6 +14,14 @@ import numpy as np
 from typing import List, Dict, Tuple
 
 
+def _hough_lines(edges, **params) -> np.ndarray:
+    """cv2.HoughLinesP that also returns a NumPy array (or None) for UMat edges."""
+    lines = cv2.HoughLinesP(edges, **params)
+    if isinstance(lines, cv2.UMat):
+        lines = lines.get()
+    return lines
+
+
 class RampAnalyzer:
     """
     Analyzes ramps for ADA violations.
@@ -34,6 +42,22 @@ class RampAnalyzer:
         self.canny_low = 50
         self.canny_high = 150
         
+        # Crops are shrunk to this long edge before edge/line detection
+        # (None = full resolution); line angles don't depend on resolution,
+        # Canny and Hough cost does
+        self.max_line_image_dim = 256
+        
+        # Run the grayscale/resize/Canny/Hough chain through OpenCV's
+        # transparent API (cv2.UMat) so it is offloaded to an OpenCL
+        # device when there is one
+        self.use_opencl = cv2.ocl.haveOpenCL()
+        
+        # How the slope angle is estimated: "hough" takes the steepest
+        # diagonal HoughLinesP line; "gradient" the dominant direction of a
+        # Sobel orientation histogram (roughly 10x cheaper, accurate to a
+        # few degrees)
+        self.slope_method = "hough"
+        
         self.base_confidence = 0.55
     
     def analyze(self, image: np.ndarray, detection) -> List:
@@ -54,72 +78,56 @@ class RampAnalyzer:
         
         height, width = image.shape[:2]
         
+        # One grayscale conversion and edge map shared by both line checks,
+        # at reduced resolution for large crops
+        gray = cv2.cvtColor(cv2.UMat(image) if self.use_opencl else image, cv2.COLOR_BGR2GRAY)
+        scale = 1.0
+        if self.max_line_image_dim and max(height, width) > self.max_line_image_dim:
+            scale = self.max_line_image_dim / max(height, width)
+            gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            # Output size as cv2.resize computes it (a UMat has no .shape)
+            height, width = round(height * scale), round(width * scale)
+        edges = cv2.Canny(gray, self.canny_low, self.canny_high)
+        
         # Analysis 1: Check ramp slope
-        slope_violation = self._check_slope(image, height, width)
+        slope_violation = self._check_slope(edges, height, width, scale, gray)
         if slope_violation:
             violations.append(slope_violation)
         
         # Analysis 2: Check for handrails
-        handrail_violation = self._check_handrails(image, height, width)
+        handrail_violation = self._check_handrails(edges, height, width, scale)
         if handrail_violation:
             violations.append(handrail_violation)
         
         return violations
     
-    def _check_slope(self, image: np.ndarray, height: int, width: int) -> Dict:
+    def _check_slope(self, edges: np.ndarray, height: int, width: int,
+                     scale: float = 1.0, gray=None) -> Dict:
         """
-        Estimate ramp slope using line detection.
+        Estimate ramp slope from the angle of diagonal lines or edges.
         
-        Concept: Detect diagonal lines in the image and calculate their
-        angles. Steeper angles indicate steeper ramps.
+        height and width are the edge map's size, and scale its size
+        relative to the original crop, which the pixel-based settings are
+        scaled by. gray (the image the edges came from) is only needed
+        when slope_method is "gradient".
         """
-        # Convert to grayscale
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        
-        # Edge detection
-        edges = cv2.Canny(gray, self.canny_low, self.canny_high)
-        
-        # Detect lines using Hough Transform
-        lines = cv2.HoughLinesP(
-            edges,
-            rho=1,
-            theta=np.pi/180,
-            threshold=50,
-            minLineLength=int(min(width, height) * 0.2),
-            maxLineGap=20
-        )
-        
-        if lines is None or len(lines) == 0:
-            return None
-        
-        # Calculate angles of all detected lines
-        angles = []
-        for line in lines:
-            x1, y1, x2, y2 = line[0]
-            
-            # Calculate angle from horizontal
-            if x2 - x1 != 0:
-                angle = abs(np.degrees(np.arctan((y2 - y1) / (x2 - x1))))
-                
-                # We're interested in diagonal lines (not horizontal or vertical)
-                if 10 < angle < 80:  # Reasonable ramp angles
-                    angles.append(angle)
+        if self.slope_method == "gradient":
+            slope_angle = self._dominant_edge_angle(gray, scale)
+        else:
+            slope_angle = self._steepest_line_angle(edges, height, width, scale)
         
-        if len(angles) == 0:
+        if slope_angle is None:
             return None
         
-        # Find the steepest angle (most concerning)
-        steepest_angle = max(angles)
-        
         # Determine severity
-        if steepest_angle > self.max_slope_degrees:
+        if slope_angle > self.max_slope_degrees:
             severity = "Critical"
             confidence = 0.60
-            description = f"Detected diagonal line at {steepest_angle:.1f}° angle, exceeding ADA maximum slope of 4.76° (1:12 ratio)"
-        elif steepest_angle > self.warning_slope_degrees:
+            description = f"Detected diagonal line at {slope_angle:.1f}° angle, exceeding ADA maximum slope of 4.76° (1:12 ratio)"
+        elif slope_angle > self.warning_slope_degrees:
             severity = "Moderate"
             confidence = 0.55
-            description = f"Detected diagonal line at {steepest_angle:.1f}° angle, approaching ADA maximum slope of 4.76° (1:12 ratio)"
+            description = f"Detected diagonal line at {slope_angle:.1f}° angle, approaching ADA maximum slope of 4.76° (1:12 ratio)"
         else:
             return None  # Acceptable slope
         
@@ -132,36 +140,114 @@ class RampAnalyzer:
             "confidence": confidence,
             "detection_method": "rule_based_cv",
             "measurements": {
-                "detected_angle_degrees": round(steepest_angle, 1),
+                "detected_angle_degrees": round(slope_angle, 1),
                 "max_allowed_angle_degrees": 4.76,
                 "max_allowed_ratio": "1:12",
                 "max_allowed_percentage": 8.33
             }
         }
     
-    def _check_handrails(self, image: np.ndarray, height: int, width: int) -> Dict:
+    def _steepest_line_angle(self, edges: np.ndarray, height: int, width: int,
+                             scale: float) -> float:
         """
-        Detect handrails using parallel line detection.
+        Steepest diagonal line in the Canny edge map, in degrees from
+        horizontal (None if there is none).
         
-        Concept: Handrails appear as long parallel lines on the sides
-        of ramps. We look for these features on left and right edges.
+        Concept: Detect diagonal lines with the Hough transform and
+        calculate their angles. Steeper angles indicate steeper ramps.
         """
-        # Convert to grayscale
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        
-        # Edge detection
-        edges = cv2.Canny(gray, self.canny_low, self.canny_high)
+        # A line needs at least `threshold` edge pixels, so low-detail crops
+        # with fewer edge pixels in total are skipped without a Hough pass
+        threshold = max(1, round(50 * scale))
+        if cv2.countNonZero(edges) < threshold:
+            return None
         
-        # Detect lines
-        lines = cv2.HoughLinesP(
+        # Detect lines using Hough Transform
+        lines = _hough_lines(
             edges,
             rho=1,
             theta=np.pi/180,
-            threshold=40,
-            minLineLength=int(height * 0.3),  # At least 30% of image height
-            maxLineGap=30
+            threshold=threshold,
+            minLineLength=int(min(width, height) * 0.2),
+            maxLineGap=round(20 * scale)
         )
         
+        if lines is None or len(lines) == 0:
+            return None
+        
+        # Calculate angles from horizontal of all non-vertical lines at once
+        # (float32 is plenty for angles reported to 0.1°)
+        x1, y1, x2, y2 = lines.reshape(-1, 4).astype(np.float32).T
+        dx = x2 - x1
+        non_vertical = dx != 0
+        angles = np.abs(np.degrees(np.arctan((y2 - y1)[non_vertical] / dx[non_vertical])))
+        
+        # We're interested in diagonal lines (not horizontal or vertical)
+        angles = angles[(angles > 10) & (angles < 80)]  # Reasonable ramp angles
+        
+        if len(angles) == 0:
+            return None
+        
+        # Find the steepest angle (most concerning)
+        return float(angles.max())
+    
+    def _dominant_edge_angle(self, gray, scale: float) -> float:
+        """
+        Most common diagonal edge direction, in degrees from horizontal
+        (None if no diagonal direction has enough support).
+        
+        Concept: Every strong gradient pixel votes for the direction of
+        the edge through it (perpendicular to the gradient) in a 1°
+        histogram. Much cheaper than a Hough pass, but only accurate to a
+        few degrees, and it reports the dominant direction rather than
+        the steepest line.
+        """
+        # Light blur so the staircase of aliased lines doesn't pull the
+        # directions towards multiples of 45°
+        blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+        gx = cv2.Sobel(blurred, cv2.CV_32F, 1, 0)
+        gy = cv2.Sobel(blurred, cv2.CV_32F, 0, 1)
+        magnitude, direction = cv2.cartToPolar(gx, gy, angleInDegrees=True)
+        if isinstance(magnitude, cv2.UMat):
+            magnitude, direction = magnitude.get(), direction.get()
+        
+        # Gradient direction folded to the edge's angle from horizontal,
+        # 0 (horizontal edge) to 90 (vertical edge)
+        edge_angles = np.abs(90 - direction[magnitude > self.canny_high] % 180)
+        histogram = np.bincount(edge_angles.astype(np.int32), minlength=91)
+        
+        # Same diagonal range as the line check, and at least as many
+        # votes as a Hough line would need
+        diagonal = histogram[11:80]
+        best = int(diagonal.argmax())
+        if diagonal[best] < max(1, round(50 * scale)):
+            return None
+        return best + 11.5  # center of the 1° bin
+    
+    def _check_handrails(self, edges: np.ndarray, height: int, width: int,
+                         scale: float = 1.0) -> Dict:
+        """
+        Detect handrails using parallel line detection.
+        
+        Concept: Handrails appear as long parallel lines on the sides
+        of ramps. We look for these features on left and right edges
+        of the Canny edge map (height, width and scale as in _check_slope).
+        """
+        # Detect lines (none are possible with fewer edge pixels than the
+        # Hough threshold, as in _check_slope)
+        threshold = max(1, round(40 * scale))
+        if cv2.countNonZero(edges) < threshold:
+            lines = None
+        else:
+            lines = _hough_lines(
+                edges,
+                rho=1,
+                theta=np.pi/180,
+                threshold=threshold,
+                minLineLength=int(height * 0.3),  # At least 30% of image height
+                maxLineGap=round(30 * scale)
+            )
+        
         if lines is None:
             # No long lines detected - likely missing handrails
             confidence = 0.65
@@ -180,27 +266,19 @@ class RampAnalyzer:
                 }
             }
         
-        # Classify lines by position (left vs right side)
-        left_lines = []
-        right_lines = []
-        
-        for line in lines:
-            x1, y1, x2, y2 = line[0]
-            avg_x = (x1 + x2) / 2
-            
-            if avg_x < width * 0.3:  # Left third
-                left_lines.append(line)
-            elif avg_x > width * 0.7:  # Right third
-                right_lines.append(line)
+        # Classify lines by position (left vs right side) of their midpoint
+        avg_x = (lines[:, 0, 0] + lines[:, 0, 2]).astype(np.float32) * 0.5
+        left_count = int(np.count_nonzero(avg_x < width * 0.3))   # Left third
+        right_count = int(np.count_nonzero(avg_x > width * 0.7))  # Right third
         
         # Check if we have handrails on both sides
-        if len(left_lines) == 0 or len(right_lines) == 0:
+        if left_count == 0 or right_count == 0:
             confidence = 0.60
             
             missing = []
-            if len(left_lines) == 0:
+            if left_count == 0:
                 missing.append("left")
-            if len(right_lines) == 0:
+            if right_count == 0:
                 missing.append("right")
             
             return {
@@ -212,8 +290,8 @@ class RampAnalyzer:
                 "confidence": confidence,
                 "detection_method": "rule_based_cv",
                 "measurements": {
-                    "left_handrail_features": len(left_lines),
-                    "right_handrail_features": len(right_lines),
+                    "left_handrail_features": left_count,
+                    "right_handrail_features": right_count,
                     "required_handrails": 2
                 }
             }
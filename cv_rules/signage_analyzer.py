@@ -4,14 +4,160 @@ Signage Analyzer - CV Rules
 Analyzes signage for ADA compliance using computer vision.
 
 Techniques used:
-- LAB color space for luminance analysis
+- Grayscale luma for luminance analysis
 - Contrast ratio calculation
 - Texture analysis for tactile features
 """
 
+import functools
 import cv2
 import numpy as np
-from typing import List, Dict
+from typing import List, Dict, Tuple
+
+# Try to import numba for the JIT-compiled texture pass
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+def _texture_stats_numpy(gray: np.ndarray, patch_size: int, rows: int, cols: int) -> Tuple[float, float]:
+    """
+    Mean and max standard deviation of the rows x cols patches of gray,
+    with one std reduction over all patches at once.
+    """
+    patches = gray[:rows * patch_size, :cols * patch_size].reshape(
+        rows, patch_size, cols, patch_size).swapaxes(1, 2)
+    texture_scores = patches.reshape(rows * cols, patch_size * patch_size).std(axis=1)
+    return np.mean(texture_scores), np.max(texture_scores)
+
+
+@functools.lru_cache(maxsize=None)
+def _sign_stats_kernels(patch_size: int):
+    """
+    Compile the sign statistics loops with one patch size baked in.
+    
+    numba treats the closure's patch_size as a compile-time constant, so
+    the per-patch loops have fixed trip counts that LLVM can unroll and
+    vectorize. Each patch size is compiled once per process (and cached
+    on disk like the other kernels); analyzers with the default patch
+    size share the same kernels.
+    
+    Returns:
+        (sign_stats, sign_stats_batch) compiled functions
+    """
+    n = patch_size * patch_size
+    
+    def sign_stats(gray, rows, cols):
+        """
+        Darkest and lightest value of gray plus the same patch statistics
+        as _texture_stats_numpy, in one pass over the image: patches
+        accumulate exact integer sums and track min/max as they go, rows
+        of patches are spread over threads, and the pixels outside the
+        patch grid are only scanned for min/max.
+        """
+        height, width = gray.shape
+        total = 0.0
+        largest = 0.0
+        darkest = 255
+        lightest = 0
+        for r in numba.prange(rows):
+            for c in range(cols):
+                patch_sum = 0
+                patch_square_sum = 0
+                patch_min = 255
+                patch_max = 0
+                for y in range(r * patch_size, (r + 1) * patch_size):
+                    for x in range(c * patch_size, (c + 1) * patch_size):
+                        value = np.int64(gray[y, x])
+                        patch_sum += value
+                        patch_square_sum += value * value
+                        patch_min = min(patch_min, value)
+                        patch_max = max(patch_max, value)
+                std = np.sqrt(np.float64(n * patch_square_sum - patch_sum * patch_sum)) / n
+                total += std
+                largest = max(largest, std)
+                darkest = min(darkest, patch_min)
+                lightest = max(lightest, patch_max)
+        
+        # Right and bottom strips not covered by a full patch
+        for y in range(height):
+            start = cols * patch_size if y < rows * patch_size else 0
+            for x in range(start, width):
+                value = np.int64(gray[y, x])
+                darkest = min(darkest, value)
+                lightest = max(lightest, value)
+        
+        if rows == 0 or cols == 0:
+            return darkest, lightest, 0.0, 0.0
+        return darkest, lightest, total / (rows * cols), largest
+    
+    # numba's on-disk cache records the importing module's name, so only
+    # use it when imported from the package, not when run as a script
+    cache = __name__ != "__main__"
+    sign_stats = numba.njit("(uint8[:, :], int64, int64)", cache=cache, nogil=True,
+                            parallel=True)(sign_stats)
+    
+    def sign_stats_batch(pixels, offsets, widths):
+        """
+        sign_stats for many gray crops packed into one pixel buffer.
+        
+        Crop k is pixels[offsets[k]:offsets[k + 1]] with widths[k]
+        columns. Crops are measured in parallel across threads, each
+        one serially.
+        
+        Returns:
+            (N, 4) float64 array of (min, max, average texture, max texture)
+        """
+        stats = np.zeros((len(widths), 4), dtype=np.float64)
+        for k in numba.prange(len(widths)):
+            # Same loop as sign_stats, written out here: calling the
+            # compiled sign_stats from this closure would keep numba's
+            # disk cache from ever matching
+            width = widths[k]
+            height = (offsets[k + 1] - offsets[k]) // width
+            gray = pixels[offsets[k]:offsets[k + 1]].reshape((height, width))
+            rows = max(0, (height - 1) // patch_size)
+            cols = max(0, (width - 1) // patch_size)
+            total = 0.0
+            largest = 0.0
+            darkest = 255
+            lightest = 0
+            for r in range(rows):
+                for c in range(cols):
+                    patch_sum = 0
+                    patch_square_sum = 0
+                    patch_min = 255
+                    patch_max = 0
+                    for y in range(r * patch_size, (r + 1) * patch_size):
+                        for x in range(c * patch_size, (c + 1) * patch_size):
+                            value = np.int64(gray[y, x])
+                            patch_sum += value
+                            patch_square_sum += value * value
+                            patch_min = min(patch_min, value)
+                            patch_max = max(patch_max, value)
+                    std = np.sqrt(np.float64(n * patch_square_sum - patch_sum * patch_sum)) / n
+                    total += std
+                    largest = max(largest, std)
+                    darkest = min(darkest, patch_min)
+                    lightest = max(lightest, patch_max)
+            for y in range(height):
+                start = cols * patch_size if y < rows * patch_size else 0
+                for x in range(start, width):
+                    value = np.int64(gray[y, x])
+                    darkest = min(darkest, value)
+                    lightest = max(lightest, value)
+            stats[k, 0] = darkest
+            stats[k, 1] = lightest
+            if rows > 0 and cols > 0:
+                stats[k, 2] = total / (rows * cols)
+                stats[k, 3] = largest
+        return stats
+    
+    sign_stats_batch = numba.njit("(uint8[::1], int64[::1], int64[::1])", cache=cache,
+                                  nogil=True, parallel=True)(sign_stats_batch)
+    return sign_stats, sign_stats_batch
 
 
 class SignageAnalyzer:
@@ -30,8 +176,18 @@ class SignageAnalyzer:
         self.min_contrast_ratio = 3.0
         self.low_contrast_ratio = 2.5
         
+        # WCAG's 0.05 luminance offset on the 0-255 scale
+        self._wcag_offset = 0.05 * 255
+        
         # Texture detection for braille/raised features
         self.min_texture_stddev = 15.0
+        self.texture_patch_size = 20
+        
+        # Compiled statistics loops for this patch size (shared between
+        # analyzers with the same size)
+        if NUMBA_AVAILABLE:
+            self._sign_stats_loop, self._sign_stats_batch_loop = _sign_stats_kernels(
+                self.texture_patch_size)
         
         self.base_confidence = 0.60
     
@@ -46,42 +202,120 @@ class SignageAnalyzer:
         Returns:
             List of violation dictionaries
         """
-        violations = []
-        
         if image.size == 0:
-            return violations
+            return []
+        
+        # Grayscale luma (a weighted sum of B, G, R) instead of LAB's L:
+        # both are gamma-encoded and stay within ~10 levels of each other
+        # on neutral colors, and gray skips LAB's per-pixel cube roots.
+        # Converted once here and shared by both checks
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
         
-        height, width = image.shape[:2]
+        # Luminance range and patch standard deviations (texture indicator)
+        height, width = gray.shape
+        rows, cols = self._patch_grid(height, width)
+        if NUMBA_AVAILABLE:
+            # Both checks' statistics from a single pass over the crop
+            sign_stats = self._sign_stats_loop(gray, rows, cols)
+        else:
+            sign_stats = self._sign_stats_numpy(gray, rows, cols)
+        
+        return self._violations_from_stats(sign_stats, rows * cols > 0)
+    
+    def analyze_batch(self, images: List[np.ndarray], detections: List) -> List[List]:
+        """
+        Analyze several sign crops in one pass.
+        
+        All crops are converted to grayscale into one shared buffer and
+        measured by a single call (in parallel across crops with numba)
+        instead of one analyze() call each. Results are the same as from
+        analyze.
+        
+        Args:
+            images: Cropped sign images
+            detections: The matching detection objects
+            
+        Returns:
+            List of violation dictionaries for each image, in order
+        """
+        results = [[] for _ in images]
+        live = [k for k, image in enumerate(images) if image.size > 0]
+        if not live:
+            return results
+        
+        shapes = [images[k].shape[:2] for k in live]
+        offsets = np.zeros(len(live) + 1, dtype=np.int64)
+        np.cumsum([height * width for height, width in shapes], out=offsets[1:])
+        
+        # Each crop's gray pixels written straight into its slice of the buffer
+        pixels = np.empty(offsets[-1], dtype=np.uint8)
+        for k, (height, width), start, end in zip(live, shapes, offsets[:-1], offsets[1:]):
+            cv2.cvtColor(images[k], cv2.COLOR_BGR2GRAY,
+                         dst=pixels[start:end].reshape(height, width))
+        
+        grids = [self._patch_grid(height, width) for height, width in shapes]
+        if NUMBA_AVAILABLE:
+            widths = np.array([width for _, width in shapes], dtype=np.int64)
+            stats = self._sign_stats_batch_loop(pixels, offsets, widths)
+        else:
+            stats = [self._sign_stats_numpy(pixels[start:end].reshape(height, width), rows, cols)
+                     for (height, width), (rows, cols), start, end
+                     in zip(shapes, grids, offsets[:-1], offsets[1:])]
+        
+        for k, (rows, cols), sign_stats in zip(live, grids, stats):
+            results[k] = self._violations_from_stats(tuple(sign_stats), rows * cols > 0)
+        
+        return results
+    
+    def _patch_grid(self, height: int, width: int) -> Tuple[int, int]:
+        """
+        Rows and columns of texture patches: every full patch that starts
+        before the last patch_size pixels of each axis.
+        """
+        patch_size = self.texture_patch_size
+        return max(0, (height - 1) // patch_size), max(0, (width - 1) // patch_size)
+    
+    def _sign_stats_numpy(self, gray: np.ndarray, rows: int, cols: int) -> Tuple[float, float, float, float]:
+        """Same statistics as the numba kernels, from cv2.minMaxLoc and _texture_stats_numpy."""
+        min_luminance, max_luminance, _, _ = cv2.minMaxLoc(gray)
+        if rows == 0 or cols == 0:
+            return min_luminance, max_luminance, 0.0, 0.0
+        return (min_luminance, max_luminance,
+                *_texture_stats_numpy(gray, self.texture_patch_size, rows, cols))
+    
+    def _violations_from_stats(self, sign_stats: Tuple[float, float, float, float],
+                               has_patches: bool) -> List:
+        """Run both checks on one crop's luminance range and texture scores."""
+        violations = []
+        min_luminance, max_luminance, avg_texture, max_texture = sign_stats
         
         # Analysis 1: Check contrast
-        contrast_violation = self._check_contrast(image, height, width)
+        contrast_violation = self._check_contrast(min_luminance, max_luminance)
         if contrast_violation:
             violations.append(contrast_violation)
         
-        # Analysis 2: Check for tactile features (braille)
-        tactile_violation = self._check_tactile_features(image, height, width)
-        if tactile_violation:
-            violations.append(tactile_violation)
+        # Analysis 2: Check for tactile features (braille), needs at least one patch
+        if has_patches:
+            tactile_violation = self._check_tactile_features(avg_texture, max_texture)
+            if tactile_violation:
+                violations.append(tactile_violation)
         
         return violations
     
-    def _check_contrast(self, image: np.ndarray, height: int, width: int) -> Dict:
+    def _check_contrast(self, min_luminance: float, max_luminance: float) -> Dict:
         """
         Calculate contrast ratio using luminance analysis.
         
-        Concept: Convert to LAB color space where L channel represents
-        luminance. Calculate contrast ratio between lightest and darkest areas.
+        Concept: The grayscale luma of the sign stands in for luminance.
+        Calculate contrast ratio between lightest and darkest areas.
         """
-        # Convert to LAB color space (better for luminance analysis)
-        lab = cv2.cvtColor(image, cv2.COLOR_BGR2LAB)
-        l_channel = lab[:, :, 0]
-        
-        # Calculate luminance statistics
-        max_luminance = np.max(l_channel)
-        min_luminance = np.min(l_channel)
+        # Contrast ratio using WCAG formula
+        # (L1 + 0.05) / (L2 + 0.05) where L1 > L2, on 0-1 luminances;
+        # on 0-255 values that is (max + 12.75) / (min + 12.75), so the
+        # common acceptable case is decided by one multiply, no divide
+        if max_luminance + self._wcag_offset >= self.min_contrast_ratio * (min_luminance + self._wcag_offset):
+            return None  # Acceptable contrast
         
-        # Calculate contrast ratio using WCAG formula
-        # (L1 + 0.05) / (L2 + 0.05) where L1 > L2
         # Normalize to 0-1 range first
         l1 = max_luminance / 255.0
         l2 = min_luminance / 255.0
@@ -116,35 +350,14 @@ class SignageAnalyzer:
             }
         }
     
-    def _check_tactile_features(self, image: np.ndarray, height: int, width: int) -> Dict:
+    def _check_tactile_features(self, avg_texture: float, max_texture: float) -> Dict:
         """
         Detect tactile features (braille) using texture analysis.
         
         Concept: Braille and raised text create texture variations.
         Smooth surfaces have low standard deviation, textured surfaces high.
+        Takes the average and largest standard deviation over the patches.
         """
-        # Convert to grayscale
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        
-        # Divide image into small patches
-        patch_size = 20
-        texture_scores = []
-        
-        for y in range(0, height - patch_size, patch_size):
-            for x in range(0, width - patch_size, patch_size):
-                patch = gray[y:y+patch_size, x:x+patch_size]
-                
-                # Calculate standard deviation (texture indicator)
-                std_dev = np.std(patch)
-                texture_scores.append(std_dev)
-        
-        if len(texture_scores) == 0:
-            return None
-        
-        # Calculate average texture
-        avg_texture = np.mean(texture_scores)
-        max_texture = np.max(texture_scores)
-        
         # Low texture = smooth surface = likely no braille
         if avg_texture < self.min_texture_stddev and max_texture < 25.0:
             confidence = 0.55  # Lower confidence - hard to detect from photo
@@ -181,9 +394,8 @@ if __name__ == "__main__":
     print(f"  Min texture threshold: {analyzer.min_texture_stddev}")
     
     # Test 1: Low contrast (gray on gray)
-    test_image_low_contrast = np.ones((200, 400, 3), dtype=np.uint8)
-    test_image_low_contrast[:, :] = [100, 100, 100]  # Dark gray background
-    test_image_low_contrast[50:150, 100:300] = [130, 130, 130]  # Slightly lighter gray "text"
+    test_image_low_contrast = np.full((200, 400, 3), 100, dtype=np.uint8)  # Dark gray background
+    test_image_low_contrast[50:150, 100:300] = 130  # Slightly lighter gray "text"
     
     class MockDetection:
         bbox = [0, 0, 400, 200]
@@ -203,7 +415,7 @@ if __name__ == "__main__":
     
     # Test 2: High contrast (white on black)
     test_image_high_contrast = np.zeros((200, 400, 3), dtype=np.uint8)  # Black
-    test_image_high_contrast[50:150, 100:300] = [255, 255, 255]  # White "text"
+    test_image_high_contrast[50:150, 100:300] = 255  # White "text"
     
     violations2 = analyzer.analyze(test_image_high_contrast, MockDetection())
     
@@ -6,7 +6,7 @@ Updated to use modular analyzer architecture.
 Can now easily switch between different analyzer types.
 
 Usage:
-    python3 demo.py <path_to_image> [--analyzer rule_based|claude|hybrid]
+    python3 demo.py <path_to_image> [<path_to_image> ...] [--analyzer rule_based|claude|hybrid]
     
 Example:
     python3 demo.py test_images/store_entrance.jpg
@@ -15,14 +15,37 @@ Example:
 
 import sys
 from pathlib import Path
-import json
 import argparse
+from collections import Counter
 
 import config
-from video_processor import process_image_file
-from object_detector import ObjectDetector
-from compliance_analyzer import ComplianceAnalyzer
-from visualizer import ViolationVisualizer
+
+
+def flatten_violations(violations_data: dict) -> dict:
+    """
+    Flatten per-detection results into columns, one row per violation.
+    
+    Walking the nested results once and keeping plain lists per field
+    lets the summary, the detailed listing and the JSON breakdown all
+    read the same columns instead of re-walking every detection.
+    """
+    columns = {
+        "detection": [], "object": [], "severity": [], "type": [], "ada_code": [],
+        "description": [], "recommendation": [], "detection_method": []
+    }
+    
+    for det_key, det_data in violations_data.items():
+        for v in det_data['violations']:
+            columns["detection"].append(det_key)
+            columns["object"].append(det_data['object'])
+            columns["severity"].append(v['severity'])
+            columns["type"].append(v['type'])
+            columns["ada_code"].append(v['ada_code'])
+            columns["description"].append(v['description'])
+            columns["recommendation"].append(v['recommendation'])
+            columns["detection_method"].append(v.get('detection_method', 'unknown'))
+    
+    return columns
 
 
 def print_header():
@@ -42,7 +65,10 @@ def print_section(title):
 
 def run_demo(image_path: str, 
              use_real_yolo: bool = True,
-             analyzer_type: str = 'rule_based'):
+             analyzer_type: str = 'rule_based',
+             detector=None,
+             analyzer=None,
+             visualizer=None):
     """
     Run the complete ADA compliance analysis demo.
     
@@ -51,6 +77,10 @@ def run_demo(image_path: str,
         use_real_yolo: If True, use real YOLOv8 (set to True for competition!)
         analyzer_type: Type of analyzer to use
                       Options: 'rule_based', 'claude', 'hybrid'
+        detector: ObjectDetector to reuse (e.g. across several images),
+                  or None to create one
+        analyzer: ComplianceAnalyzer to reuse, or None to create one
+        visualizer: ViolationVisualizer to reuse, or None to create one
     """
     print_header()
     
@@ -60,6 +90,14 @@ def run_demo(image_path: str,
         print(f"❌ Error: Image not found: {image_path}")
         return
     
+    # Heavy modules (OpenCV, YOLO, the analyzers) are imported only once
+    # there is an image to analyze, so --help and bad paths answer at once
+    from video_processor import process_image_file
+    from object_detector import ObjectDetector
+    from compliance_analyzer import ComplianceAnalyzer
+    from visualizer import ViolationVisualizer
+    import output_writer
+    
     print(f"📸 Analyzing: {img_path.name}")
     print(f"📍 Location: {img_path.parent}")
     print(f"🔧 Analyzer: {analyzer_type}")
@@ -79,7 +117,8 @@ def run_demo(image_path: str,
     print_section("STEP 2: Detecting Accessibility Features (YOLOv8)")
     print("Running object detection model...")
     
-    detector = ObjectDetector(use_mock=not use_real_yolo)
+    if detector is None:
+        detector = ObjectDetector(use_mock=not use_real_yolo)
     all_detections = detector.detect(image)
     
     print(f"\n✓ Detection complete!")
@@ -103,17 +142,19 @@ def run_demo(image_path: str,
     print(f"Analyzing each detected feature using {analyzer_type} analyzer...")
     
     # Create analyzer with specified type
-    analyzer = ComplianceAnalyzer(
-        use_mock=False,
-        analyzer_type=analyzer_type
-    )
+    if analyzer is None:
+        analyzer = ComplianceAnalyzer(
+            use_mock=False,
+            analyzer_type=analyzer_type
+        )
     
     violations_data = analyzer.analyze_all_detections(image, relevant_detections)
     
     # Count violations
-    total_violations = sum(
-        len(d['violations']) for d in violations_data.values()
-    )
+    violation_table = flatten_violations(violations_data)
+    total_violations = len(violation_table["severity"])
+    severity_counts = {"Critical": 0, "Moderate": 0, "Minor": 0}
+    severity_counts.update(Counter(violation_table["severity"]))
     
     print(f"\n✓ Analysis complete!")
     print(f"  Total violations found: {total_violations}")
@@ -121,28 +162,25 @@ def run_demo(image_path: str,
     # Show violation details
     if total_violations > 0:
         print("\n  Violation Summary:")
-        severity_counts = {"Critical": 0, "Moderate": 0, "Minor": 0}
-        
-        for det_data in violations_data.values():
-            for v in det_data['violations']:
-                severity = v['severity']
-                severity_counts[severity] += 1
-        
         print(f"    🔴 Critical:  {severity_counts['Critical']}")
         print(f"    🟠 Moderate:  {severity_counts['Moderate']}")
         print(f"    🟡 Minor:     {severity_counts['Minor']}")
         
         print("\n  Detailed Violations:")
-        for det_key, det_data in violations_data.items():
-            if det_data['violations']:
-                print(f"\n    {det_data['object'].upper()}:")
-                for v in det_data['violations']:
-                    icon = {"Critical": "🔴", "Moderate": "🟠", "Minor": "🟡"}[v['severity']]
-                    print(f"      {icon} [{v['severity']}] {v['type']}")
-                    print(f"         ADA Code: {v['ada_code']}")
-                    print(f"         Issue: {v['description']}")
-                    print(f"         Fix: {v['recommendation']}")
-                    print(f"         Method: {v.get('detection_method', 'unknown')}")
+        icons = {"Critical": "🔴", "Moderate": "🟠", "Minor": "🟡"}
+        lines = []
+        previous = None
+        for row in zip(*violation_table.values()):
+            det_key, obj, severity, v_type, ada_code, description, fix, method = row
+            if det_key != previous:
+                lines.append(f"\n    {obj.upper()}:")
+                previous = det_key
+            lines.append(f"      {icons[severity]} [{severity}] {v_type}")
+            lines.append(f"         ADA Code: {ada_code}")
+            lines.append(f"         Issue: {description}")
+            lines.append(f"         Fix: {fix}")
+            lines.append(f"         Method: {method}")
+        print("\n".join(lines))
     else:
         print("  ✓ No violations detected - location appears compliant!")
     
@@ -150,7 +188,8 @@ def run_demo(image_path: str,
     print_section("STEP 4: Generating Visual Reports")
     print("Creating annotated images...")
     
-    visualizer = ViolationVisualizer()
+    if visualizer is None:
+        visualizer = ViolationVisualizer()
     
     # Create detailed report
     report_path = config.OUTPUTS_DIR / f"{img_path.stem}_report.jpg"
@@ -178,19 +217,15 @@ def run_demo(image_path: str,
         "detections": len(relevant_detections),
         "violations": total_violations,
         "severity_breakdown": {
-            "critical": sum(1 for d in violations_data.values() 
-                          for v in d['violations'] if v['severity'] == 'Critical'),
-            "moderate": sum(1 for d in violations_data.values() 
-                          for v in d['violations'] if v['severity'] == 'Moderate'),
-            "minor": sum(1 for d in violations_data.values() 
-                       for v in d['violations'] if v['severity'] == 'Minor')
+            "critical": severity_counts["Critical"],
+            "moderate": severity_counts["Moderate"],
+            "minor": severity_counts["Minor"]
         },
         "detailed_results": violations_data
     }
     
     json_path = config.OUTPUTS_DIR / f"{img_path.stem}_report.json"
-    with open(json_path, 'w') as f:
-        json.dump(report_data, f, indent=2)
+    output_writer.write_json(json_path, report_data)
     
     print(f"✓ JSON report saved: {json_path}")
     
@@ -219,11 +254,12 @@ Examples:
   python3 demo.py test_images/store.jpg --analyzer rule_based
   python3 demo.py test_images/store.jpg --analyzer claude
   python3 demo.py test_images/store.jpg --yolo mock --analyzer claude
+  python3 demo.py test_images/*.jpg --yolo mock
         """
     )
     
-    parser.add_argument('image', 
-                       help='Path to image file to analyze')
+    parser.add_argument('images', metavar='image', nargs='+',
+                       help='Path(s) to image file(s) to analyze')
     
     parser.add_argument('--analyzer', 
                        choices=['rule_based', 'claude', 'hybrid'],
@@ -237,9 +273,11 @@ Examples:
     
     args = parser.parse_args()
     
-    # Check if image exists
-    if not Path(args.image).exists():
-        print(f"❌ Error: Image not found: {args.image}")
+    # Check if images exist
+    missing = [image for image in args.images if not Path(image).exists()]
+    if missing:
+        for image in missing:
+            print(f"❌ Error: Image not found: {image}")
         print("\nAvailable test images:")
         
         test_images = list(config.TEST_IMAGES_DIR.glob("*.jpg")) + \
@@ -253,14 +291,36 @@ Examples:
         
         sys.exit(1)
     
-    # Run demo
+    from object_detector import ObjectDetector
+    from compliance_analyzer import ComplianceAnalyzer
+    from visualizer import ViolationVisualizer
+    import output_writer
+    import cv2
+    
+    # Detection, drawing and the CV analyzers all run through OpenCV
+    cv2.setUseOptimized(True)
+    cv2.setNumThreads(config.OPENCV_THREADS)
+    print(f"ℹ OpenCV {cv2.__version__}: optimized code {'on' if cv2.useOptimized() else 'off'}, "
+          f"{cv2.getNumThreads()} threads")
+    
+    # Run demo, loading the model and analyzer once for all images
     use_real_yolo = (args.yolo == 'real')
+    detector = ObjectDetector(use_mock=not use_real_yolo)
+    analyzer = ComplianceAnalyzer(use_mock=False, analyzer_type=args.analyzer)
+    visualizer = ViolationVisualizer()
     
-    run_demo(
-        args.image,
-        use_real_yolo=use_real_yolo,
-        analyzer_type=args.analyzer
-    )
+    for image in args.images:
+        run_demo(
+            image,
+            use_real_yolo=use_real_yolo,
+            analyzer_type=args.analyzer,
+            detector=detector,
+            analyzer=analyzer,
+            visualizer=visualizer
+        )
+    
+    # Make sure queued reports are on disk before exiting
+    output_writer.flush()
 
 
 if __name__ == "__main__":
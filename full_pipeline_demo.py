@@ -12,14 +12,79 @@ This demonstrates the FULL pipeline:
 This is what will run during your competition demo!
 """
 
-import json
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 import config
-from video_processor import process_image_file
-from object_detector import ObjectDetector, visualize_detections
-from compliance_analyzer import ComplianceAnalyzer
 
+# OpenCV, YOLO and the analyzers are imported inside the functions that
+# use them, so the script starts (and reports missing images) quickly
 
-def run_full_analysis(image_path: str, use_real_models: bool = False):
+
+def prefetch_images(image_paths, depth: int = 2):
+    """
+    Yield (path, image) pairs, loading upcoming images in the background.
+    
+    While the caller runs detection on one image, the next ones are read
+    and decoded on worker threads. At most `depth` decoded images wait in
+    the queue, so memory stays bounded on large directories.
+    
+    Args:
+        image_paths: Paths of the images to load, in order
+        depth: Number of images to keep loading ahead
+    """
+    from video_processor import process_image_file
+    
+    paths = iter(image_paths)
+    pending = queue.Queue(maxsize=depth)
+    
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        for path in paths:
+            pending.put((path, executor.submit(process_image_file, str(path))))
+            if pending.full():
+                break
+        
+        while not pending.empty():
+            path, future = pending.get()
+            next_path = next(paths, None)
+            if next_path is not None:
+                pending.put((next_path, executor.submit(process_image_file, str(next_path))))
+            yield path, future.result()
+
+
+# Severity markers for the violations listing
+SEVERITY_EMOJI = {"Critical": "🔴", "Moderate": "🟠", "Minor": "🟡"}
+
+
+def format_violation_details(analysis_results: dict):
+    """
+    Count all violations and build their printable listing in one walk.
+    
+    Returns:
+        (total_violations, lines) where lines is the detail listing
+    """
+    total = 0
+    lines = []
+    for result in analysis_results.values():
+        violations = result['violations']
+        if not violations:
+            continue
+        
+        total += len(violations)
+        lines.append(f"\n{result['object'].upper()} - {len(violations)} violation(s):")
+        for v in violations:
+            lines.append(f"  {SEVERITY_EMOJI.get(v['severity'], '⚪')} [{v['severity']}] {v['type']}")
+            lines.append(f"     ADA Code: {v['ada_code']}")
+            lines.append(f"     Issue: {v['description']}")
+            lines.append(f"     Fix: {v['recommendation']}")
+            lines.append(f"     Confidence: {v['confidence']:.0%}")
+    
+    return total, lines
+
+
+def run_full_analysis(image_path: str, use_real_models: bool = False,
+                      image=None, detector=None, analyzer=None,
+                      output_name: str = "full_analysis"):
     """
     Run complete ADA compliance analysis on an image.
     
@@ -27,10 +92,20 @@ def run_full_analysis(image_path: str, use_real_models: bool = False):
         image_path: Path to image file
         use_real_models: If True, use real YOLO + Claude API
                         If False, use mock versions (for testing)
+        image: Already loaded image (e.g. from prefetch_images), or None
+               to load it from image_path
+        detector: ObjectDetector to reuse, or None to create one
+        analyzer: ComplianceAnalyzer to reuse, or None to create one
+        output_name: Prefix for the annotated image and JSON report
     
     Returns:
         Dictionary with all results
     """
+    from video_processor import process_image_file
+    from object_detector import ObjectDetector, visualize_detections
+    from compliance_analyzer import ComplianceAnalyzer
+    import output_writer
+    
     print("=" * 80)
     print("ADA COMPLIANCE DETECTION SYSTEM - FULL ANALYSIS")
     print("=" * 80)
@@ -38,13 +113,15 @@ def run_full_analysis(image_path: str, use_real_models: bool = False):
     # STEP 1: Load Image
     print("\n[STEP 1/5] Loading image...")
     print("-" * 80)
-    image = process_image_file(image_path)
+    if image is None:
+        image = process_image_file(image_path)
     print(f"✓ Image loaded: {image.shape[1]}x{image.shape[0]} pixels")
     
     # STEP 2: Object Detection
     print("\n[STEP 2/5] Detecting accessibility features...")
     print("-" * 80)
-    detector = ObjectDetector(use_mock=not use_real_models)
+    if detector is None:
+        detector = ObjectDetector(use_mock=not use_real_models)
     all_detections = detector.detect(image)
     print(f"✓ Total detections: {len(all_detections)}")
     
@@ -61,11 +138,12 @@ def run_full_analysis(image_path: str, use_real_models: bool = False):
     # STEP 3: ADA Compliance Analysis
     print("\n[STEP 3/5] Analyzing for ADA violations...")
     print("-" * 80)
-    analyzer = ComplianceAnalyzer(use_mock=not use_real_models)
+    if analyzer is None:
+        analyzer = ComplianceAnalyzer(use_mock=not use_real_models)
     analysis_results = analyzer.analyze_all_detections(image, relevant_detections)
     
-    # Count total violations
-    total_violations = sum(len(r['violations']) for r in analysis_results.values())
+    # Count violations and format their details in one pass
+    total_violations, detail_lines = format_violation_details(analysis_results)
     print(f"\n✓ Analysis complete: {total_violations} potential violation(s) found")
     
     # STEP 4: Generate Visual Report
@@ -73,7 +151,7 @@ def run_full_analysis(image_path: str, use_real_models: bool = False):
     print("-" * 80)
     
     # Create annotated image with detections
-    output_image_path = str(config.OUTPUTS_DIR / "full_analysis_annotated.jpg")
+    output_image_path = str(config.OUTPUTS_DIR / f"{output_name}_annotated.jpg")
     annotated_image = visualize_detections(image, relevant_detections, output_image_path)
     print(f"✓ Annotated image saved: {output_image_path}")
     
@@ -106,9 +184,8 @@ def run_full_analysis(image_path: str, use_real_models: bool = False):
     }
     
     # Save as JSON
-    report_path = config.OUTPUTS_DIR / "full_analysis_report.json"
-    with open(report_path, 'w') as f:
-        json.dump(report, f, indent=2)
+    report_path = config.OUTPUTS_DIR / f"{output_name}_report.json"
+    output_writer.write_json(report_path, report)
     print(f"✓ JSON report saved: {report_path}")
     
     # Print summary
@@ -126,22 +203,7 @@ def run_full_analysis(image_path: str, use_real_models: bool = False):
         print("\n" + "-" * 80)
         print("VIOLATIONS DETAIL:")
         print("-" * 80)
-        
-        for det_key, result in analysis_results.items():
-            if result['violations']:
-                print(f"\n{result['object'].upper()} - {len(result['violations'])} violation(s):")
-                for v in result['violations']:
-                    severity_emoji = {
-                        "Critical": "🔴",
-                        "Moderate": "🟠", 
-                        "Minor": "🟡"
-                    }.get(v['severity'], "⚪")
-                    
-                    print(f"  {severity_emoji} [{v['severity']}] {v['type']}")
-                    print(f"     ADA Code: {v['ada_code']}")
-                    print(f"     Issue: {v['description']}")
-                    print(f"     Fix: {v['recommendation']}")
-                    print(f"     Confidence: {v['confidence']:.0%}")
+        print("\n".join(detail_lines))
     else:
         print("\n✓ No violations detected - location appears ADA compliant!")
     
@@ -150,6 +212,37 @@ def run_full_analysis(image_path: str, use_real_models: bool = False):
     return report
 
 
+def run_directory_analysis(image_paths, use_real_models: bool = False):
+    """
+    Run the full analysis on several images.
+    
+    Images are prefetched on a background thread so disk reads and
+    decoding overlap with detection and analysis of the previous image.
+    The detector and analyzer are created once and shared.
+    
+    Args:
+        image_paths: Paths of the images to analyze
+        use_real_models: If True, use real YOLO + Claude API
+    
+    Returns:
+        List of report dictionaries, one per image
+    """
+    from object_detector import ObjectDetector
+    from compliance_analyzer import ComplianceAnalyzer
+    
+    detector = ObjectDetector(use_mock=not use_real_models)
+    analyzer = ComplianceAnalyzer(use_mock=not use_real_models)
+    
+    reports = []
+    for path, image in prefetch_images(image_paths):
+        reports.append(run_full_analysis(
+            str(path), use_real_models, image=image,
+            detector=detector, analyzer=analyzer,
+            output_name=f"full_analysis_{Path(path).stem}"
+        ))
+    return reports
+
+
 if __name__ == "__main__":
     """
     Run the full analysis on test image.
@@ -158,22 +251,39 @@ if __name__ == "__main__":
     """
     import sys
     
-    # Check for test images
-    test_images = list(config.TEST_IMAGES_DIR.glob("*.jpg")) + \
-                 list(config.TEST_IMAGES_DIR.glob("*.png"))
+    # Image paths can be given on the command line; otherwise test_images/
+    # is used. Several images share one detector and analyzer
+    image_paths = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
     
-    if not test_images:
-        print("No test images found in test_images/")
-        print("Please add some test images and try again.")
-        sys.exit(1)
-    
-    # Use the first test image (or specify one)
-    test_image = test_images[0]
-    
-    print(f"Running full analysis on: {test_image.name}\n")
+    if image_paths:
+        print(f"Running full analysis on {len(image_paths)} image(s)\n")
+        reports = run_directory_analysis(image_paths, use_real_models=False)
+    else:
+        # Check for test images
+        test_images = list(config.TEST_IMAGES_DIR.glob("*.jpg")) + \
+                     list(config.TEST_IMAGES_DIR.glob("*.png"))
+        
+        if not test_images:
+            print("No test images found in test_images/")
+            print("Please add some test images and try again.")
+            sys.exit(1)
+        
+        if "--all" in sys.argv:
+            # Analyze every test image, prefetching the next while one runs
+            print(f"Running full analysis on {len(test_images)} images\n")
+            reports = run_directory_analysis(test_images, use_real_models=False)
+        else:
+            # Use the first test image (or specify one)
+            test_image = test_images[0]
+            
+            print(f"Running full analysis on: {test_image.name}\n")
+            
+            # Run analysis (using mock models for demo)
+            report = run_full_analysis(str(test_image), use_real_models=False)
     
-    # Run analysis (using mock models for demo)
-    report = run_full_analysis(str(test_image), use_real_models=False)
+    # Make sure queued images and reports are on disk before exiting
+    import output_writer
+    output_writer.flush()
     
     print("\n✓ Full pipeline test complete!")
     print("\nFor your competition demo:")
@@ -14,13 +14,18 @@ Technical Terms:
 - Class: What type of object (door, car, person, etc.)
 """
 
+import ast
+import sys
 import cv2
 import numpy as np
 from dataclasses import dataclass
+from pathlib import Path
 from typing import List, Dict, Tuple
 import config
+import output_writer
+from bbox_utils import classify_rects, contour_bounding_rects
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class DetectionResult:
     """
     Data class to store information about a detected object.
@@ -30,38 +35,48 @@ class DetectionResult:
     - Clean way to store structured data
     - Type hints make code more readable
     
+    Why slots=True, frozen=True?
+    - No per-instance __dict__, so each detection is smaller
+    - Coordinates are plain fields, read directly instead of via a tuple
+    - Detections can't be changed by accident once produced
+    
     Attributes:
         class_id: Numeric ID of the object class
         class_name: Human-readable name (e.g., "car", "door")
         confidence: How confident the model is (0.0-1.0)
-        bbox: Bounding box [x, y, width, height] in pixels
-        center: Center point (x, y) of the bounding box
+        x, y: Top-left corner of the bounding box in pixels
+        width, height: Size of the bounding box in pixels
+        cx, cy: Center point of the bounding box
     """
     class_id: int
     class_name: str
     confidence: float
-    bbox: Tuple[int, int, int, int]  # x, y, width, height
-    center: Tuple[int, int]
-    
-    @property
-    def x(self) -> int:
-        """X coordinate of top-left corner"""
-        return self.bbox[0]
+    x: int
+    y: int
+    width: int
+    height: int
+    cx: int
+    cy: int
     
-    @property
-    def y(self) -> int:
-        """Y coordinate of top-left corner"""
-        return self.bbox[1]
+    @classmethod
+    def from_bbox(cls, class_id: int, class_name: str, confidence: float,
+                  bbox: Tuple[int, int, int, int],
+                  center: Tuple[int, int] = None) -> "DetectionResult":
+        """Build a detection from an (x, y, width, height) box."""
+        x, y, w, h = bbox
+        if center is None:
+            center = (x + w // 2, y + h // 2)
+        return cls(class_id, class_name, confidence, x, y, w, h, center[0], center[1])
     
     @property
-    def width(self) -> int:
-        """Width of bounding box"""
-        return self.bbox[2]
+    def bbox(self) -> Tuple[int, int, int, int]:
+        """Bounding box [x, y, width, height] in pixels"""
+        return (self.x, self.y, self.width, self.height)
     
     @property
-    def height(self) -> int:
-        """Height of bounding box"""
-        return self.bbox[3]
+    def center(self) -> Tuple[int, int]:
+        """Center point (x, y) of the bounding box"""
+        return (self.cx, self.cy)
     
     def get_crop(self, image: np.ndarray) -> np.ndarray:
         """
@@ -74,9 +89,119 @@ class DetectionResult:
             Cropped image containing just the detected object
             
         Why crop? We'll send these regions to Claude for detailed analysis.
+
+        The crop is a view into image, no pixels are copied. Its rows keep
+        the full image's stride, which OpenCV and the CV analyzers accept
+        as-is (a BGR row is still contiguous inside), so there is no
+        need for np.ascontiguousarray. Don't draw on it in place.
         """
-        x, y, w, h = self.bbox
-        return image[y:y+h, x:x+w]
+        x, y = self.x, self.y
+        return image[y:y+self.height, x:x+self.width]
+
+
+class DetectionBatch:
+    """
+    Columnar (structure-of-arrays) view of a set of detections.
+    
+    Each field lives in one column of a NumPy structured array, so
+    filtering by class or confidence is a single vectorized mask instead
+    of a Python loop over DetectionResult objects. Iterating a batch
+    yields DetectionResult objects for code that wants them one by one.
+    
+    Columns: class_id, conf, x, y, w, h
+    """
+    
+    DTYPE = np.dtype([('class_id', 'i4'), ('conf', 'f4'),
+                      ('x', 'i4'), ('y', 'i4'), ('w', 'i4'), ('h', 'i4')])
+    
+    def __init__(self, records: np.ndarray, names: Dict[int, str]):
+        """
+        Args:
+            records: Structured array with DetectionBatch.DTYPE
+            names: Class ID → class name mapping
+        """
+        self.records = records
+        self.names = names
+    
+    @classmethod
+    def from_xyxy(cls, data: np.ndarray, names: Dict[int, str]) -> "DetectionBatch":
+        """
+        Build a batch from an (N, 6) [x1, y1, x2, y2, conf, cls] array.
+        
+        This is the layout of ultralytics' result.boxes.data, so a whole
+        image's boxes convert in one go.
+        """
+        data = np.asarray(data, dtype=np.float32).reshape(-1, 6)
+        records = np.empty(len(data), dtype=cls.DTYPE)
+        records['class_id'] = data[:, 5]
+        records['conf'] = data[:, 4]
+        records['x'] = data[:, 0]
+        records['y'] = data[:, 1]
+        records['w'] = data[:, 2] - data[:, 0]
+        records['h'] = data[:, 3] - data[:, 1]
+        return cls(records, names)
+    
+    @classmethod
+    def from_detections(cls, detections: List["DetectionResult"]) -> "DetectionBatch":
+        """Build a batch from DetectionResult objects."""
+        records = np.empty(len(detections), dtype=cls.DTYPE)
+        if detections:
+            records[:] = [(d.class_id, d.confidence, d.x, d.y, d.width, d.height)
+                          for d in detections]
+        names = {d.class_id: d.class_name for d in detections}
+        return cls(records, names)
+    
+    @property
+    def xywh(self) -> np.ndarray:
+        """(N, 4) int32 array of [x, y, width, height] boxes."""
+        return np.stack([self.records['x'], self.records['y'],
+                         self.records['w'], self.records['h']], axis=1)
+    
+    def labels(self) -> List[str]:
+        """"class_name: confidence" label for every row."""
+        return [f"{self.names.get(class_id, str(class_id))}: {conf:.2f}"
+                for class_id, conf in zip(self.records['class_id'].tolist(),
+                                          self.records['conf'].tolist())]
+    
+    def __len__(self) -> int:
+        return len(self.records)
+    
+    def __getitem__(self, index) -> "DetectionBatch":
+        """Select rows with a boolean mask, index array or slice."""
+        return DetectionBatch(self.records[index], self.names)
+    
+    def __iter__(self):
+        for class_id, conf, x, y, w, h in self.records.tolist():
+            yield DetectionResult(
+                class_id=class_id,
+                class_name=self.names.get(class_id, str(class_id)),
+                confidence=conf,
+                x=x, y=y, width=w, height=h,
+                cx=x + w // 2, cy=y + h // 2
+            )
+
+
+def _normalize_names(names: Dict[int, str]) -> Dict[int, str]:
+    """
+    Class names as lowercase, trimmed, underscore-separated interned strings.
+    
+    Done once per model, so detections carry names like "stop_sign" that
+    match the prompt and analyzer tables directly (YOLO says "stop sign").
+    """
+    return {class_id: sys.intern(name.lower().strip().replace(" ", "_"))
+            for class_id, name in names.items()}
+
+
+# Class names the mock detector's heuristics can assign
+_MOCK_CLASS_NAMES = _normalize_names({0: "door", 2: "car", 14: "sign", 99: "object"})
+
+
+def _cuda_device_count() -> int:
+    """Number of CUDA devices OpenCV can use (0 for CPU-only builds)."""
+    try:
+        return cv2.cuda.getCudaEnabledDeviceCount()
+    except (AttributeError, cv2.error):
+        return 0
 
 
 class ObjectDetector:
@@ -102,12 +227,23 @@ class ObjectDetector:
         """
         self.use_mock = use_mock
         self.confidence_threshold = config.YOLO_CONFIDENCE_THRESHOLD
+        self.onnx_session = None
+        
+        # Per-call progress output; turn off for batch/video processing
+        self.verbose = True
+        
+        # Mock detector edge maps run on the GPU when OpenCV has CUDA
+        self.use_cuda_edges = _cuda_device_count() > 0
+        self._cuda_canny = None
         
-        if not use_mock:
+        if not use_mock and config.USE_ONNX_INT8:
+            self.onnx_session = self._load_onnx_session()
+        
+        if not use_mock and self.onnx_session is None:
             try:
                 from ultralytics import YOLO
-                self.model = YOLO(config.YOLO_MODEL)
-                print(f"✓ Loaded YOLO model: {config.YOLO_MODEL}")
+                self.model = self._load_yolo_model(YOLO)
+                self.class_names = _normalize_names(self.model.names)
             except ImportError:
                 print("⚠ ultralytics not installed, falling back to mock mode")
                 self.use_mock = True
@@ -115,6 +251,100 @@ class ObjectDetector:
         if self.use_mock:
             print("ℹ Using mock detector (simulated detections)")
     
+    def _load_yolo_model(self, YOLO):
+        """
+        Load the YOLO model, preferring a TensorRT engine if enabled.
+        
+        With config.USE_TRT the .pt model is exported once to an FP16
+        TensorRT engine (cached next to it) and the engine is loaded.
+        Any TensorRT problem falls back to the regular PyTorch model.
+        """
+        if config.USE_TRT:
+            engine_path = Path(config.YOLO_MODEL).with_suffix(".engine")
+            try:
+                if not engine_path.exists():
+                    print(f"ℹ Exporting {config.YOLO_MODEL} to TensorRT (one-time)...")
+                    exported = YOLO(config.YOLO_MODEL).export(
+                        format="engine", half=True, dynamic=True,
+                        batch=config.TRT_MAX_BATCH, imgsz=640
+                    )
+                    engine_path = Path(exported)
+                model = YOLO(str(engine_path), task="detect")
+                print(f"✓ Loaded TensorRT engine: {engine_path}")
+                return model
+            except Exception as e:
+                print(f"⚠ TensorRT unavailable ({e}), using PyTorch model")
+        
+        model = YOLO(config.YOLO_MODEL)
+        print(f"✓ Loaded YOLO model: {config.YOLO_MODEL}")
+        
+        if config.USE_TORCH_COMPILE:
+            self._compile_yolo_model(model)
+        return model
+    
+    def _compile_yolo_model(self, model):
+        """
+        Compile the YOLO network with torch.compile, in place.
+        
+        One eager prediction builds ultralytics' predictor; its network is
+        then wrapped with mode="reduce-overhead" (CUDA graphs) and warmed
+        up twice on a 640x640 frame so the kernels are recorded before the
+        first real image. Any failure leaves the eager model in place.
+        """
+        try:
+            import torch
+        except ImportError:
+            return
+        
+        if not torch.cuda.is_available():
+            print("ℹ torch.compile skipped (no CUDA device)")
+            return
+        
+        dummy = np.zeros((640, 640, 3), dtype=np.uint8)
+        backend = eager = None
+        try:
+            model([dummy], verbose=False)
+            eager = model.predictor.model.model
+            backend = model.predictor.model
+            backend.model = torch.compile(eager, mode="reduce-overhead")
+            for _ in range(2):
+                model([dummy], verbose=False)
+            print("✓ YOLO model compiled (torch.compile + CUDA graphs)")
+        except Exception as e:
+            if backend is not None:
+                backend.model = eager
+            print(f"⚠ torch.compile unavailable ({e}), using eager model")
+    
+    def _load_onnx_session(self):
+        """
+        Create an onnxruntime CPU session for the INT8 YOLO model.
+        
+        The quantized model is built on first use (see export_int8_onnx).
+        Returns None, so the PyTorch model is used, if anything fails.
+        """
+        try:
+            import onnxruntime as ort
+            
+            model_path = Path(config.ONNX_INT8_MODEL)
+            if not model_path.exists():
+                print(f"ℹ Building INT8 ONNX model {model_path} (one-time)...")
+                export_int8_onnx(config.YOLO_MODEL, model_path, config.TEST_IMAGES_DIR)
+            
+            session = ort.InferenceSession(str(model_path),
+                                           providers=["CPUExecutionProvider"])
+        except Exception as e:
+            print(f"⚠ INT8 ONNX model unavailable ({e}), using PyTorch model")
+            return None
+        
+        self.onnx_input_name = session.get_inputs()[0].name
+        
+        # ultralytics stores the class names in the model metadata
+        names = session.get_modelmeta().custom_metadata_map.get("names")
+        self.onnx_class_names = _normalize_names(ast.literal_eval(names)) if names else {}
+        
+        print(f"✓ Loaded INT8 ONNX model: {model_path}")
+        return session
+    
     def detect(self, image: np.ndarray) -> List[DetectionResult]:
         """
         Detect objects in an image.
@@ -130,9 +360,60 @@ class ObjectDetector:
         """
         if self.use_mock:
             return self._mock_detect(image)
+        elif self.onnx_session is not None:
+            return self._onnx_detect(image)
         else:
             return self._yolo_detect(image)
     
+    def detect_batch(self, images: List[np.ndarray],
+                     batch_size: int = 8) -> List[List[DetectionResult]]:
+        """
+        Detect objects in several images (e.g. video frames) at once.
+        
+        Args:
+            images: List of images as numpy arrays
+            batch_size: Number of images sent to YOLO per inference call
+            
+        Returns:
+            One list of DetectionResult objects per input image, in order
+            
+        Why batch? Each YOLO call has fixed preprocessing and model launch
+        overhead; running N frames per call pays it once instead of N times.
+        """
+        if self.use_mock:
+            return [self._mock_detect(image) for image in images]
+        if self.onnx_session is not None:
+            return [self._onnx_detect(image) for image in images]
+        
+        all_detections = []
+        for start in range(0, len(images), batch_size):
+            all_detections.extend(self._yolo_detect_batch(images[start:start + batch_size]))
+        return all_detections
+    
+    def _edge_map(self, image: np.ndarray) -> np.ndarray:
+        """
+        Canny edges of a BGR image (thresholds 50/150).
+        
+        With a CUDA-enabled OpenCV the image is uploaded once, and the
+        grayscale conversion and Canny both run on the GPU; only the
+        final edge map is downloaded. Otherwise both run on the CPU.
+        """
+        if self.use_cuda_edges:
+            try:
+                if self._cuda_canny is None:
+                    self._cuda_canny = cv2.cuda.createCannyEdgeDetector(50, 150)
+                
+                gpu_image = cv2.cuda_GpuMat()
+                gpu_image.upload(image)
+                gpu_gray = cv2.cuda.cvtColor(gpu_image, cv2.COLOR_BGR2GRAY)
+                return self._cuda_canny.detect(gpu_gray).download()
+            except cv2.error as e:
+                print(f"⚠ CUDA edge detection failed ({e}), using CPU")
+                self.use_cuda_edges = False
+        
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        return cv2.Canny(gray, 50, 150)
+    
     def _mock_detect(self, image: np.ndarray) -> List[DetectionResult]:
         """
         Mock detection for testing/demo purposes.
@@ -146,65 +427,37 @@ class ObjectDetector:
         height, width = image.shape[:2]
         detections = []
         
-        # Convert to grayscale for edge detection
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        
-        # Use Canny edge detection to find edges
+        # Grayscale + Canny edge detection
         # Technical: Canny finds rapid changes in brightness (edges)
-        edges = cv2.Canny(gray, 50, 150)
+        edges = self._edge_map(image)
         
         # Find contours (continuous edges forming shapes)
         contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, 
                                        cv2.CHAIN_APPROX_SIMPLE)
         
-        # Analyze each contour to simulate object detection
-        for contour in contours:
-            # Get bounding rectangle
-            x, y, w, h = cv2.boundingRect(contour)
-            
-            # Filter by size - ignore tiny or huge detections
-            area = w * h
-            if area < 1000 or area > (width * height * 0.5):
-                continue
-            
-            # Simulate classification based on aspect ratio and position
-            aspect_ratio = w / h if h > 0 else 0
-            
-            # Heuristics (rules of thumb) to guess object type:
-            if 0.3 < aspect_ratio < 0.7 and y > height * 0.3:
-                # Tall and thin, lower in image = likely a door
-                class_id = 0
-                class_name = "door"
-                confidence = 0.75
-            elif aspect_ratio > 1.5 and w > width * 0.2:
-                # Wide rectangle = possibly a vehicle
-                class_id = 2
-                class_name = "car"
-                confidence = 0.65
-            elif w < width * 0.3 and h < height * 0.3:
-                # Small rectangle = possibly signage or obstacle
-                class_id = 14
-                class_name = "sign"
-                confidence = 0.60
-            else:
-                # Unknown object
-                class_id = 99
-                class_name = "object"
-                confidence = 0.50
-            
-            # Only keep high-confidence detections
-            if confidence >= self.confidence_threshold:
-                center = (x + w // 2, y + h // 2)
-                detection = DetectionResult(
-                    class_id=class_id,
-                    class_name=class_name,
-                    confidence=confidence,
-                    bbox=(x, y, w, h),
-                    center=center
-                )
-                detections.append(detection)
-        
-        print(f"  Mock detector found {len(detections)} objects")
+        # Bounding rectangles for all contours as one (N, 4) array
+        rects = contour_bounding_rects(contours)
+        
+        # Classify by aspect ratio and position, dropping tiny/huge rects
+        # and low-confidence guesses (see bbox_utils.classify_rects)
+        class_ids, confidences, keep = classify_rects(
+            rects, width, height, self.confidence_threshold
+        )
+        
+        for i in np.flatnonzero(keep):
+            rx, ry, rw, rh = (int(v) for v in rects[i])
+            class_id = int(class_ids[i])
+            detection = DetectionResult(
+                class_id=class_id,
+                class_name=_MOCK_CLASS_NAMES[class_id],
+                confidence=float(confidences[i]),
+                x=rx, y=ry, width=rw, height=rh,
+                cx=rx + rw // 2, cy=ry + rh // 2
+            )
+            detections.append(detection)
+        
+        if self.verbose:
+            print(f"  Mock detector found {len(detections)} objects")
         return detections
     
     def _yolo_detect(self, image: np.ndarray) -> List[DetectionResult]:
@@ -216,40 +469,81 @@ class ObjectDetector:
         2. Predicts bounding boxes and classes simultaneously
         3. Very fast compared to older methods
         """
-        results = self.model(image, verbose=False)
-        detections = []
+        return self._yolo_detect_batch([image])[0]
+    
+    def _yolo_detect_batch(self, images: List[np.ndarray]) -> List[List[DetectionResult]]:
+        """
+        Run YOLO once on a list of images.
         
-        # Parse YOLO results
-        for result in results:
-            boxes = result.boxes
-            for box in boxes:
-                # Extract detection info
-                x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                confidence = float(box.conf[0])
-                class_id = int(box.cls[0])
-                
-                # Filter by confidence
-                if confidence < self.confidence_threshold:
-                    continue
-                
-                # Convert to our format (x, y, width, height)
-                x, y = int(x1), int(y1)
-                w, h = int(x2 - x1), int(y2 - y1)
-                center = (x + w // 2, y + h // 2)
-                
-                # Get class name from COCO dataset
-                class_name = result.names[class_id]
-                
-                detection = DetectionResult(
-                    class_id=class_id,
-                    class_name=class_name,
-                    confidence=confidence,
-                    bbox=(x, y, w, h),
-                    center=center
-                )
-                detections.append(detection)
+        ultralytics treats a list source as one batch and returns one
+        result per image, in the same order.
+        """
+        results = self.model(list(images), iou=config.YOLO_NMS_IOU_THRESHOLD, verbose=False)
+        return [self._parse_yolo_result(result) for result in results]
+    
+    def _parse_yolo_result(self, result) -> List[DetectionResult]:
+        """Convert one image's YOLO result into DetectionResult objects."""
+        # One device-to-host copy of [x1, y1, x2, y2, conf, cls] for all
+        # boxes; class names come from the COCO dataset the model uses
+        batch = DetectionBatch.from_xyxy(result.boxes.data.cpu().numpy(), self.class_names)
         
-        return detections
+        # Filter by confidence
+        batch = batch[batch.records['conf'] >= self.confidence_threshold]
+        
+        return list(batch)
+    
+    def _onnx_detect(self, image: np.ndarray) -> List[DetectionResult]:
+        """
+        YOLO detection with the INT8 ONNX model on CPU.
+        
+        Same output as _yolo_detect: the raw (1, 4 + classes, anchors)
+        prediction is decoded, confidence-filtered and passed through NMS
+        here, since the exported graph doesn't include those steps.
+        """
+        blob, scale, (pad_x, pad_y) = _letterbox(image, config.ONNX_INPUT_SIZE)
+        output = self.onnx_session.run(None, {self.onnx_input_name: blob})[0]
+        
+        # (4 + classes, anchors) -> (anchors, 4 + classes)
+        predictions = output[0].T
+        class_scores = predictions[:, 4:]
+        class_ids = class_scores.argmax(axis=1)
+        confidences = class_scores[np.arange(len(class_ids)), class_ids]
+        
+        keep = confidences >= self.confidence_threshold
+        if not keep.any():
+            return []
+        
+        # Box centers/sizes back to original-image (x, y, w, h)
+        cx, cy, bw, bh = predictions[keep, :4].T
+        boxes = np.stack([(cx - bw / 2 - pad_x) / scale,
+                          (cy - bh / 2 - pad_y) / scale,
+                          bw / scale,
+                          bh / scale], axis=1)
+        confidences = confidences[keep]
+        class_ids = class_ids[keep]
+        
+        # NMS per class, like ultralytics: overlapping boxes of different
+        # classes (a person in front of a door) both stay
+        indices = np.array(cv2.dnn.NMSBoxesBatched(boxes.tolist(), confidences.tolist(),
+                                                   class_ids.tolist(),
+                                                   self.confidence_threshold,
+                                                   config.YOLO_NMS_IOU_THRESHOLD),
+                           dtype=np.int64).reshape(-1)
+        boxes = boxes[indices]
+        
+        # Corners clipped to the image, as ultralytics does, so crops of
+        # boxes at the edge never slice with negative indices
+        height, width = image.shape[:2]
+        data = np.column_stack([
+            np.clip(boxes[:, 0], 0, width),
+            np.clip(boxes[:, 1], 0, height),
+            np.clip(boxes[:, 0] + boxes[:, 2], 0, width),
+            np.clip(boxes[:, 1] + boxes[:, 3], 0, height),
+            confidences[indices],
+            class_ids[indices],
+        ])
+        
+        return list(DetectionBatch.from_xyxy(data, self.onnx_class_names))
     
     def filter_relevant_objects(self, detections: List[DetectionResult]) -> List[DetectionResult]:
         """
@@ -266,18 +560,258 @@ class ObjectDetector:
         - We only care about ~15 for accessibility
         - Reduces noise and API costs (fewer objects to analyze)
         """
-        relevant = []
-        
-        for detection in detections:
-            # Check if this class is in our relevant classes list
-            if detection.class_id in config.RELEVANT_CLASSES:
-                relevant.append(detection)
-                print(f"  ✓ Found relevant object: {detection.class_name} "
-                      f"({detection.confidence:.2f} confidence)")
+        # Check every class against our relevant classes in one table lookup
+        # (IDs outside the table, like the mock's 99, are never relevant)
+        class_ids = DetectionBatch.from_detections(detections).records['class_id']
+        mask = config.RELEVANT_CLASS_MASK
+        in_range = (class_ids >= 0) & (class_ids < len(mask))
+        is_relevant = in_range & mask[np.where(in_range, class_ids, 0)]
+        
+        relevant = [d for d, keep in zip(detections, is_relevant) if keep]
+        
+        # One write for the whole listing instead of one print per object
+        if self.verbose and relevant:
+            print("\n".join(
+                f"  ✓ Found relevant object: {detection.class_name} "
+                f"({detection.confidence:.2f} confidence)"
+                for detection in relevant
+            ))
         
         return relevant
 
 
+def _letterbox(image: np.ndarray, size: int):
+    """
+    Resize and pad a BGR image into the square YOLO input tensor.
+    
+    Returns:
+        (blob, scale, (pad_x, pad_y)): float32 (1, 3, size, size) RGB
+        tensor in [0, 1], and the transform needed to map boxes back
+    """
+    height, width = image.shape[:2]
+    scale = min(size / width, size / height)
+    new_w, new_h = int(round(width * scale)), int(round(height * scale))
+    pad_x, pad_y = (size - new_w) // 2, (size - new_h) // 2
+    
+    canvas = np.full((size, size, 3), 114, dtype=np.uint8)
+    canvas[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = cv2.resize(
+        image, (new_w, new_h), interpolation=cv2.INTER_LINEAR
+    )
+    
+    blob = cv2.dnn.blobFromImage(canvas, 1 / 255.0, swapRB=True)
+    return blob, scale, (pad_x, pad_y)
+
+
+def export_int8_onnx(model_path: str, output_path, calibration_dir, max_images: int = 16):
+    """
+    Export a YOLO .pt model to ONNX and statically quantize it to INT8.
+    
+    Args:
+        model_path: YOLO weights (e.g. config.YOLO_MODEL)
+        output_path: Where to write the quantized .onnx model
+        calibration_dir: Folder of representative images used to pick
+                         the INT8 activation ranges
+        max_images: Upper bound on calibration images
+    
+    INT8 convolutions run on the VNNI integer dot-product instructions
+    of recent x86 CPUs, much faster than FP32 on machines without a GPU.
+    """
+    from ultralytics import YOLO
+    from onnxruntime.quantization import (CalibrationDataReader, QuantFormat,
+                                          QuantType, quantize_static)
+    
+    fp32_path = YOLO(model_path).export(format="onnx", imgsz=config.ONNX_INPUT_SIZE,
+                                        dynamic=False, simplify=True)
+    
+    image_paths = sorted(p for p in Path(calibration_dir).iterdir()
+                         if p.suffix.lower() in (".jpg", ".jpeg", ".png"))[:max_images]
+    if not image_paths:
+        raise FileNotFoundError(f"No calibration images in {calibration_dir}")
+    
+    class _ImageReader(CalibrationDataReader):
+        def __init__(self, input_name):
+            self.input_name = input_name
+            self.paths = iter(image_paths)
+        
+        def get_next(self):
+            for path in self.paths:
+                image = cv2.imread(str(path))
+                if image is not None:
+                    return {self.input_name: _letterbox(image, config.ONNX_INPUT_SIZE)[0]}
+            return None
+    
+    import onnxruntime as ort
+    input_name = ort.InferenceSession(
+        str(fp32_path), providers=["CPUExecutionProvider"]
+    ).get_inputs()[0].name
+    
+    quantize_static(str(fp32_path), str(output_path), _ImageReader(input_name),
+                    quant_format=QuantFormat.QDQ,
+                    activation_type=QuantType.QUInt8,
+                    weight_type=QuantType.QInt8)
+    
+    # Keep the class names ultralytics put in the FP32 model's metadata
+    import onnx
+    source = onnx.load(str(fp32_path))
+    quantized = onnx.load(str(output_path))
+    for prop in source.metadata_props:
+        entry = quantized.metadata_props.add()
+        entry.key, entry.value = prop.key, prop.value
+    onnx.save(quantized, str(output_path))
+    
+    return Path(output_path)
+
+
+# Per-font-size glyph widths for _label_sizes, filled on first use
+_GLYPH_ADVANCES = {}
+
+
+def _glyph_advances(font_scale: float, thickness: int) -> np.ndarray:
+    """
+    Width in pixels of every ASCII character in FONT_HERSHEY_SIMPLEX.
+    
+    Measured once per font size from a long run of each character, so
+    summing them reproduces cv2.getTextSize exactly.
+    """
+    key = (font_scale, thickness)
+    if key not in _GLYPH_ADVANCES:
+        _GLYPH_ADVANCES[key] = np.array([
+            (cv2.getTextSize(chr(c) * 1000, cv2.FONT_HERSHEY_SIMPLEX,
+                             font_scale, thickness)[0][0] - thickness) / 1000
+            for c in range(128)
+        ])
+    return _GLYPH_ADVANCES[key]
+
+
+def _label_sizes(labels: List[str], font_scale: float, thickness: int):
+    """
+    Text widths (array) and common text height for a list of labels.
+    
+    Same numbers cv2.getTextSize gives, without calling it per label.
+    """
+    advances = _glyph_advances(font_scale, thickness)
+    codes = np.frombuffer("".join(labels).encode('ascii', 'replace'), dtype=np.uint8)
+    starts = np.cumsum([0] + [len(label) for label in labels[:-1]])
+    widths = np.rint(np.add.reduceat(advances[codes], starts) + thickness).astype(np.int32)
+    
+    (_, height), _ = cv2.getTextSize("A", cv2.FONT_HERSHEY_SIMPLEX, font_scale, thickness)
+    return widths, height
+
+
+# Label sprites for _blit_label, keyed by text and style, filled on use
+_LABEL_SPRITES = {}
+_LABEL_SPRITE_LIMIT = 1024
+
+
+def _label_sprite(label: str, width: int, height: int, color, font_scale: float,
+                  thickness: int):
+    """
+    A label's filled background with its text, rendered once and reused.
+    
+    Returns:
+        (patch, extra, bounds): patch is the (height + 1, width + 1)
+        background with the text drawn in, extra the (rows, cols, values)
+        of text pixels that fall outside it (e.g. descenders), and bounds
+        the (top, left, bottom, right) extent of everything drawn, all
+        relative to the patch's top-left corner
+    """
+    key = (label, width, height, color, font_scale, thickness)
+    sprite = _LABEL_SPRITES.get(key)
+    if sprite is not None:
+        return sprite
+    
+    # Draw onto a canvas with room around the background, exactly as
+    # _draw_label would draw onto the frame
+    margin = height + 10
+    canvas = np.zeros((height + 1 + 2 * margin, width + 1 + 2 * margin, 3), dtype=np.uint8)
+    ink = np.zeros(canvas.shape[:2], dtype=np.uint8)
+    _draw_label(canvas, label, margin, margin, width, height, color, font_scale, thickness)
+    cv2.putText(ink, label, (margin, margin + height - 5), cv2.FONT_HERSHEY_SIMPLEX,
+                font_scale, 255, thickness)
+    
+    ink[margin:margin + height + 1, margin:margin + width + 1] = 0
+    rows, cols = np.nonzero(ink)
+    extra = (rows - margin, cols - margin, canvas[rows, cols])
+    bounds = (int(extra[0].min(initial=0)), int(extra[1].min(initial=0)),
+              int(extra[0].max(initial=height)), int(extra[1].max(initial=width)))
+    sprite = (canvas[margin:margin + height + 1, margin:margin + width + 1].copy(),
+              extra, bounds)
+    
+    if len(_LABEL_SPRITES) >= _LABEL_SPRITE_LIMIT:
+        _LABEL_SPRITES.clear()
+    _LABEL_SPRITES[key] = sprite
+    return sprite
+
+
+def _draw_label(annotated: np.ndarray, label: str, x0: int, y0: int, width: int,
+                height: int, color, font_scale: float, thickness: int):
+    """Draw a label background (for readability) and its text with OpenCV."""
+    cv2.rectangle(annotated, (x0, y0), (x0 + width, y0 + height), color, -1)
+    cv2.putText(annotated, label, (x0, y0 + height - 5),
+               cv2.FONT_HERSHEY_SIMPLEX, font_scale,
+               (255, 255, 255), thickness)
+
+
+def _blit_label(annotated: np.ndarray, sprite, x0: int, y0: int) -> bool:
+    """
+    Copy a _label_sprite into annotated with its corner at (x0, y0).
+    
+    OpenCV clips text at the image border slightly differently from a
+    clipped copy, so labels that don't fit entirely (or images that
+    aren't 3-channel) are left to the caller; returns False for those.
+    """
+    patch, (rows, cols, values), (top, left, bottom, right) = sprite
+    height, width = annotated.shape[:2]
+    if annotated.shape[2:] != patch.shape[2:]:
+        return False
+    if y0 + top < 0 or x0 + left < 0 or y0 + bottom >= height or x0 + right >= width:
+        return False
+    
+    annotated[y0:y0 + patch.shape[0], x0:x0 + patch.shape[1]] = patch
+    if len(rows):
+        annotated[rows + y0, cols + x0] = values
+    return True
+
+
+def _draw_detections(annotated: np.ndarray, detections):
+    """
+    Draw boxes and labels for detections onto annotated, in place.
+    
+    Box geometry and label sizes for all detections are computed in
+    NumPy and the outlines drawn in one call. Each distinct label is
+    rendered once into a sprite, so repeated labels are a plain array
+    copy. A DetectionBatch is drawn straight from its columns.
+    """
+    color = (0, 255, 0)  # Default green
+    
+    # Geometry phase: every box and label background computed in NumPy
+    if isinstance(detections, DetectionBatch):
+        labels = detections.labels()
+        boxes = detections.xywh
+    else:
+        labels = [f"{d.class_name}: {d.confidence:.2f}" for d in detections]
+        boxes = np.array([d.bbox for d in detections], dtype=np.int32)
+    x, y = boxes[:, 0], boxes[:, 1]
+    x1, y1 = x + boxes[:, 2], y + boxes[:, 3]
+    
+    # All box outlines in one polylines call
+    outlines = np.stack([np.stack([x, y], 1), np.stack([x1, y], 1),
+                         np.stack([x1, y1], 1), np.stack([x, y1], 1)], axis=1)
+    cv2.polylines(annotated, list(outlines), True, color, config.BBOX_THICKNESS)
+    
+    # Label sizes for all detections at once
+    text_w, text_h = _label_sizes(labels, config.FONT_SCALE, config.FONT_THICKNESS)
+    backgrounds = np.stack([x, y - text_h - 10, text_w], axis=1).tolist()
+    
+    # Glyph phase: label background (for readability) and text per label
+    for label, (bx0, by0, bw) in zip(labels, backgrounds):
+        sprite = _label_sprite(label, bw, text_h + 10, color,
+                               config.FONT_SCALE, config.FONT_THICKNESS)
+        if not _blit_label(annotated, sprite, bx0, by0):
+            _draw_label(annotated, label, bx0, by0, bw, text_h + 10, color,
+                        config.FONT_SCALE, config.FONT_THICKNESS)
+
+
 def visualize_detections(image: np.ndarray, 
                         detections: List[DetectionResult],
                         save_path: str = None) -> np.ndarray:
@@ -286,7 +820,7 @@ def visualize_detections(image: np.ndarray,
     
     Args:
         image: Original image
-        detections: List of detected objects
+        detections: List of detected objects (or a DetectionBatch)
         save_path: Optional path to save the annotated image
         
     Returns:
@@ -299,37 +833,11 @@ def visualize_detections(image: np.ndarray,
     """
     # Make a copy so we don't modify the original
     annotated = image.copy()
-    
-    for detection in detections:
-        x, y, w, h = detection.bbox
-        
-        # Choose color based on object type
-        color = (0, 255, 0)  # Default green
-        
-        # Draw rectangle
-        cv2.rectangle(annotated, (x, y), (x + w, y + h), 
-                     color, config.BBOX_THICKNESS)
-        
-        # Create label text
-        label = f"{detection.class_name}: {detection.confidence:.2f}"
-        
-        # Calculate text size for background
-        (text_w, text_h), _ = cv2.getTextSize(
-            label, cv2.FONT_HERSHEY_SIMPLEX, 
-            config.FONT_SCALE, config.FONT_THICKNESS
-        )
-        
-        # Draw label background (for readability)
-        cv2.rectangle(annotated, (x, y - text_h - 10), 
-                     (x + text_w, y), color, -1)
-        
-        # Draw label text
-        cv2.putText(annotated, label, (x, y - 5),
-                   cv2.FONT_HERSHEY_SIMPLEX, config.FONT_SCALE,
-                   (255, 255, 255), config.FONT_THICKNESS)
+    if len(detections):
+        _draw_detections(annotated, detections)
     
     if save_path:
-        cv2.imwrite(save_path, annotated)
+        output_writer.write_image(save_path, annotated)
         print(f"✓ Saved annotated image to: {save_path}")
     
     return annotated
@@ -0,0 +1,145 @@
+"""
+Output Writer Module
+
+Writes annotated images and JSON reports on a background thread.
+
+Saving a large JPEG or an indented JSON report can take tens of
+milliseconds, more on slow disks or network drives. Instead of blocking
+the pipeline, callers put (data, path) jobs on a queue and a single
+daemon thread does the actual writing. Anything still queued is flushed
+when the program exits.
+
+Usage:
+    import output_writer
+    output_writer.write_image("outputs/annotated.jpg", image)
+    output_writer.write_json("outputs/report.json", report)
+    output_writer.flush()    # wait until everything is on disk
+"""
+
+import atexit
+import json
+import queue
+import threading
+from pathlib import Path
+import cv2
+import numpy as np
+import config
+
+# Try to import orjson for faster report writing (falls back to json)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Message that tells the worker thread to stop
+_QUIT = 'quit'
+
+# Bounded so a fast producer cannot pile up unlimited images in memory
+write_queue = queue.Queue(maxsize=16)
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def _json_default(obj):
+    """
+    Convert values the JSON encoder can't write itself: NumPy values and
+    objects with a to_dict() such as ViolationResult.
+    """
+    if isinstance(obj, (np.generic, np.ndarray)):
+        return obj.tolist()
+    if hasattr(obj, 'to_dict'):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _save_json(data: dict, path: str):
+    """
+    Write a report dict as indented JSON.
+    
+    orjson (Rust) is used when installed. Either way NumPy scalars and
+    arrays, e.g. confidences straight from YOLO, are written as plain
+    numbers, and ViolationResult objects as their to_dict() form, so
+    callers don't need to convert them first.
+    """
+    if ORJSON_AVAILABLE:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data, default=_json_default,
+                                 option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+    else:
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2, default=_json_default)
+
+
+def _save_image(image: np.ndarray, path):
+    """Write an image; JPEGs are saved at config.OUTPUT_JPEG_QUALITY."""
+    if Path(path).suffix.lower() in ('.jpg', '.jpeg'):
+        params = [cv2.IMWRITE_JPEG_QUALITY, config.OUTPUT_JPEG_QUALITY,
+                  cv2.IMWRITE_JPEG_OPTIMIZE, 0]
+        cv2.imwrite(str(path), image, params)
+    else:
+        cv2.imwrite(str(path), image)
+
+
+def _run():
+    """Worker loop: write each queued job until the quit message arrives."""
+    while True:
+        job = write_queue.get()
+        try:
+            if job == _QUIT:
+                return
+
+            data, path = job
+            if isinstance(data, np.ndarray):
+                _save_image(data, path)
+            else:
+                _save_json(data, path)
+        except Exception as e:
+            print(f"⚠ Could not write {job[1]}: {e}")
+        finally:
+            write_queue.task_done()
+
+
+def _ensure_worker():
+    """Start the writer thread on first use."""
+    global _worker
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_run, name="output-writer", daemon=True)
+            _worker.start()
+
+
+def write_image(path, image: np.ndarray):
+    """
+    Queue an image to be saved with cv2.imwrite.
+
+    The array is written as it is when the worker gets to it, so don't
+    modify it afterwards.
+    """
+    _ensure_worker()
+    write_queue.put((image, path))
+
+
+def write_json(path, data: dict):
+    """Queue a report dict to be saved as indented JSON."""
+    _ensure_worker()
+    write_queue.put((data, path))
+
+
+def flush():
+    """Block until every queued write has finished."""
+    if _worker is not None and _worker.is_alive():
+        write_queue.join()
+
+
+def shutdown():
+    """Flush pending writes and stop the worker thread."""
+    global _worker
+    if _worker is not None and _worker.is_alive():
+        write_queue.put(_QUIT)
+        _worker.join()
+    _worker = None
+
+
+atexit.register(shutdown)
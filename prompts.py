@@ -12,6 +12,15 @@ The quality of AI responses depends heavily on the prompt. Good prompts:
 4. Include relevant standards/codes
 """
 
+import logging
+from functools import lru_cache
+from types import MappingProxyType
+
+from ada_code_references import ADA_CODES
+import config
+
+logger = logging.getLogger(__name__)
+
 # Base system prompt - sets Claude's role
 SYSTEM_PROMPT = """You are an ADA (Americans with Disabilities Act) compliance expert 
 specializing in accessibility auditing for retail spaces. You analyze images to identify 
@@ -26,18 +35,31 @@ Your analysis should be:
 Remember: Visual analysis has limitations. Always recommend professional verification 
 for critical measurements."""
 
+# Response format shared by every category. It lives in the cached system
+# block, after the role and before the ADA reference, so all categories
+# share one cached prefix; each category prompt only lists its types.
+_JSON_SCHEMA_BLOCK = """Provide your response in JSON format:
+{
+    "violations": [
+        {
+            "type": "one of the violation types listed in the analysis request",
+            "severity": "Critical" | "Moderate" | "Minor",
+            "ada_code": "section number if applicable",
+            "description": "brief description of the issue",
+            "recommendation": "how to fix it",
+            "confidence": 0.0 to 1.0
+        }
+    ],
+    "overall_assessment": "brief summary",
+    "notes": "any limitations or caveats about the analysis"
+}
+
+If no accessibility concerns are visible, return an empty violations array.
+If the image quality is insufficient or the relevant features are not visible, 
+indicate this in the notes and use lower confidence scores."""
 
-def get_doorway_prompt() -> str:
-    """
-    Prompt for analyzing doorway/entrance accessibility.
-    
-    ADA Requirements (Summary):
-    - Clear opening width: minimum 32 inches
-    - Threshold: maximum 0.5 inches (1/2 inch)
-    - Door hardware: operable with one hand, no tight grasping
-    - Maneuvering clearance: depends on approach direction
-    """
-    return """Analyze this doorway/entrance for ADA compliance.
+
+DOORWAY_PROMPT = """Analyze this doorway/entrance for ADA compliance.
 
 Check for these potential violations:
 
@@ -56,37 +78,25 @@ Check for these potential violations:
 4. **Approach Clearance**: Is there adequate space to approach and open the door?
    - ADA Code: 404.2.4
 
-Provide your response in JSON format:
-{
-    "violations": [
-        {
-            "type": "Door Width" | "Threshold" | "Hardware" | "Clearance",
-            "severity": "Critical" | "Moderate" | "Minor",
-            "ada_code": "section number",
-            "description": "brief description of the issue",
-            "recommendation": "how to fix it",
-            "confidence": 0.0 to 1.0
-        }
-    ],
-    "overall_assessment": "brief summary",
-    "notes": "any limitations or caveats about the analysis"
-}
+Violation types: "Door Width" | "Threshold" | "Hardware" | "Clearance"
 
-If the image quality is insufficient or the relevant features are not visible, 
-indicate this in the notes and use lower confidence scores."""
+Respond in the JSON format given in the system prompt."""
 
 
-def get_parking_prompt() -> str:
+def get_doorway_prompt() -> str:
     """
-    Prompt for analyzing parking area accessibility.
+    Prompt for analyzing doorway/entrance accessibility.
     
     ADA Requirements (Summary):
-    - Accessible parking spaces: 96 inches minimum width
-    - Access aisle: 60 inches minimum (96" for van-accessible)
-    - Signage: Required at each space
-    - Surface: Stable, firm, slip-resistant
+    - Clear opening width: minimum 32 inches
+    - Threshold: maximum 0.5 inches (1/2 inch)
+    - Door hardware: operable with one hand, no tight grasping
+    - Maneuvering clearance: depends on approach direction
     """
-    return """Analyze this parking area for ADA compliance.
+    return DOORWAY_PROMPT
+
+
+PARKING_PROMPT = """Analyze this parking area for ADA compliance.
 
 Check for these potential violations:
 
@@ -111,34 +121,25 @@ Check for these potential violations:
 5. **Location**: Is the accessible parking close to the accessible entrance?
    - ADA Code: 502.7
 
-Provide your response in JSON format:
-{
-    "violations": [
-        {
-            "type": "Signage" | "Dimensions" | "Access Aisle" | "Surface" | "Location",
-            "severity": "Critical" | "Moderate" | "Minor",
-            "ada_code": "section number",
-            "description": "brief description of the issue",
-            "recommendation": "how to fix it",
-            "confidence": 0.0 to 1.0
-        }
-    ],
-    "overall_assessment": "brief summary",
-    "notes": "any limitations or caveats"
-}"""
+Violation types: "Signage" | "Dimensions" | "Access Aisle" | "Surface" | "Location"
 
+Respond in the JSON format given in the system prompt."""
 
-def get_pathway_prompt() -> str:
+
+def get_parking_prompt() -> str:
     """
-    Prompt for analyzing pathway/aisle accessibility.
+    Prompt for analyzing parking area accessibility.
     
     ADA Requirements (Summary):
-    - Minimum width: 36 inches continuous
-    - Passing space: 60 x 60 inches every 200 feet
-    - No protruding objects
-    - Changes in level: maximum 0.5 inches
+    - Accessible parking spaces: 96 inches minimum width
+    - Access aisle: 60 inches minimum (96" for van-accessible)
+    - Signage: Required at each space
+    - Surface: Stable, firm, slip-resistant
     """
-    return """Analyze this pathway/aisle for ADA compliance.
+    return PARKING_PROMPT
+
+
+PATHWAY_PROMPT = """Analyze this pathway/aisle for ADA compliance.
 
 Check for these potential violations:
 
@@ -162,34 +163,25 @@ Check for these potential violations:
    - ADA Code: 303
    - Maximum: 0.5 inches, must be beveled if 0.25-0.5 inches
 
-Provide your response in JSON format:
-{
-    "violations": [
-        {
-            "type": "Width" | "Obstruction" | "Surface" | "Protrusion" | "Level Change",
-            "severity": "Critical" | "Moderate" | "Minor",
-            "ada_code": "section number",
-            "description": "brief description of the issue",
-            "recommendation": "how to fix it",
-            "confidence": 0.0 to 1.0
-        }
-    ],
-    "overall_assessment": "brief summary",
-    "notes": "any limitations or caveats"
-}"""
+Violation types: "Width" | "Obstruction" | "Surface" | "Protrusion" | "Level Change"
 
+Respond in the JSON format given in the system prompt."""
 
-def get_ramp_prompt() -> str:
+
+def get_pathway_prompt() -> str:
     """
-    Prompt for analyzing ramp accessibility.
+    Prompt for analyzing pathway/aisle accessibility.
     
     ADA Requirements (Summary):
-    - Maximum slope: 1:12 (8.33%)
-    - Minimum width: 36 inches
-    - Handrails: Required if rise > 6 inches
-    - Edge protection: Required
+    - Minimum width: 36 inches continuous
+    - Passing space: 60 x 60 inches every 200 feet
+    - No protruding objects
+    - Changes in level: maximum 0.5 inches
     """
-    return """Analyze this ramp for ADA compliance.
+    return PATHWAY_PROMPT
+
+
+RAMP_PROMPT = """Analyze this ramp for ADA compliance.
 
 Check for these potential violations:
 
@@ -218,34 +210,25 @@ Check for these potential violations:
    - ADA Code: 405.7
    - Minimum: 60 inches long
 
-Provide your response in JSON format:
-{
-    "violations": [
-        {
-            "type": "Slope" | "Width" | "Handrails" | "Edge Protection" | "Surface" | "Landings",
-            "severity": "Critical" | "Moderate" | "Minor",
-            "ada_code": "section number",
-            "description": "brief description of the issue",
-            "recommendation": "how to fix it",
-            "confidence": 0.0 to 1.0
-        }
-    ],
-    "overall_assessment": "brief summary",
-    "notes": "any limitations or caveats"
-}"""
+Violation types: "Slope" | "Width" | "Handrails" | "Edge Protection" | "Surface" | "Landings"
 
+Respond in the JSON format given in the system prompt."""
 
-def get_signage_prompt() -> str:
+
+def get_ramp_prompt() -> str:
     """
-    Prompt for analyzing signage accessibility.
+    Prompt for analyzing ramp accessibility.
     
     ADA Requirements (Summary):
-    - Raised characters: 5/8 to 2 inches high
-    - Braille: Required for permanent room identification
-    - Mounting height: 48-60 inches above floor
-    - Color contrast: Required for visibility
+    - Maximum slope: 1:12 (8.33%)
+    - Minimum width: 36 inches
+    - Handrails: Required if rise > 6 inches
+    - Edge protection: Required
     """
-    return """Analyze this signage for ADA compliance.
+    return RAMP_PROMPT
+
+
+SIGNAGE_PROMPT = """Analyze this signage for ADA compliance.
 
 Check for these potential violations:
 
@@ -269,30 +252,25 @@ Check for these potential violations:
 5. **Finish**: Does the sign appear to have a non-glare finish?
    - ADA Code: 703.5
 
-Provide your response in JSON format:
-{
-    "violations": [
-        {
-            "type": "Braille" | "Character Height" | "Mounting Height" | "Contrast" | "Finish",
-            "severity": "Critical" | "Moderate" | "Minor",
-            "ada_code": "section number",
-            "description": "brief description of the issue",
-            "recommendation": "how to fix it",
-            "confidence": 0.0 to 1.0
-        }
-    ],
-    "overall_assessment": "brief summary",
-    "notes": "any limitations or caveats"
-}"""
+Violation types: "Braille" | "Character Height" | "Mounting Height" | "Contrast" | "Finish"
 
+Respond in the JSON format given in the system prompt."""
 
-def get_general_prompt() -> str:
+
+def get_signage_prompt() -> str:
     """
-    General prompt for objects that don't fit specific categories.
+    Prompt for analyzing signage accessibility.
     
-    Used for: furniture, obstacles, general accessibility features
+    ADA Requirements (Summary):
+    - Raised characters: 5/8 to 2 inches high
+    - Braille: Required for permanent room identification
+    - Mounting height: 48-60 inches above floor
+    - Color contrast: Required for visibility
     """
-    return """Analyze this image for general ADA accessibility concerns.
+    return SIGNAGE_PROMPT
+
+
+GENERAL_PROMPT = """Analyze this image for general ADA accessibility concerns.
 
 Look for:
 
@@ -304,49 +282,194 @@ Look for:
 4. **Clear Floor Space**: Adequate maneuvering space (30x48 inches minimum)
 5. **Surface Conditions**: Level floors, slip resistance
 
-Provide your response in JSON format:
-{
-    "violations": [
+Use a short descriptive violation type.
+
+Respond in the JSON format given in the system prompt."""
+
+
+def get_general_prompt() -> str:
+    """
+    General prompt for objects that don't fit specific categories.
+    
+    Used for: furniture, obstacles, general accessibility features
+    """
+    return GENERAL_PROMPT
+
+
+def get_batch_instruction(count: int) -> str:
+    """
+    Instruction that introduces a request holding several images.
+    
+    Each image is followed by its own analysis prompt; this asks Claude
+    to answer all of them as one JSON array of the system prompt's format.
+    """
+    return f"""You will be shown {count} images, each followed by the analysis to perform on it.
+
+Analyze each image independently. Respond with a JSON array of exactly {count} objects,
+one per image and in the same order. Each object must use the JSON format given in
+the system prompt, with the violation types listed for its image."""
+
+
+def _ada_reference_text() -> str:
+    """Every entry of the ADA code table as one reference list."""
+    lines = ["ADA STANDARDS REFERENCE (2010 ADA Standards for Accessible Design):"]
+    for code, info in ADA_CODES.items():
+        lines.append(f"- {code} {info.title}: {info.requirement} ({info.measurement})")
+    return "\n".join(lines)
+
+
+# General ADA requirements that apply to every category. Appended to the
+# system block when it would otherwise be too short to be cached.
+_ADA_GENERAL_REQUIREMENTS = """GENERAL ADA REQUIREMENTS (2010 ADA Standards, applicable to all elements):
+- 208.2 Minimum Number: Parking facilities with 1 to 25 total spaces require at least 1 accessible space; 26 to 50 require 2; 51 to 75 require 3; 76 to 100 require 4
+- 208.2.4 Van Parking Spaces: For every 6 or fraction of 6 accessible parking spaces, at least 1 shall be a van parking space
+- 302.3 Openings: Openings in floor or ground surfaces shall not allow passage of a sphere more than 1/2 inch (13 mm) diameter
+- 303.3 Beveled: Changes in level between 1/4 inch and 1/2 inch shall be beveled with a slope not steeper than 1:2
+- 305.3 Clear Floor Space: The clear floor or ground space shall be 30 inches (760 mm) minimum by 48 inches (1220 mm) minimum
+- 307.4 Vertical Clearance: Vertical clearance shall be 80 inches (2030 mm) high minimum along circulation paths
+- 308.2.1 Forward Reach: Where a forward reach is unobstructed, the high forward reach shall be 48 inches maximum and the low forward reach shall be 15 inches minimum above the finish floor
+- 309.4 Operation: Operable parts shall be operable with one hand and shall not require tight grasping, pinching, or twisting of the wrist; the force required shall be 5 pounds (22.2 N) maximum
+- 403.3 Slope: The running slope of walking surfaces shall not be steeper than 1:20; the cross slope shall not be steeper than 1:48
+- 403.5.3 Passing Spaces: Accessible routes with a clear width less than 60 inches shall provide passing spaces at intervals of 200 feet maximum
+- 404.2.4 Maneuvering Clearances: Minimum maneuvering clearances at doors shall be provided; a front approach on the pull side requires 18 inches minimum beyond the latch side
+- 404.2.9 Door Opening Force: Fire doors shall have the minimum opening force allowable by the authority having jurisdiction; other interior hinged doors shall require 5 pounds (22.2 N) maximum
+- 405.3 Cross Slope: Cross slope of ramp runs shall not be steeper than 1:48
+- 405.6 Rise: The rise for any ramp run shall be 30 inches (760 mm) maximum
+- 406.3 Sides of Curb Ramps: Where provided, curb ramp flares shall not be steeper than 1:10
+- 502.2 Van Spaces: Van parking spaces shall be 132 inches (3350 mm) wide minimum, or 96 inches wide minimum where the adjacent access aisle is 96 inches wide minimum
+- 502.3.3 Marking: Access aisles shall be marked so as to discourage parking in them
+- 703.7.2.1 International Symbol of Accessibility: The International Symbol of Accessibility identifies accessible parking spaces, entrances and facilities"""
+
+
+def _estimate_tokens(text: str) -> int:
+    """
+    Conservative token count for text.
+    
+    English text averages well under 4 characters per token, so this
+    undercounts; a prompt estimated above a threshold really is above it.
+    """
+    return len(text) // 4
+
+
+def _cacheable(text: str) -> str:
+    """
+    Make sure a cache-breakpoint block is long enough to be cached.
+    
+    The API silently skips caching prompts shorter than
+    config.PROMPT_CACHE_MIN_TOKENS, so short text gets the general ADA
+    requirements appended (real reference material, not filler). If it
+    still looks too short, a warning is logged; requests work either way,
+    they just aren't cached.
+    """
+    if _estimate_tokens(text) < config.PROMPT_CACHE_MIN_TOKENS:
+        text += "\n\n" + _ADA_GENERAL_REQUIREMENTS
+    estimate = _estimate_tokens(text)
+    if estimate < config.PROMPT_CACHE_MIN_TOKENS:
+        logger.warning("⚠ System prompt is about %d tokens, below the %d the API caches; "
+                       "prompt caching may be skipped",
+                       estimate, config.PROMPT_CACHE_MIN_TOKENS)
+    return text
+
+
+# System blocks sent with every Claude request. They never change, so the
+# block is marked for prompt caching: after the first request the API
+# reuses it instead of processing the role and ADA reference again.
+# It is cached for config.PROMPT_CACHE_TTL; the category blocks after it
+# keep the default 5 minutes (longer TTLs must come first). Each category
+# breakpoint covers this block too, so only this one needs the length check
+SYSTEM_BLOCKS = [
+    {
+        "type": "text",
+        "text": _cacheable(SYSTEM_PROMPT + "\n\n" + _JSON_SCHEMA_BLOCK + "\n\n"
+                           + _ada_reference_text()),
+        "cache_control": {"type": "ephemeral", "ttl": config.PROMPT_CACHE_TTL}
+    }
+]
+
+# User text sent after the image when the analysis prompt itself travels
+# in the (cached) system blocks
+IMAGE_INSTRUCTION = "Analyze the image above as instructed and respond in the requested JSON format."
+
+
+@lru_cache(maxsize=None)
+def get_prompt_blocks(prompt: str) -> list:
+    """
+    System blocks for a single-image request that uses prompt.
+    
+    SYSTEM_BLOCKS first, then the category prompt with its own cache
+    breakpoint. Every request for the same category then shares one
+    byte-identical cached prefix, and only the image after it is new.
+    Nothing detection-specific may be put into these blocks.
+    """
+    return SYSTEM_BLOCKS + [
         {
-            "type": "descriptive type",
-            "severity": "Critical" | "Moderate" | "Minor",
-            "ada_code": "section number if applicable",
-            "description": "brief description of the issue",
-            "recommendation": "how to fix it",
-            "confidence": 0.0 to 1.0
+            "type": "text",
+            "text": prompt,
+            "cache_control": {"type": "ephemeral"}
         }
-    ],
-    "overall_assessment": "brief summary",
-    "notes": "any limitations or caveats"
-}
+    ]
 
-If no accessibility concerns are visible, return an empty violations array."""
 
+def get_prompt_blocks_for_object(object_name: str) -> list:
+    """System blocks (role, ADA reference, category prompt) for an object type."""
+    return get_prompt_blocks(get_prompt_for_object(object_name))
 
-# Mapping of object types to their specific prompts
+
+# Mapping of object types to their specific prompt strings
 PROMPT_MAPPING = {
-    "door": get_doorway_prompt,
-    "entrance": get_doorway_prompt,
-    "car": get_parking_prompt,
-    "truck": get_parking_prompt,
-    "parking": get_parking_prompt,
-    "person": get_pathway_prompt,  # Person in pathway context
-    "chair": get_pathway_prompt,   # Potential obstruction
-    "couch": get_pathway_prompt,   # Potential obstruction
-    "bench": get_pathway_prompt,   # Potential obstruction
-    "potted_plant": get_pathway_prompt,  # Potential obstruction
-    "ramp": get_ramp_prompt,
-    "sign": get_signage_prompt,
-    "stop_sign": get_signage_prompt,
+    "door": DOORWAY_PROMPT,
+    "entrance": DOORWAY_PROMPT,
+    "car": PARKING_PROMPT,
+    "truck": PARKING_PROMPT,
+    "parking": PARKING_PROMPT,
+    "person": PATHWAY_PROMPT,  # Person in pathway context
+    "chair": PATHWAY_PROMPT,   # Potential obstruction
+    "couch": PATHWAY_PROMPT,   # Potential obstruction
+    "bench": PATHWAY_PROMPT,   # Potential obstruction
+    "potted_plant": PATHWAY_PROMPT,  # Potential obstruction
+    "ramp": RAMP_PROMPT,
+    "sign": SIGNAGE_PROMPT,
+    "stop_sign": SIGNAGE_PROMPT,
 }
 
+# Object types worth sending for analysis: everything with a dedicated
+# prompt plus the relevant classes that get the general prompt. Anything
+# else (e.g. "dog", "kite") is skipped before cropping or any API call.
+CLASSES_REQUIRING_ANALYSIS = frozenset(PROMPT_MAPPING) | frozenset({
+    "parking_meter",
+    "dining_table",
+    "toilet",
+    "tv",
+    "mouse",
+    "book",
+})
+
+# Prompt for every class in CLASSES_REQUIRING_ANALYSIS, resolved once, so
+# a single lookup answers both "analyze this?" and "with which prompt?"
+ANALYSIS_PROMPTS = MappingProxyType({
+    name: PROMPT_MAPPING.get(name, GENERAL_PROMPT)
+    for name in CLASSES_REQUIRING_ANALYSIS
+})
+
+
+def normalize_object_name(object_name: str) -> str:
+    """
+    Object name in the form used as PROMPT_MAPPING keys.
+    
+    Lowercase, trimmed, with spaces as underscores, so YOLO's
+    "Stop Sign " or "stop sign" both become "stop_sign".
+    """
+    return object_name.lower().strip().replace(" ", "_")
+
 
-def get_prompt_for_object(object_name: str) -> str:
+def get_prompt_for_object(object_name: str, normalized: bool = False) -> str:
     """
     Get the appropriate prompt template for an object type.
     
     Args:
         object_name: Name of the detected object (e.g., "door", "car")
+        normalized: True if object_name is already in normalize_object_name
+            form (ObjectDetector's class names are), to skip normalizing
         
     Returns:
         Appropriate prompt string
@@ -356,15 +479,11 @@ def get_prompt_for_object(object_name: str) -> str:
     - Easy to add new object types
     - Falls back to general prompt if no specific one exists
     """
-    # Normalize object name (lowercase, handle variations)
-    obj_lower = object_name.lower().strip()
-    
-    # Check if we have a specific prompt for this object
-    if obj_lower in PROMPT_MAPPING:
-        return PROMPT_MAPPING[obj_lower]()
+    if not normalized:
+        object_name = normalize_object_name(object_name)
     
-    # Default to general prompt
-    return get_general_prompt()
+    # Prompts are built once at import, so this is a single dict lookup
+    return PROMPT_MAPPING.get(object_name, GENERAL_PROMPT)
 
 
 if __name__ == "__main__":
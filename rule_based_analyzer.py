@@ -7,14 +7,18 @@ Uses traditional computer vision techniques (no neural networks).
 This is the main entry point that routes detections to specialized analyzers.
 """
 
+import threading
+import cv2
 import numpy as np
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
 import sys
 from pathlib import Path
 
 # Add parent directory to path for imports
 sys.path.append(str(Path(__file__).parent.parent))
 
+import config
 from base_analyzer import BaseAnalyzer, ViolationResult
 from cv_rules.door_analyzer import DoorAnalyzer
 from cv_rules.parking_analyzer import ParkingAnalyzer
@@ -22,6 +26,11 @@ from cv_rules.pathway_analyzer import PathwayAnalyzer
 from cv_rules.ramp_analyzer import RampAnalyzer
 from cv_rules.signage_analyzer import SignageAnalyzer
 
+# Some OpenCV builds start with the SIMD code paths off or a
+# single-threaded pool; every analyzer below relies on both
+cv2.setUseOptimized(True)
+cv2.setNumThreads(config.OPENCV_THREADS)
+
 
 class RuleBasedAnalyzer(BaseAnalyzer):
     """
@@ -47,10 +56,26 @@ class RuleBasedAnalyzer(BaseAnalyzer):
         self.signage_analyzer = SignageAnalyzer()
         
         # Object type mappings
-        self.door_objects = ['door', 'entrance']
-        self.parking_objects = ['car', 'truck', 'bus', 'parking']
-        self.ramp_objects = ['ramp', 'stairs', 'steps']
-        self.sign_objects = ['sign', 'signage', 'stop_sign', 'street_sign']
+        self.door_objects = frozenset({'door', 'entrance'})
+        self.parking_objects = frozenset({'car', 'truck', 'bus', 'parking'})
+        self.ramp_objects = frozenset({'ramp', 'stairs', 'steps'})
+        self.sign_objects = frozenset({'sign', 'signage', 'stop_sign', 'street_sign'})
+        
+        # Routing table: object type -> specialized analyzer
+        self._routes = {}
+        for object_types, analyzer in ((self.door_objects, self.door_analyzer),
+                                       (self.parking_objects, self.parking_analyzer),
+                                       (self.ramp_objects, self.ramp_analyzer),
+                                       (self.sign_objects, self.signage_analyzer)):
+            for object_type in object_types:
+                self._routes[object_type] = analyzer
+        
+        # Threads used to analyze the detections of one image side by side;
+        # OpenCV and the numba kernels release the GIL (1 keeps everything
+        # on the calling thread). The pool is started on first use
+        self.max_workers = config.RULE_BASED_WORKERS
+        self._executor = None
+        self._executor_lock = threading.Lock()
         
         print(f"✓ Rule-based analyzer initialized with 5 specialized analyzers")
     
@@ -65,35 +90,104 @@ class RuleBasedAnalyzer(BaseAnalyzer):
         Returns:
             List of ViolationResult objects
         """
-        object_type = detection.class_name.lower()
+        analyzer = self._route(detection)
+        
+        # Get cropped region of detected object, unless the analyzer only
+        # looks at the bounding box and takes the full frame
+        if not getattr(analyzer, 'needs_crop', True):
+            return self._to_violation_results(analyzer.analyze(image, detection))
         
-        # Get cropped region of detected object
         try:
             cropped = detection.get_crop(image)
         except Exception as e:
             print(f"  ⚠ Error cropping image: {e}")
             return []
         
-        # Route to appropriate analyzer
-        violations_dicts = []
+        return self._to_violation_results(analyzer.analyze(cropped, detection))
+    
+    def analyze_batch(self, image: np.ndarray, detections: List) -> Dict[int, List[ViolationResult]]:
+        """
+        Analyze detections, giving batch-capable analyzers all their crops at once.
         
-        if object_type in self.door_objects:
-            violations_dicts = self.door_analyzer.analyze(cropped, detection)
+        Detections routed to a specialized analyzer with an analyze_batch
+        method (ParkingAnalyzer, SignageAnalyzer) are collected and analyzed in one call;
+        the rest go through analyze_detection, spread over max_workers
+        threads. Cached results are reused either way; the cache itself
+        is only touched from the calling thread.
+        """
+        results = {}
+        groups = {}
+        singles = []
         
-        elif object_type in self.parking_objects:
-            violations_dicts = self.parking_analyzer.analyze(cropped, detection)
+        for position, detection in enumerate(detections):
+            key = self._result_key(image, detection) if self.cache_results else None
+            cached = self._cache_lookup(key)
+            if cached is not None:
+                results[position] = cached
+                continue
+            
+            analyzer = self._route(detection)
+            if hasattr(analyzer, 'analyze_batch'):
+                groups.setdefault(analyzer, []).append((position, detection, key))
+            else:
+                singles.append((position, detection, key))
         
-        elif object_type in self.ramp_objects:
-            violations_dicts = self.ramp_analyzer.analyze(cropped, detection)
+        if len(singles) > 1 and self.max_workers > 1:
+            all_violations = self._get_executor().map(
+                lambda job: self.analyze_detection(image, job[1]), singles)
+        else:
+            all_violations = (self.analyze_detection(image, detection)
+                              for _, detection, _ in singles)
         
-        elif object_type in self.sign_objects:
-            violations_dicts = self.signage_analyzer.analyze(cropped, detection)
+        for (position, _, key), violations in zip(singles, all_violations):
+            self._cache_store(key, violations)
+            results[position] = violations
         
-        else:
-            # Check if object might obstruct pathways
-            violations_dicts = self.pathway_analyzer.analyze(cropped, detection)
+        for analyzer, jobs in groups.items():
+            crops = [detection.get_crop(image) for _, detection, _ in jobs]
+            batch = analyzer.analyze_batch(crops, [detection for _, detection, _ in jobs])
+            for (position, _, key), violations_dicts in zip(jobs, batch):
+                violations = self._to_violation_results(violations_dicts)
+                self._cache_store(key, violations)
+                results[position] = violations
         
-        # Convert dictionaries to ViolationResult objects
+        return {position: results[position] for position in range(len(detections))}
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """The worker pool for analyze_batch, started on first use."""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix="rule-based-cv")
+            return self._executor
+    
+    def close(self):
+        """Stop the worker threads; a later analyze_batch starts new ones."""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    def _result_key(self, image: np.ndarray, detection) -> tuple:
+        """
+        Cache key that also records the frame size, since analyzers
+        that take the full frame (PathwayAnalyzer) measure against it.
+        """
+        return super()._result_key(image, detection) + (image.shape[:2],)
+    
+    def _route(self, detection):
+        """Specialized analyzer responsible for a detection's object type."""
+        # Anything else is checked as a possible pathway obstruction
+        return self._routes.get(detection.class_name.lower(), self.pathway_analyzer)
+    
+    def _to_violation_results(self, violations_dicts: List[Dict]) -> List[ViolationResult]:
+        """Convert a specialized analyzer's violation dicts to ViolationResult objects."""
         violations = []
         for v_dict in violations_dicts:
             try:
@@ -149,7 +243,7 @@ if __name__ == "__main__":
             return image[y:y+h, x:x+w]
     
     # Test with different object types
-    test_image = np.ones((480, 640, 3), dtype=np.uint8) * 128
+    test_image = np.full((480, 640, 3), 128, dtype=np.uint8)
     
     test_cases = [
         ('door', [100, 100, 80, 300]),  # Narrow door
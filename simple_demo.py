@@ -6,15 +6,35 @@ Now lets you choose which analyzer to use!
 """
 
 import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import config
-from demo import run_demo
 
 
-def list_test_images():
-    """Show all available test images."""
-    test_images = list(config.TEST_IMAGES_DIR.glob("*.jpg")) + \
-                 list(config.TEST_IMAGES_DIR.glob("*.png"))
+def scan_test_images():
+    """
+    (name, size in bytes, path) of every JPG/PNG in the test images folder.
+    
+    One os.scandir pass; the sizes come from the same directory entries,
+    so listing them needs no extra stat calls. JPGs are listed first.
+    """
+    with os.scandir(config.TEST_IMAGES_DIR) as it:
+        items = [(e.name, e.stat().st_size, e.path) for e in it
+                 if e.is_file() and e.name.lower().endswith((".jpg", ".png"))]
+    
+    items.sort(key=lambda item: item[0].lower().endswith(".png"))
+    return items
+
+
+def list_test_images(test_images=None):
+    """
+    Show all available test images.
+    
+    Pass the list from an earlier call to show it again without
+    rescanning the folder.
+    """
+    if test_images is None:
+        test_images = scan_test_images()
     
     if not test_images:
         print("❌ No test images found in test_images/ folder")
@@ -24,9 +44,8 @@ def list_test_images():
         return []
     
     print(f"\n📸 Found {len(test_images)} test image(s):\n")
-    for i, img in enumerate(test_images, 1):
-        size = os.path.getsize(img) / 1024  # KB
-        print(f"  {i}. {img.name:30s} ({size:.1f} KB)")
+    print("\n".join(f"  {i}. {name:30s} ({size / 1024:.1f} KB)"
+                    for i, (name, size, _) in enumerate(test_images, 1)))
     
     return test_images
 
@@ -50,6 +69,27 @@ def choose_analyzer():
         return 'rule_based'  # Default
 
 
+def build_pipeline(analyzer_type: str, use_real_yolo: bool = True) -> dict:
+    """
+    Detector, analyzer and visualizer for run_demo, created once.
+    
+    Loading the YOLO weights and setting up the analyzer dominate a
+    single run, so every image analyzed in a session shares these.
+    
+    Returns:
+        Keyword arguments for run_demo (detector, analyzer, visualizer)
+    """
+    from object_detector import ObjectDetector
+    from compliance_analyzer import ComplianceAnalyzer
+    from visualizer import ViolationVisualizer
+    
+    return {
+        "detector": ObjectDetector(use_mock=not use_real_yolo),
+        "analyzer": ComplianceAnalyzer(use_mock=False, analyzer_type=analyzer_type),
+        "visualizer": ViolationVisualizer()
+    }
+
+
 def interactive_demo():
     """Run interactive demo with image and analyzer selection."""
     print("=" * 80)
@@ -60,76 +100,163 @@ def interactive_demo():
     analyzer_type = choose_analyzer()
     print(f"\n✓ Selected analyzer: {analyzer_type}")
     
-    # List available images
+    # List available images (scanned once; 'r' rescans the folder)
     test_images = list_test_images()
     
     if not test_images:
         return
     
-    # Let user choose image
-    print("\n" + "-" * 80)
-    choice = input("\nEnter image number to analyze (or 'q' to quit): ").strip()
+    # Built on the first analysis, then reused for every further image
+    pipeline = None
     
-    if choice.lower() == 'q':
-        print("Goodbye!")
-        return
+    while True:
+        # Let user choose image
+        print("\n" + "-" * 80)
+        choice = input("\nEnter image number to analyze ('r' to rescan, 'q' to quit): ").strip()
+        
+        if choice.lower() == 'q':
+            print("Goodbye!")
+            return
+        
+        if choice.lower() == 'r':
+            test_images = list_test_images()
+            if not test_images:
+                return
+            continue
+        
+        try:
+            idx = int(choice) - 1
+        except ValueError:
+            print("❌ Please enter a valid number.")
+            continue
+        
+        if not 0 <= idx < len(test_images):
+            print("❌ Invalid number. Please try again.")
+            continue
+        
+        name, _, path = test_images[idx]
+        print(f"\n✓ Selected: {name}\n")
+        
+        from demo import run_demo
+        
+        if pipeline is None:
+            pipeline = build_pipeline(analyzer_type, use_real_yolo=True)  # ⚠️ Using real YOLO as configured
+        
+        # Run the demo with chosen analyzer
+        run_demo(
+            path,
+            use_real_yolo=True,
+            analyzer_type=analyzer_type,
+            **pipeline
+        )
+        
+        print("\n" + "=" * 80)
+        print("  DONE! Check the outputs/ folder for results")
+        print("=" * 80)
+        
+        # Ask if they want to analyze another
+        print("\n" + "-" * 80)
+        again = input("Analyze another image? (y/n): ").strip().lower()
+        if again != 'y':
+            return
+        
+        print("\n")
+        list_test_images(test_images)
+
+
+# Pipeline of a quick_test_all worker process, built once per process
+_worker_pipeline = None
+
+
+def _init_worker(analyzer_type: str):
+    """
+    Process pool initializer: build this worker's pipeline.
     
+    The cores are already shared out between the worker processes, so
+    each worker keeps OpenCV, the numba kernels and the rule-based
+    analyzer to one thread instead of stacking their pools on top.
+    """
+    import cv2
+    global _worker_pipeline
+    _worker_pipeline = build_pipeline(analyzer_type, use_real_yolo=True)
+    
+    cv2.setNumThreads(1)
     try:
-        idx = int(choice) - 1
-        if 0 <= idx < len(test_images):
-            selected_image = test_images[idx]
-            print(f"\n✓ Selected: {selected_image.name}\n")
-            
-            # Run the demo with chosen analyzer
-            run_demo(
-                str(selected_image),
-                use_real_yolo=True,  # ⚠️ Using real YOLO as configured
-                analyzer_type=analyzer_type
-            )
-            
-            print("\n" + "=" * 80)
-            print("  DONE! Check the outputs/ folder for results")
-            print("=" * 80)
-            
-            # Ask if they want to analyze another
-            print("\n" + "-" * 80)
-            again = input("Analyze another image? (y/n): ").strip().lower()
-            if again == 'y':
-                print("\n")
-                interactive_demo()
-        else:
-            print("❌ Invalid number. Please try again.")
-            interactive_demo()
-    except ValueError:
-        print("❌ Please enter a valid number.")
-        interactive_demo()
+        import numba
+        numba.set_num_threads(1)
+    except ImportError:
+        pass
+    
+    analyzer = _worker_pipeline["analyzer"].analyzer
+    if hasattr(analyzer, "max_workers"):
+        analyzer.max_workers = 1
 
 
-def quick_test_all(analyzer_type='rule_based'):
-    """Quickly test all images with chosen analyzer."""
-    test_images = list(config.TEST_IMAGES_DIR.glob("*.jpg")) + \
-                 list(config.TEST_IMAGES_DIR.glob("*.png"))
+def _test_image(job: tuple):
+    """
+    Run the demo on one image of quick_test_all.
+    
+    Runs in the calling process with the pipeline passed in, or in a
+    worker process with that worker's own pipeline.
+    """
+    i, total, name, path, analyzer_type, pipeline = job
+    from demo import run_demo
+    import output_writer
+    
+    print(f"\n{'=' * 80}")
+    print(f"  [{i}/{total}] Processing: {name}")
+    print('=' * 80)
+    
+    try:
+        run_demo(
+            path,
+            use_real_yolo=True,
+            analyzer_type=analyzer_type,
+            **(pipeline or _worker_pipeline)
+        )
+    except Exception as e:
+        print(f"❌ Error processing {name}: {e}")
+    
+    # Worker processes exit without running atexit, so write out this
+    # image's results before taking the next one
+    output_writer.flush()
+
+
+def quick_test_all(analyzer_type='rule_based', processes: int = None):
+    """
+    Quickly test all images with chosen analyzer.
+    
+    Images are independent, so with more than one process
+    (config.DEMO_PROCESSES by default) they are spread over a process
+    pool; each worker builds the detector, analyzer and visualizer once
+    and reuses them for every image it gets. Progress output of images
+    running side by side is interleaved.
+    """
+    test_images = scan_test_images()
     
     if not test_images:
         print("❌ No test images found")
         return
     
+    if processes is None:
+        processes = config.DEMO_PROCESSES
+    processes = min(processes, len(test_images))
+    
     print(f"\n🚀 Testing all {len(test_images)} images with {analyzer_type} analyzer...\n")
     
-    for i, img in enumerate(test_images, 1):
-        print(f"\n{'=' * 80}")
-        print(f"  [{i}/{len(test_images)}] Processing: {img.name}")
-        print('=' * 80)
-        
-        try:
-            run_demo(
-                str(img),
-                use_real_yolo=True,
-                analyzer_type=analyzer_type
-            )
-        except Exception as e:
-            print(f"❌ Error processing {img.name}: {e}")
-            continue
+    total = len(test_images)
+    if processes > 1:
+        print(f"ℹ Using {processes} worker processes")
+        jobs = [(i, total, name, path, analyzer_type, None)
+                for i, (name, _, path) in enumerate(test_images, 1)]
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                                 initargs=(analyzer_type,)) as pool:
+            list(pool.map(_test_image, jobs))
+    else:
+        # One detector/analyzer/visualizer for all images
+        pipeline = build_pipeline(analyzer_type, use_real_yolo=True)
+        for i, (name, _, path) in enumerate(test_images, 1):
+            _test_image((i, total, name, path, analyzer_type, pipeline))
     
     print("\n✓ All images processed! Check outputs/ folder.")
 
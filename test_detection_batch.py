@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Detection Batch Test Script
+
+Checks the columnar detection code every detection passes through:
+- DetectionBatch built from DetectionResult objects and from YOLO's
+  [x1, y1, x2, y2, conf, cls] rows, and turned back into objects
+- filter_relevant_objects' class mask, including class IDs outside the
+  0-255 lookup table (the mock detector's 99, negative values)
+"""
+
+import sys
+import numpy as np
+
+
+def _detection(class_id: int, class_name: str, confidence: float,
+               x: int, y: int, w: int, h: int):
+    """A DetectionResult with its center filled in."""
+    from object_detector import DetectionResult
+    return DetectionResult(class_id=class_id, class_name=class_name, confidence=confidence,
+                           x=x, y=y, width=w, height=h, cx=x + w // 2, cy=y + h // 2)
+
+
+def _check(label: str, ok: bool) -> bool:
+    """Print one check's result."""
+    print(f"  {'✓' if ok else '✗'} {label}")
+    return ok
+
+
+def _same_detections(a, b) -> bool:
+    """
+    Whether two DetectionResult lists match field for field.
+
+    Confidences are compared at float32 precision, the precision the
+    batch (like YOLO's own output) stores them in.
+    """
+    if len(a) != len(b):
+        return False
+    for d, e in zip(a, b):
+        if (d.class_id, d.class_name, d.bbox, d.cx, d.cy) != \
+                (e.class_id, e.class_name, e.bbox, e.cx, e.cy):
+            return False
+        if np.float32(d.confidence) != np.float32(e.confidence):
+            return False
+    return True
+
+
+def test_round_trip():
+    """DetectionResult objects -> DetectionBatch -> DetectionResult objects."""
+    print("Testing DetectionResult round trip...")
+    from object_detector import DetectionBatch
+
+    detections = [
+        _detection(0, "person", 0.91, 10, 20, 50, 120),
+        _detection(99, "unknown", 0.50, 0, 0, 31, 17),
+        _detection(56, "chair", 0.66, 300, 200, 45, 60),
+    ]
+    batch = DetectionBatch.from_detections(detections)
+
+    results = [
+        _check("same detections back, in order", _same_detections(list(batch), detections)),
+        _check("len matches", len(batch) == len(detections)),
+        _check("xywh columns", batch.xywh.tolist() == [list(d.bbox) for d in detections]),
+        _check("boolean mask selects rows",
+               _same_detections(list(batch[np.array([True, False, True])]),
+                                [detections[0], detections[2]])),
+        _check("empty list", len(DetectionBatch.from_detections([])) == 0
+               and list(DetectionBatch.from_detections([])) == []),
+    ]
+    return all(results)
+
+
+def test_from_xyxy():
+    """Rows in ultralytics' boxes.data layout become the right detections."""
+    print("\nTesting DetectionBatch.from_xyxy...")
+    from object_detector import DetectionBatch
+
+    data = np.array([[10, 20, 60, 140, 0.91, 0],
+                     [300, 200, 345, 260, 0.66, 56]], dtype=np.float32)
+    batch = DetectionBatch.from_xyxy(data, {0: "person", 56: "chair"})
+    expected = [
+        _detection(0, "person", 0.91, 10, 20, 50, 120),
+        _detection(56, "chair", 0.66, 300, 200, 45, 60),
+    ]
+
+    results = [
+        _check("corners converted to x, y, width, height",
+               _same_detections(list(batch), expected)),
+        _check("unknown class ID named by its number",
+               list(DetectionBatch.from_xyxy([[0, 0, 5, 5, 0.5, 7]], {}))[0].class_name == "7"),
+        _check("no boxes", len(DetectionBatch.from_xyxy(np.zeros((0, 6)), {})) == 0),
+    ]
+    return all(results)
+
+
+def test_relevant_mask():
+    """Only RELEVANT_CLASSES are kept, whatever the class IDs look like."""
+    print("\nTesting filter_relevant_objects class mask...")
+    import config
+    from object_detector import ObjectDetector
+
+    detector = ObjectDetector(use_mock=True)
+    detector.verbose = False
+
+    # Relevant IDs, plus IDs that would alias relevant ones if the mask
+    # were indexed without a range check (negative indices count from the
+    # end of the table, 256 + n would wrap)
+    class_ids = [0, 2, 56, 99, 3, -1, -256, -254, 256, 258, 1000]
+    detections = [_detection(class_id, str(class_id), 0.8, 10 * i, 0, 10, 10)
+                  for i, class_id in enumerate(class_ids)]
+    kept = [d.class_id for d in detector.filter_relevant_objects(detections)]
+
+    results = [
+        _check("relevant classes kept, in order", kept == [0, 2, 56]),
+        _check("mock's unknown class (99) dropped", 99 not in kept),
+        _check("negative and out-of-table IDs dropped",
+               not any(c < 0 or c >= len(config.RELEVANT_CLASS_MASK) for c in kept)),
+        _check("no detections", detector.filter_relevant_objects([]) == []),
+    ]
+    return all(results)
+
+
+def main():
+    """Run all tests"""
+    print("=" * 60)
+    print("ADA Compliance System - Detection Batch Test")
+    print("=" * 60)
+
+    tests = [
+        test_round_trip,
+        test_from_xyxy,
+        test_relevant_mask,
+    ]
+    results = [test() for test in tests]
+
+    print("\n" + "=" * 60)
+    if all(results):
+        print("✓ ALL TESTS PASSED")
+        print("=" * 60)
+        return 0
+    print("✗ SOME TESTS FAILED - See above")
+    print("=" * 60)
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Duplicate Detection Test Script
+
+Checks the code that decides which detections get analyzed at all:
+- bbox_utils near-duplicate filtering (iou_filter and friends)
+- BaseAnalyzer skipping duplicates and pointing them at the kept box
+- The numba and NumPy versions of the mock detector's rect rules
+"""
+
+import sys
+import numpy as np
+
+
+def _detection(class_name: str, confidence: float, x: int, y: int, w: int, h: int,
+               class_id: int = 0):
+    """A DetectionResult with its center filled in."""
+    from object_detector import DetectionResult
+    return DetectionResult(class_id=class_id, class_name=class_name, confidence=confidence,
+                           x=x, y=y, width=w, height=h, cx=x + w // 2, cy=y + h // 2)
+
+
+def _check(label: str, ok: bool) -> bool:
+    """Print one check's result."""
+    print(f"  {'✓' if ok else '✗'} {label}")
+    return ok
+
+
+def _make_analyzer():
+    """Quiet BaseAnalyzer that reports one violation per analyzed detection."""
+    from base_analyzer import BaseAnalyzer, ViolationResult
+
+    class OneViolationAnalyzer(BaseAnalyzer):
+        def analyze_detection(self, image, detection):
+            return [ViolationResult(type=f"{detection.class_name} check",
+                                    confidence=detection.confidence)]
+
+    analyzer = OneViolationAnalyzer(name="duplicate_test")
+    analyzer.verbose = False
+    return analyzer
+
+
+def test_iou_filter():
+    """Greedy IoU filtering keeps the first of each overlapping group."""
+    print("Testing iou_filter...")
+    from bbox_utils import iou_filter
+
+    boxes = np.array([[0, 0, 100, 100],      # kept
+                      [5, 5, 100, 100],      # overlaps the first
+                      [300, 300, 50, 50]],   # on its own
+                     dtype=np.float32)
+
+    results = [
+        _check("overlapping box dropped", iou_filter(boxes, 0.5).tolist() == [0, 2]),
+        _check("threshold above the overlap keeps both",
+               iou_filter(boxes, 0.95).tolist() == [0, 1, 2]),
+        _check("empty input", len(iou_filter(np.zeros((0, 4), dtype=np.float32))) == 0),
+    ]
+    return all(results)
+
+
+def test_same_class_duplicates():
+    """The most confident of two overlapping same-class boxes is kept."""
+    print("\nTesting same-class duplicates...")
+    from bbox_utils import unique_detection_indices, duplicate_representatives
+
+    detections = [
+        _detection("door", 0.60, 100, 100, 80, 200),
+        _detection("door", 0.90, 105, 102, 80, 200),   # same door, more confident
+        _detection("door", 0.70, 400, 100, 80, 200),   # another door
+    ]
+
+    results = [
+        _check("kept the more confident door",
+               unique_detection_indices(detections) == [1, 2]),
+        _check("dropped door maps to the kept one",
+               duplicate_representatives(detections) == [1, 1, 2]),
+    ]
+
+    analyzer = _make_analyzer()
+    report = analyzer.analyze_all_detections(np.zeros((400, 600, 3), dtype=np.uint8),
+                                             detections)
+    results += [
+        _check("every detection has an entry", sorted(report) == [
+            "detection_0", "detection_1", "detection_2"]),
+        _check("duplicate_of points at the kept detection",
+               report["detection_0"].get("duplicate_of") == "detection_1"),
+        _check("duplicate reports no violations of its own",
+               report["detection_0"]["violations"] == []),
+        _check("kept detections are analyzed",
+               len(report["detection_1"]["violations"]) == 1
+               and len(report["detection_2"]["violations"]) == 1),
+        _check("only the unique detections were analyzed", analyzer.analysis_count == 2),
+    ]
+    return all(results)
+
+
+def test_different_classes():
+    """Overlapping boxes of different classes are never merged."""
+    print("\nTesting overlapping boxes of different classes...")
+    from bbox_utils import unique_detection_indices
+
+    detections = [
+        _detection("door", 0.80, 100, 100, 80, 200),
+        _detection("person", 0.90, 102, 100, 80, 200, class_id=0),
+    ]
+    report = _make_analyzer().analyze_all_detections(
+        np.zeros((400, 600, 3), dtype=np.uint8), detections)
+
+    results = [
+        _check("both kept", unique_detection_indices(detections) == [0, 1]),
+        _check("neither marked as duplicate",
+               not any("duplicate_of" in entry for entry in report.values())),
+    ]
+    return all(results)
+
+
+def test_filter_disabled():
+    """duplicate_iou_threshold = None analyzes every detection."""
+    print("\nTesting with duplicate filtering off...")
+
+    detections = [
+        _detection("door", 0.60, 100, 100, 80, 200),
+        _detection("door", 0.90, 100, 100, 80, 200),   # exact same box
+    ]
+    analyzer = _make_analyzer()
+    analyzer.duplicate_iou_threshold = None
+    report = analyzer.analyze_all_detections(np.zeros((400, 600, 3), dtype=np.uint8),
+                                             detections)
+
+    results = [
+        _check("no duplicates reported",
+               not any("duplicate_of" in entry for entry in report.values())),
+        _check("both analyzed", analyzer.analysis_count == 2),
+    ]
+    return all(results)
+
+
+def test_classify_rects_paths():
+    """The numba loop and the NumPy version classify rects the same way."""
+    print("\nTesting classify_rects (numba vs NumPy)...")
+    import bbox_utils
+
+    if not bbox_utils.NUMBA_AVAILABLE:
+        print("  ℹ numba not installed, only the NumPy path exists")
+        return True
+
+    rng = np.random.default_rng(0)
+    rects = np.column_stack([rng.integers(0, 640, 500), rng.integers(0, 480, 500),
+                             rng.integers(0, 400, 500), rng.integers(0, 300, 500)])
+    rects = rects.astype(np.int32)
+
+    results = []
+    for conf_thresh in (0.0, 0.55, 0.7):
+        numba_out = bbox_utils._classify_rects_loop(rects, 640, 480, conf_thresh)
+        numpy_out = bbox_utils._classify_rects_numpy(rects, 640, 480, conf_thresh)
+        results.append(_check(
+            f"same class IDs, confidences and keep mask (threshold {conf_thresh})",
+            all(np.array_equal(a, b) for a, b in zip(numba_out, numpy_out))))
+    return all(results)
+
+
+def main():
+    """Run all tests"""
+    print("=" * 60)
+    print("ADA Compliance System - Duplicate Detection Test")
+    print("=" * 60)
+
+    tests = [
+        test_iou_filter,
+        test_same_class_duplicates,
+        test_different_classes,
+        test_filter_disabled,
+        test_classify_rects_paths,
+    ]
+    results = [test() for test in tests]
+
+    print("\n" + "=" * 60)
+    if all(results):
+        print("✓ ALL TESTS PASSED")
+        print("=" * 60)
+        return 0
+    print("✗ SOME TESTS FAILED - See above")
+    print("=" * 60)
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,11 +10,12 @@ This script demonstrates the complete pipeline so far:
 """
 
 import config
-from video_processor import process_image_file
-from object_detector import ObjectDetector, visualize_detections
 
 def test_full_pipeline():
     """Test the complete detection pipeline"""
+    # Imported here so importing this module doesn't load OpenCV/YOLO
+    from video_processor import process_image_file
+    from object_detector import ObjectDetector, visualize_detections
     
     print("=" * 70)
     print("INTEGRATED TEST: Image Processing → Object Detection")
@@ -52,10 +53,12 @@ def test_full_pipeline():
     
     if all_detections:
         print("\nAll detected objects:")
-        for i, det in enumerate(all_detections, 1):
-            print(f"  {i}. {det.class_name:12s} "
-                  f"bbox: ({det.x:3d}, {det.y:3d}, {det.width:3d}, {det.height:3d}) "
-                  f"conf: {det.confidence:.2f}")
+        print("\n".join(
+            f"  {i}. {det.class_name:12s} "
+            f"bbox: ({det.x:3d}, {det.y:3d}, {det.width:3d}, {det.height:3d}) "
+            f"conf: {det.confidence:.2f}"
+            for i, det in enumerate(all_detections, 1)
+        ))
     
     # Step 4: Filter for ADA-relevant objects
     print("\n[Step 4] Filtering for ADA-relevant objects...")
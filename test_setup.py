@@ -6,6 +6,8 @@ This script verifies that all dependencies are installed correctly
 and the project structure is set up properly.
 """
 
+import importlib.metadata
+import importlib.util
 import sys
 from pathlib import Path
 
@@ -27,19 +29,17 @@ def test_imports():
         print(f"  ✗ NumPy: {e}")
         return False
     
-    try:
-        from PIL import Image
-        print(f"  ✓ Pillow (PIL) imported successfully")
-    except ImportError as e:
-        print(f"  ✗ Pillow: {e}")
-        return False
-    
-    try:
-        import matplotlib
-        print(f"  ✓ Matplotlib version: {matplotlib.__version__}")
-    except ImportError as e:
-        print(f"  ✗ Matplotlib: {e}")
-        return False
+    # Pillow and Matplotlib are only checked for, not used, so they are
+    # looked up without paying for the import
+    for name, module, dist in (("Pillow (PIL)", "PIL", "pillow"),
+                               ("Matplotlib", "matplotlib", "matplotlib")):
+        if importlib.util.find_spec(module) is None:
+            print(f"  ✗ {name}: No module named '{module}'")
+            return False
+        try:
+            print(f"  ✓ {name} version: {importlib.metadata.version(dist)}")
+        except importlib.metadata.PackageNotFoundError:
+            print(f"  ✓ {name} found")
     
     return True
 
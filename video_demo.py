@@ -5,13 +5,10 @@ Video Analysis Demo - Enhanced Control
 Process videos with custom frame extraction settings.
 """
 
+import itertools
 import sys
 from pathlib import Path
 import config
-from video_processor import VideoProcessor
-from object_detector import ObjectDetector
-from compliance_analyzer import ComplianceAnalyzer
-from visualizer import ViolationVisualizer
 
 def analyze_video(video_path: str, num_frames: int = 5):
     """
@@ -21,105 +18,117 @@ def analyze_video(video_path: str, num_frames: int = 5):
         video_path: Path to video file
         num_frames: Number of frames to extract and analyze
     """
+    # Imported here so the usage message and missing-file check don't
+    # wait for OpenCV, the detector and the analyzers to load
+    from video_processor import VideoProcessor
+    from object_detector import ObjectDetector
+    from compliance_analyzer import ComplianceAnalyzer
+    from visualizer import ViolationVisualizer
+    
     print("=" * 80)
     print(f"  VIDEO ANALYSIS: {Path(video_path).name}")
     print("=" * 80)
     
-    # Step 1: Extract frames from video
-    print(f"\n[1/4] Extracting {num_frames} frames from video...")
-    print("-" * 80)
-    
     try:
         processor = VideoProcessor(video_path)
-        frames = processor.extract_frames(num_frames)
-        
-        # Save extracted frames
-        frame_paths = processor.save_frames(frames)
-        print(f"\n✓ Extracted {len(frames)} frames")
-        print(f"✓ Frames saved to: {config.OUTPUTS_DIR}/")
-        
     except Exception as e:
         print(f"❌ Error processing video: {e}")
         return
     
-    # Step 2: Analyze each frame
-    print(f"\n[2/4] Analyzing each frame for objects...")
-    print("-" * 80)
-    
     detector = ObjectDetector(use_mock=False)  # Use real YOLO!
     analyzer = ComplianceAnalyzer(use_mock=True)  # Mock compliance for now
+    visualizer = ViolationVisualizer()
+    video_name = Path(video_path).stem
+    
+    # Frames are handled a few at a time: decode, save, detect,
+    # analyze and annotate them, then let them go. Only the (small)
+    # detection and violation results are kept across chunks
+    batch_size = config.VIDEO_FRAME_BATCH
+    frames = processor.iter_frames(num_frames)
+    frames_done = 0
     
     all_detections = []
     all_violations = []
     
-    for i, frame in enumerate(frames):
-        print(f"\n  Frame {i+1}/{len(frames)}:")
+    # Step 1: Extract, analyze and annotate frames
+    print(f"\n[1/2] Extracting, analyzing and annotating {num_frames} frames, {batch_size} at a time...")
+    print("-" * 80)
+    
+    # The video is released once the last chunk is done, or on an error
+    with processor:
+        while True:
+            try:
+                # Extract the next frames from video and save them
+                chunk = list(itertools.islice(frames, batch_size))
+                if chunk:
+                    processor.save_frames(chunk, start=frames_done)
+            except Exception as e:
+                print(f"❌ Error processing video: {e}")
+                return
+        
+            if not chunk:
+                break
         
-        # Detect objects
-        detections = detector.detect(frame)
-        relevant = detector.filter_relevant_objects(detections)
-        all_detections.append(relevant)
+            # Detect objects in this chunk's frames with batched inference
+            frame_detections = detector.detect_batch(chunk, batch_size=batch_size)
         
-        if relevant:
-            print(f"    Found {len(relevant)} relevant objects")
+            for i, (frame, detections) in enumerate(zip(chunk, frame_detections), frames_done):
+                # Numbered by frames actually decoded; failed reads are skipped
+                print(f"\n  Frame {i+1}:")
             
-            # Analyze for violations
-            violations = analyzer.analyze_all_detections(frame, relevant)
-            all_violations.append(violations)
-        else:
-            print("    No relevant objects found")
-            all_violations.append({})
-    
-    # Step 3: Compile results
-    print(f"\n[3/4] Compiling results across all frames...")
+                relevant = detector.filter_relevant_objects(detections)
+                all_detections.append(relevant)
+            
+                if relevant:
+                    print(f"    Found {len(relevant)} relevant objects")
+                
+                    # Analyze for violations
+                    violations = analyzer.analyze_all_detections(frame, relevant)
+                    all_violations.append(violations)
+                
+                    # Annotate the frame and save
+                    output_path = config.OUTPUTS_DIR / f"{video_name}_frame{i+1}_annotated.jpg"
+                    visualizer.create_detailed_report(
+                        frame, relevant, violations, str(output_path)
+                    )
+                else:
+                    print("    No relevant objects found")
+                    all_violations.append({})
+        
+            frames_done += len(chunk)
+    
+    print(f"\n✓ Extracted and analyzed {frames_done} of {num_frames} frames")
+    print(f"✓ Frames and annotated frames saved to: {config.OUTPUTS_DIR}/")
+    
+    # Step 2: Compile results
+    print(f"\n[2/2] Compiling results across all frames...")
     print("-" * 80)
     
+    # Every violation from every frame, flattened in one pass
+    flat_violations = [v for frame_violations in all_violations
+                       for det_violations in frame_violations.values()
+                       for v in det_violations['violations']]
+    
     total_detections = sum(len(d) for d in all_detections)
-    total_violations = sum(
-        sum(len(v['violations']) for v in frame_violations.values())
-        for frame_violations in all_violations
-    )
+    total_violations = len(flat_violations)
     
     print(f"✓ Total objects detected: {total_detections}")
     print(f"✓ Total violations found: {total_violations}")
     
     # Count unique violation types
-    violation_types = set()
-    for frame_violations in all_violations:
-        for det_violations in frame_violations.values():
-            for v in det_violations['violations']:
-                violation_types.add(v['type'])
+    violation_types = {v['type'] for v in flat_violations}
     
     if violation_types:
         print(f"\nViolation types found:")
         for vtype in sorted(violation_types):
             print(f"  - {vtype}")
     
-    # Step 4: Create summary visualization
-    print(f"\n[4/4] Creating summary visualization...")
-    print("-" * 80)
-    
-    visualizer = ViolationVisualizer()
-    video_name = Path(video_path).stem
-    
-    # Annotate each frame and save
-    for i, (frame, detections, violations) in enumerate(
-        zip(frames, all_detections, all_violations)
-    ):
-        if detections:
-            output_path = config.OUTPUTS_DIR / f"{video_name}_frame{i+1}_annotated.jpg"
-            visualizer.create_detailed_report(
-                frame, detections, violations, str(output_path)
-            )
-    
-    print(f"✓ Annotated frames saved to: {config.OUTPUTS_DIR}/")
-    
     # Summary
     print("\n" + "=" * 80)
     print("  VIDEO ANALYSIS COMPLETE")
     print("=" * 80)
     print(f"\nVideo: {Path(video_path).name}")
-    print(f"Frames analyzed: {len(frames)}")
+    print(f"Frames analyzed: {frames_done}")
     print(f"Objects detected: {total_detections}")
     print(f"Violations found: {total_violations}")
     print(f"\n✓ Check {config.OUTPUTS_DIR}/ for:")
@@ -10,10 +10,12 @@ Technical concepts:
 - This saves computation time and API costs
 """
 
+import os
+from concurrent.futures import ThreadPoolExecutor
 import cv2
 import numpy as np
 from pathlib import Path
-from typing import List, Tuple
+from typing import Iterator, List, Tuple
 import config
 
 class VideoProcessor:
@@ -70,13 +72,26 @@ class VideoProcessor:
             
         How it works:
         1. Calculate which frame numbers to extract (evenly spaced)
-        2. Jump to each frame position in the video
+        2. Get to each frame position in the video: nearby frames are
+           reached by decoding forward, distant ones by seeking
         3. Read the frame and store it
         4. Return all extracted frames
         
         Why numpy arrays? Images in OpenCV are represented as multi-dimensional
         arrays of pixel values. Each pixel has RGB values (Red, Green, Blue).
         """
+        return list(self.iter_frames(num_frames))
+    
+    def iter_frames(self, num_frames: int = None) -> Iterator[np.ndarray]:
+        """
+        Yield the frames extract_frames returns, one at a time.
+        
+        Each frame is decoded only when asked for, so a caller that
+        handles frames as they come holds one in memory instead of all.
+        
+        Args:
+            num_frames: Number of frames to extract (default from config)
+        """
         if num_frames is None:
             num_frames = config.FRAMES_TO_EXTRACT
         
@@ -84,39 +99,54 @@ class VideoProcessor:
         # Example: 100 frame video, extract 5 frames = frames 0, 25, 50, 75, 100
         frame_indices = np.linspace(0, self.frame_count - 1, num_frames, dtype=int)
         
-        extracted_frames = []
+        # A seek makes the decoder go back to the previous keyframe and
+        # decode up to the target again, so for frames only a little
+        # ahead it is cheaper to decode forward. grab() decodes without
+        # the color conversion read() does, for frames we don't keep
+        max_forward = int(self.fps * config.VIDEO_SEEK_MIN_GAP_SECONDS)
+        position = int(self.video.get(cv2.CAP_PROP_POS_FRAMES))  # Next frame read() returns
         
         print(f"\nExtracting {num_frames} frames...")
         
         for idx, frame_num in enumerate(frame_indices):
-            # Set video position to specific frame
-            self.video.set(cv2.CAP_PROP_POS_FRAMES, frame_num)
+            if position <= frame_num <= position + max_forward:
+                # Decode forward to the frame
+                while position < frame_num and self.video.grab():
+                    position += 1
+            else:
+                # Set video position to specific frame
+                self.video.set(cv2.CAP_PROP_POS_FRAMES, frame_num)
             
             # Read the frame
             success, frame = self.video.read()
+            position = frame_num + 1
             
             if success:
-                extracted_frames.append(frame)
                 timestamp = frame_num / self.fps
                 print(f"  ✓ Frame {idx + 1}/{num_frames} at {timestamp:.2f}s")
+                yield frame
             else:
                 print(f"  ✗ Failed to read frame {frame_num}")
-        
-        return extracted_frames
     
-    def save_frames(self, frames: List[np.ndarray], output_dir: str = None) -> List[Path]:
+    def save_frames(self, frames: List[np.ndarray], output_dir: str = None,
+                    start: int = 0) -> List[Path]:
         """
         Save extracted frames as image files.
         
         Args:
             frames: List of frame images
             output_dir: Directory to save frames (default: outputs/)
+            start: Number of frames saved before these, for the file
+                numbering when frames are saved in chunks
             
         Returns:
             List of paths to saved frame files
             
         Technical note: We save frames so we can visualize them and
-        use them later without re-processing the video.
+        use them later without re-processing the video. JPEG encoding
+        releases the GIL, so the frames are encoded in memory on a
+        thread pool, one per core, while this thread writes the finished
+        bytes to disk in order.
         """
         if output_dir is None:
             output_dir = config.OUTPUTS_DIR
@@ -124,22 +154,32 @@ class VideoProcessor:
             output_dir = Path(output_dir)
             output_dir.mkdir(exist_ok=True)
         
-        saved_paths = []
         video_name = self.video_path.stem  # Filename without extension
         
+        # Create filenames: video_name_frame_001.jpg
+        saved_paths = [output_dir / f"{video_name}_frame_{idx + 1:03d}.jpg"
+                       for idx in range(start, start + len(frames))]
+        
         print(f"\nSaving frames to {output_dir}/...")
         
-        for idx, frame in enumerate(frames):
-            # Create filename: video_name_frame_001.jpg
-            filename = f"{video_name}_frame_{idx + 1:03d}.jpg"
-            output_path = output_dir / filename
-            
-            # Save frame as JPEG
-            # cv2.imwrite encodes the numpy array as an image file
-            cv2.imwrite(str(output_path), frame)
-            saved_paths.append(output_path)
+        # Save frames as JPEG, at the same quality as the other outputs
+        # cv2.imencode encodes the numpy array into JPEG bytes
+        params = [cv2.IMWRITE_JPEG_QUALITY, config.OUTPUT_JPEG_QUALITY,
+                  cv2.IMWRITE_JPEG_OPTIMIZE, 0]
+        with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as pool:
+            encoded = pool.map(lambda frame: cv2.imencode('.jpg', frame, params), frames)
             
-            print(f"  ✓ Saved: {filename}")
+            for output_path, (ok, buffer) in zip(saved_paths, encoded):
+                if ok:
+                    try:
+                        with open(output_path, 'wb') as f:
+                            f.write(buffer)
+                    except OSError:
+                        ok = False
+                if ok:
+                    print(f"  ✓ Saved: {output_path.name}")
+                else:
+                    print(f"  ✗ Failed to save: {output_path.name}")
         
         return saved_paths
     
@@ -172,15 +212,31 @@ class VideoProcessor:
         
         return image
     
-    def __del__(self):
+    def release(self):
         """
-        Destructor - cleanup when object is destroyed.
+        Close the video file and free the decoder.
         
         Technical note: Always release video resources to avoid memory leaks.
-        This is called "resource management".
+        This is called "resource management". Safe to call more than once.
         """
         if hasattr(self, 'video'):
             self.video.release()
+    
+    def __enter__(self):
+        """Use as `with VideoProcessor(path) as processor:`."""
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Release the video as soon as the `with` block ends."""
+        self.release()
+    
+    def __del__(self):
+        """
+        Destructor - last-resort cleanup for processors that were never
+        released. Don't rely on it: it runs whenever the garbage collector
+        gets to the object, so use release() or a `with` block instead.
+        """
+        self.release()
 
 
 def process_video_file(video_path: str, num_frames: int = None) -> Tuple[List[np.ndarray], List[Path]]:
@@ -197,9 +253,9 @@ def process_video_file(video_path: str, num_frames: int = None) -> Tuple[List[np
     Why a standalone function? Sometimes you want simple, one-line usage
     without creating a VideoProcessor object explicitly.
     """
-    processor = VideoProcessor(video_path)
-    frames = processor.extract_frames(num_frames)
-    saved_paths = processor.save_frames(frames)
+    with VideoProcessor(video_path) as processor:
+        frames = processor.extract_frames(num_frames)
+        saved_paths = processor.save_frames(frames)
     return frames, saved_paths
 
 
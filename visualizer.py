@@ -10,14 +10,77 @@ Creates professional-looking annotated images showing:
 This makes the demo visually impressive!
 """
 
+import functools
+from collections import Counter
 import cv2
 import numpy as np
 from typing import List, Dict, Tuple
 from pathlib import Path
 
 import config
+import output_writer
 from object_detector import DetectionResult
-from base_analyzer import ViolationResult
+from base_analyzer import _SEVERITY_BY_NAME
+
+
+@functools.lru_cache(maxsize=1024)
+def _text_size(text: str, font: int, font_scale: float, thickness: int):
+    """
+    cv2.getTextSize, memoized: labels like "car - 2 violation(s)" and
+    the summary stats recur on every frame.
+    """
+    return cv2.getTextSize(text, font, font_scale, thickness)
+
+
+# Violation detail lines (marker + text) for _add_violation_details,
+# keyed by text and color, rendered on first use
+_DETAIL_CHIPS = {}
+_DETAIL_CHIP_LIMIT = 1024
+_DETAIL_ICON_SIZE = 8
+
+
+def _draw_detail(image: np.ndarray, text: str, color, center_x: int, center_y: int, font: int):
+    """Draw one violation detail line, a severity marker and its text, with OpenCV."""
+    cv2.circle(image, (center_x, center_y), _DETAIL_ICON_SIZE, color, -1)
+    cv2.putText(image, text, (center_x + _DETAIL_ICON_SIZE + 5, center_y + 5),
+               font, 0.5, (255, 255, 255), 1)
+
+
+def _detail_chip(text: str, color, font: int):
+    """
+    The pixels one violation detail line draws, rendered once and reused.
+    
+    Both the marker and the text are drawn without anti-aliasing, so a
+    line is fully described by which pixels it sets and to what.
+    
+    Returns:
+        (rows, cols, values, bounds): coordinates of the drawn pixels
+        relative to the marker's center, their BGR values, and the
+        (top, left, bottom, right) extent of all of them
+    """
+    key = (text, color, font)
+    chip = _DETAIL_CHIPS.get(key)
+    if chip is not None:
+        return chip
+    
+    # Draw onto a canvas with room around the line, marker at (margin, margin)
+    (text_w, text_h), baseline = _text_size(text, font, 0.5, 1)
+    margin = _DETAIL_ICON_SIZE + text_h + baseline + 10
+    canvas = np.zeros((2 * margin, 2 * margin + text_w, 3), dtype=np.uint8)
+    mask = np.zeros(canvas.shape[:2], dtype=np.uint8)
+    _draw_detail(canvas, text, color, margin, margin, font)
+    _draw_detail(mask, text, 255, margin, margin, font)
+    
+    rows, cols = np.nonzero(mask)
+    values = canvas[rows, cols]
+    rows = (rows - margin).astype(np.intp)
+    cols = (cols - margin).astype(np.intp)
+    chip = (rows, cols, values, (rows.min(), cols.min(), rows.max(), cols.max()))
+    
+    if len(_DETAIL_CHIPS) >= _DETAIL_CHIP_LIMIT:
+        _DETAIL_CHIPS.clear()
+    _DETAIL_CHIPS[key] = chip
+    return chip
 
 
 class ViolationVisualizer:
@@ -58,15 +121,24 @@ class ViolationVisualizer:
             violations_by_detection: Dict mapping detection to violations
             
         Returns:
-            Annotated image
+            Annotated image, downscaled to config.MAX_ANNOTATION_DIM
+            on its longest side if the original is larger
             
         This is the main method that creates the visual report.
         """
-        # Make a copy to avoid modifying original
-        annotated = image.copy()
+        scale = min(1.0, config.MAX_ANNOTATION_DIM / max(image.shape[:2]))
+        if scale < 1.0:
+            # A resized copy; boxes are scaled to match below
+            annotated = cv2.resize(image, None, fx=scale, fy=scale,
+                                   interpolation=cv2.INTER_AREA)
+        else:
+            # Make a copy to avoid modifying original
+            annotated = image.copy()
         
-        # Add semi-transparent overlay for better visibility
-        overlay = annotated.copy()
+        # Settings used for every detection, looked up once
+        colors = self.colors
+        font, font_scale, font_thickness = self.font, self.font_scale, self.font_thickness
+        line_thickness = self.line_thickness
         
         # Process each detection
         for i, detection in enumerate(detections):
@@ -75,21 +147,23 @@ class ViolationVisualizer:
             # Get violations for this detection (if any)
             violations = []
             if det_key in violations_by_detection:
-                violation_dicts = violations_by_detection[det_key].get('violations', [])
-                violations = [ViolationResult(v) for v in violation_dicts]
+                violations = violations_by_detection[det_key].get('violations', [])
             
-            # Determine severity color
-            if violations:
-                # Use highest severity
-                severity_order = {"Critical": 3, "Moderate": 2, "Minor": 1}
-                max_severity = max(violations, key=lambda v: severity_order.get(v.severity, 0))
-                color = self.colors[max_severity.severity]
-            else:
-                color = self.colors["Compliant"]
+            # Determine severity color: highest severity wins (ranked like
+            # ViolationResult.severity_rank, unknown severities rank 0)
+            best_rank = 0
+            color = colors["Compliant"]
+            for v in violations:
+                rank = _SEVERITY_BY_NAME.get(v['severity'], 0)
+                if rank > best_rank:
+                    best_rank, color = rank, colors[v['severity']]
             
             # Draw bounding box
-            x, y, w, h = detection.bbox
-            cv2.rectangle(annotated, (x, y), (x + w, y + h), color, self.line_thickness)
+            bbox = detection.bbox
+            if scale < 1.0:
+                bbox = [int(round(v * scale)) for v in bbox]
+            x, y, w, h = bbox
+            cv2.rectangle(annotated, (x, y), (x + w, y + h), color, line_thickness)
             
             # Create label
             label_parts = [detection.class_name]
@@ -98,8 +172,8 @@ class ViolationVisualizer:
             label = " - ".join(label_parts)
             
             # Draw label background
-            (label_w, label_h), baseline = cv2.getTextSize(
-                label, self.font, self.font_scale, self.font_thickness
+            (label_w, label_h), baseline = _text_size(
+                label, font, font_scale, font_thickness
             )
             
             label_y = y - 10 if y > 30 else y + h + 25
@@ -111,53 +185,55 @@ class ViolationVisualizer:
             # Draw label text
             cv2.putText(annotated, label,
                        (x + 5, label_y),
-                       self.font, self.font_scale,
-                       (255, 255, 255), self.font_thickness)
+                       font, font_scale,
+                       (255, 255, 255), font_thickness)
             
             # Add violation details if any
             if violations:
-                self._add_violation_details(annotated, detection, violations)
+                self._add_violation_details(annotated, bbox, violations)
         
         return annotated
     
     def _add_violation_details(self,
                                image: np.ndarray,
-                               detection: DetectionResult,
-                               violations: List[ViolationResult]):
+                               bbox: List[int],
+                               violations: List[Dict]):
         """
         Add detailed violation information near the detection.
         
         Args:
             image: Image being annotated (modified in place)
-            detection: The detected object
-            violations: List of violations for this object
+            bbox: The detected object's [x, y, width, height] in image
+            violations: List of violation dicts for this object
         """
-        x, y, w, h = detection.bbox
+        x, y, w, h = bbox
         
         # Position for violation details (to the right of bbox)
         detail_x = x + w + 10
         detail_y = y + 20
         
+        height, width = image.shape[:2]
+        
         for i, violation in enumerate(violations):
             # Create violation text
-            violation_text = f"{violation.type}: {violation.severity}"
+            violation_text = f"{violation['type']}: {violation['severity']}"
             
             # Get color for this severity
-            color = self.colors[violation.severity]
-            
-            # Draw small icon/marker
-            icon_size = 8
-            cv2.circle(image, (detail_x, detail_y + i * 25), 
-                      icon_size, color, -1)
+            color = self.colors[violation['severity']]
             
-            # Draw violation text
-            text_x = detail_x + icon_size + 5
-            text_y = detail_y + i * 25 + 5
-            
-            cv2.putText(image, violation_text,
-                       (text_x, text_y),
-                       self.font, 0.5,
-                       (255, 255, 255), 1)
+            # Small icon/marker followed by the violation text. Lines are
+            # the same on every detection and frame, so each is rendered
+            # once and copied in; lines cut by the image border (where
+            # OpenCV clips differently) and non-BGR images are drawn
+            center_y = detail_y + i * 25
+            rows, cols, values, (top, left, bottom, right) = _detail_chip(
+                violation_text, color, self.font)
+            if (image.ndim == 3 and image.shape[2] == 3
+                    and center_y + top >= 0 and detail_x + left >= 0
+                    and center_y + bottom < height and detail_x + right < width):
+                image[rows + center_y, cols + detail_x] = values
+            else:
+                _draw_detail(image, violation_text, color, detail_x, center_y, self.font)
     
     def create_summary_panel(self,
                             image: np.ndarray,
@@ -174,20 +250,21 @@ class ViolationVisualizer:
         Returns:
             Image with summary panel
         """
-        # Count violations by severity
+        # Count violations by severity in one pass
+        counts = Counter(v.get('severity', 'Minor')
+                         for det_data in violations_by_detection.values()
+                         for v in det_data.get('violations', []))
         severity_counts = {"Critical": 0, "Moderate": 0, "Minor": 0}
-        total_violations = 0
-        
-        for det_data in violations_by_detection.values():
-            for v in det_data.get('violations', []):
-                severity = v.get('severity', 'Minor')
-                severity_counts[severity] = severity_counts.get(severity, 0) + 1
-                total_violations += 1
+        severity_counts.update(counts)
+        total_violations = sum(counts.values())
         
-        # Create panel at top of image
+        # Output is the panel stacked on the image, allocated once; the
+        # panel is drawn straight into its top rows
         panel_height = 100
-        panel = np.zeros((panel_height, image.shape[1], 3), dtype=np.uint8)
-        panel[:] = (40, 40, 40)  # Dark gray background
+        result = np.empty((panel_height + image.shape[0],) + image.shape[1:], dtype=np.uint8)
+        result[panel_height:] = image
+        panel = result[:panel_height]
+        panel[:] = 40  # Dark gray background
         
         # Add title
         title = "ADA COMPLIANCE ANALYSIS SUMMARY"
@@ -204,14 +281,15 @@ class ViolationVisualizer:
             f"Minor: {severity_counts['Minor']}"
         ]
         
-        x_offset = 20
-        for i, stat in enumerate(stats):
-            cv2.putText(panel, stat, (x_offset, stats_y),
+        # Stats sit 180px apart, or further when a stat is wider than
+        # that, so long counts never run into the next one
+        widths = np.array([_text_size(stat, self.font, 0.5, 1)[0][0] for stat in stats])
+        pitches = np.maximum(widths + 10, 180)
+        x_offsets = 20 + np.concatenate(([0], np.cumsum(pitches[:-1])))
+        for stat, x_offset in zip(stats, x_offsets):
+            cv2.putText(panel, stat, (int(x_offset), stats_y),
                        self.font, 0.5, (200, 200, 200), 1)
-            x_offset += 180
         
-        # Combine panel with image
-        result = np.vstack([panel, image])
         return result
     
     def create_detailed_report(self,
@@ -239,7 +317,7 @@ class ViolationVisualizer:
                                                  violations_by_detection)
         
         # Save
-        cv2.imwrite(save_path, with_summary)
+        output_writer.write_image(save_path, with_summary)
         return save_path
     
     def create_side_by_side(self,
@@ -265,20 +343,21 @@ class ViolationVisualizer:
             annotated = cv2.resize(annotated,
                                   (int(annotated.shape[1] * h / annotated.shape[0]), h))
         
-        # Add labels
-        original_labeled = original.copy()
-        annotated_labeled = annotated.copy()
+        # Combine side by side: each image is copied straight into its
+        # half, and the labels are drawn on the halves (views), so neither
+        # input is modified and each label is clipped to its own image
+        comparison = np.hstack([original, annotated])
+        original_labeled = comparison[:, :original.shape[1]]
+        annotated_labeled = comparison[:, original.shape[1]:]
         
+        # Add labels
         cv2.putText(original_labeled, "ORIGINAL", (20, 40),
                    self.font, 1.2, (255, 255, 255), 3)
         cv2.putText(annotated_labeled, "ANALYSIS", (20, 40),
                    self.font, 1.2, (255, 255, 255), 3)
         
-        # Combine side by side
-        comparison = np.hstack([original_labeled, annotated_labeled])
-        
         # Save
-        cv2.imwrite(save_path, comparison)
+        output_writer.write_image(save_path, comparison)
         return save_path
 
 